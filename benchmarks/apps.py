@@ -0,0 +1,126 @@
+"""Бенчмарк всех ASGI-приложений репозитория в одном процессе.
+
+Для каждого сценария из `benchmarks.scenarios` измеряются запросы в секунду,
+p50/p99 задержки и аллокации на запрос. Результаты пишутся в JSON вместе с
+коммитом, так что прогоны разных коммитов можно сравнить между собой.
+
+Запуск:
+    python -m benchmarks.apps run [--requests 5000] [--only math] [--output results.json]
+    python -m benchmarks.apps compare old.json new.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+from benchmarks.asgi import call, lifespan, measure
+from benchmarks.scenarios import SCENARIOS, Scenario
+
+_METRICS = ("rps", "p50_ms", "p99_ms", "alloc_bytes_per_request")
+
+
+def git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+async def run_scenario(scenario: Scenario, count: int) -> dict:
+    try:
+        app = scenario.load()
+    except ImportError as error:
+        # у некоторых лекций свои зависимости, которых может не быть в окружении
+        return {"skipped": f"{type(error).__name__}: {error}"}
+
+    async with lifespan(app):
+        for request in scenario.setup:
+            await call(app, request)
+        result = await measure(app, scenario.requests, count)
+
+    return asdict(result)
+
+
+async def run(args: argparse.Namespace) -> None:
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "requests": args.requests,
+        "scenarios": {},
+    }
+
+    for scenario in SCENARIOS:
+        if args.only and args.only not in scenario.name:
+            continue
+
+        result = await run_scenario(scenario, args.requests)
+        report["scenarios"][scenario.name] = result
+
+        if "skipped" in result:
+            print(f"{scenario.name:32} skipped ({result['skipped']})")
+        else:
+            print(
+                f"{scenario.name:32} {result['rps']:>9.0f} rps"
+                f"  p50 {result['p50_ms']:.3f} ms  p99 {result['p99_ms']:.3f} ms"
+                f"  {result['alloc_bytes_per_request']:>8.0f} B/req"
+            )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+
+def compare(args: argparse.Namespace) -> None:
+    old = json.loads(Path(args.old).read_text())
+    new = json.loads(Path(args.new).read_text())
+    print(f"{old['commit']} -> {new['commit']}")
+
+    for name, after in new["scenarios"].items():
+        before = old["scenarios"].get(name)
+        if before is None or "skipped" in before or "skipped" in after:
+            print(f"{name:32} n/a")
+            continue
+
+        changes = "  ".join(
+            f"{metric} {_relative(before[metric], after[metric]):+.1%}" for metric in _METRICS
+        )
+        print(f"{name:32} {changes}")
+
+
+def _relative(before: float, after: float) -> float:
+    return (after - before) / before if before else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("--requests", type=int, default=5_000)
+    run_parser.add_argument("--only", help="подстрока имени сценария")
+    run_parser.add_argument("--output", help="куда записать JSON с результатами")
+
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        asyncio.run(run(args))
+    else:
+        compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
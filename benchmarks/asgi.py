@@ -0,0 +1,168 @@
+"""Вызов ASGI-приложений напрямую: синтетические scope/receive/send без сервера и сети."""
+
+import asyncio
+import gc
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+App = Callable[[dict[str, Any], Callable[[], Awaitable[dict[str, Any]]], Callable[[dict[str, Any]], Awaitable[None]]], Awaitable[None]]
+
+
+@dataclass(frozen=True, slots=True)
+class Request:
+    method: str
+    path: str
+    query_string: bytes = b""
+    body: bytes = b""
+    headers: tuple[tuple[bytes, bytes], ...] = ()
+
+    def scope(self) -> dict[str, Any]:
+        headers = [(b"host", b"bench"), *self.headers]
+        if self.body:
+            headers.append((b"content-length", str(len(self.body)).encode()))
+
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": "1.1",
+            "method": self.method,
+            "scheme": "http",
+            "path": self.path,
+            "raw_path": self.path.encode(),
+            "root_path": "",
+            "query_string": self.query_string,
+            "headers": headers,
+            "client": ("127.0.0.1", 50000),
+            "server": ("bench", 80),
+        }
+
+
+@dataclass(slots=True)
+class Response:
+    status: int = 0
+    body_size: int = 0
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+async def call(app: App, request: Request) -> Response:
+    """Один запрос; receive отдаёт тело, а http.disconnect - только после ответа."""
+    response = Response()
+    body_sent = False
+
+    async def receive() -> dict[str, Any]:
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": request.body, "more_body": False}
+        await response.done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            response.status = message["status"]
+        elif message["type"] == "http.response.body":
+            response.body_size += len(message.get("body", b""))
+            if not message.get("more_body", False):
+                response.done.set()
+
+    await app(request.scope(), receive, send)
+    return response
+
+
+@asynccontextmanager
+async def lifespan(app: App) -> AsyncIterator[None]:
+    """Прогоняет lifespan.startup/shutdown, если приложение его поддерживает."""
+    inbox: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+    outbox: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+    scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}
+
+    task = asyncio.create_task(app(scope, inbox.get, outbox.put))
+    await inbox.put({"type": "lifespan.startup"})
+    started = await _next_message(outbox, task)
+
+    try:
+        yield
+    finally:
+        if started is not None and started["type"] == "lifespan.startup.complete":
+            await inbox.put({"type": "lifespan.shutdown"})
+            await _next_message(outbox, task)
+        task.cancel()
+
+
+async def _next_message(outbox: asyncio.Queue[dict[str, Any]], task: asyncio.Task) -> dict[str, Any] | None:
+    # приложение без lifespan просто завершается (или падает) вместо ответа
+    getter = asyncio.ensure_future(outbox.get())
+    await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+    if getter.done():
+        return getter.result()
+    getter.cancel()
+    return None
+
+
+@dataclass(slots=True)
+class Result:
+    requests: int
+    rps: float
+    p50_ms: float
+    p99_ms: float
+    alloc_bytes_per_request: float
+    retained_blocks_per_request: float
+    statuses: dict[int, int]
+
+
+async def measure(
+    app: App,
+    requests: list[Request],
+    count: int,
+    warmup: int = 100,
+    alloc_samples: int = 200,
+) -> Result:
+    """Гоняет запросы по кругу: пропускная способность, перцентили задержки и аллокации."""
+    for i in range(warmup):
+        await call(app, requests[i % len(requests)])
+
+    statuses: dict[int, int] = {}
+    latencies = []
+    started = time.perf_counter()
+    for i in range(count):
+        request_started = time.perf_counter_ns()
+        response = await call(app, requests[i % len(requests)])
+        latencies.append(time.perf_counter_ns() - request_started)
+        statuses[response.status] = statuses.get(response.status, 0) + 1
+    elapsed = time.perf_counter() - started
+
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+
+    # tracemalloc сильно замедляет вызовы, поэтому память меряется отдельными прогонами
+    samples = min(alloc_samples, count)
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    for i in range(samples):
+        await call(app, requests[i % len(requests)])
+    gc.collect()
+    retained = sys.getallocatedblocks() - blocks_before
+
+    tracemalloc.start()
+    allocated = 0
+    for i in range(samples):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        await call(app, requests[i % len(requests)])
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - before
+    tracemalloc.stop()
+
+    return Result(
+        requests=count,
+        rps=count / elapsed,
+        p50_ms=quantiles[49] / 1e6,
+        p99_ms=quantiles[98] / 1e6,
+        alloc_bytes_per_request=allocated / samples,
+        retained_blocks_per_request=retained / samples,
+        statuses=statuses,
+    )
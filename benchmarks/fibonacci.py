@@ -0,0 +1,51 @@
+"""Сравнение быстрого удвоения с линейным циклом, который раньше стоял в API.
+
+Запуск: `python -m benchmarks.fibonacci [--max-n 1000000]`
+"""
+
+import argparse
+import time
+from typing import Callable
+
+from lecture_1.core.fibonacci import fibonacci_pair
+
+
+def linear_fibonacci(n: int) -> int:
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+
+    return a
+
+
+def measure(func: Callable[[int], object], n: int, min_time: float = 0.2) -> float:
+    """Среднее время одного вызова в секундах (повторяем, пока не наберём min_time)."""
+    calls = 0
+    started = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        func(n)
+        calls += 1
+        elapsed = time.perf_counter() - started
+
+    return elapsed / calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-n", type=int, default=10**6)
+    args = parser.parse_args()
+
+    sizes = [10**power for power in range(1, 7) if 10**power <= args.max_n]
+
+    print(f"{'n':>10} {'linear, s':>12} {'doubling, s':>12} {'speedup':>10}")
+    for n in sizes:
+        assert linear_fibonacci(n) == fibonacci_pair(n)[0]
+
+        linear = measure(linear_fibonacci, n)
+        doubling = measure(lambda x: fibonacci_pair(x)[0], n)
+        print(f"{n:>10} {linear:>12.6f} {doubling:>12.6f} {linear / doubling:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""GET /mean в math_example: разбор тела напрямую против прежней проверки list[float].
+
+Прежний эндпоинт воспроизведён в отдельном приложении; оба вызываются в
+процессе через `benchmarks.asgi`, без сервера и сети.
+
+Запуск: `python -m benchmarks.mean [--max-size 10000000]`
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from benchmarks.asgi import Request, call
+from lecture_1 import math_example
+
+legacy_app = FastAPI()
+
+
+@legacy_app.get("/mean")
+def legacy_mean(data: list[float]) -> JSONResponse:
+    return JSONResponse({"result": sum(data) / len(data)})
+
+
+async def seconds_per_request(app, request: Request, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        response = await call(app, request)
+        best = min(best, time.perf_counter() - started)
+        assert response.status == 200, response.status
+    return best
+
+
+async def main(max_size: int) -> None:
+    print(f"{'size':>10} {'list[float]':>14} {'raw body':>14} {'speedup':>8}")
+    size = 10
+    while size <= max_size:
+        body = json.dumps([random.uniform(-1e6, 1e6) for _ in range(size)]).encode()
+        request = Request("GET", "/mean", body=body, headers=((b"content-type", b"application/json"),))
+        rounds = max(1, min(200, 1_000_000 // size))
+
+        legacy = await seconds_per_request(legacy_app, request, rounds)
+        current = await seconds_per_request(math_example.app, request, rounds)
+        print(f"{size:>10} {legacy * 1000:>11.3f} ms {current * 1000:>11.3f} ms {legacy / current:>7.1f}x")
+        size *= 10
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-size", type=int, default=10_000_000)
+    asyncio.run(main(parser.parse_args().max_size))
@@ -0,0 +1,93 @@
+"""Запросов в секунду через Router и через прежнюю цепочку if/elif.
+
+Приложения вызываются напрямую, без сервера и сети, так что измеряется только
+диспетчеризация и сборка ответа.
+
+Запуск: `python -m benchmarks.routing [--requests 50000]`
+"""
+
+import argparse
+import asyncio
+import time
+from http import HTTPStatus
+
+from lecture_1.hw import math_plain_asgi
+
+PATHS = [
+    ("GET", "/factorial", b"n=10"),
+    ("GET", "/fibonacci/10", b""),
+    ("GET", "/factorial", b"n=lol"),
+    ("GET", "/not_found", b""),
+    ("POST", "/not_found", b""),
+]
+
+
+async def legacy_not_found(send):
+    await send({
+        "type": "http.response.start",
+        "status": HTTPStatus.NOT_FOUND,
+        "headers": [(b"content-type", b"text/plain")],
+    })
+    await send({
+        "type": "http.response.body",
+        "body": b"Not Found",
+    })
+
+
+async def legacy_app(scope, receive, send):
+    """Диспетчеризация в том виде, в котором она была до Router."""
+    method = scope["method"]
+    path = scope["path"]
+
+    if method == "GET" and path == "/factorial":
+        await math_plain_asgi.factor(scope, receive, send)
+    elif method == "GET" and path.startswith("/fibonacci"):
+        parts = path.split("/")
+        scope["path_params"] = {"n": parts[2]} if len(parts) > 2 else {}
+        await math_plain_asgi.fib(scope, receive, send)
+    elif method == "POST" and path == "/mean":
+        await math_plain_asgi.mean(scope, receive, send)
+    else:
+        await legacy_not_found(send)
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def requests_per_second(app, requests: int, rounds: int = 5) -> float:
+    """Лучший результат из нескольких прогонов, чтобы сгладить шум."""
+    scopes = [
+        {"type": "http", "method": method, "path": path, "query_string": query}
+        for method, path, query in PATHS
+    ]
+
+    best = 0.0
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for i in range(requests):
+            await app(dict(scopes[i % len(scopes)]), receive, send)
+        best = max(best, requests / (time.perf_counter() - started))
+
+    return best
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50_000)
+    args = parser.parse_args()
+
+    legacy = await requests_per_second(legacy_app, args.requests)
+    routed = await requests_per_second(math_plain_asgi.app, args.requests)
+
+    print(f"{'dispatch':>10} {'rps':>12}")
+    print(f"{'if/elif':>10} {legacy:>12.0f}")
+    print(f"{'Router':>10} {routed:>12.0f} ({routed / legacy:.2f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
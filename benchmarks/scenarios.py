@@ -0,0 +1,126 @@
+"""Набор приложений репозитория и типичных запросов к ним."""
+
+import importlib
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from benchmarks.asgi import App, Request
+
+_ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass(frozen=True, slots=True)
+class Scenario:
+    name: str
+    load: Callable[[], App]
+    requests: list[Request]
+    # выполняются один раз перед замером, например чтобы наполнить хранилище
+    setup: list[Request] = field(default_factory=list)
+
+
+def _attr(module: str, name: str) -> Callable[[], App]:
+    return lambda: getattr(importlib.import_module(module), name)
+
+
+def _json(method: str, path: str, data: object, query_string: bytes = b"") -> Request:
+    return Request(
+        method,
+        path,
+        query_string=query_string,
+        body=json.dumps(data).encode(),
+        headers=((b"content-type", b"application/json"),),
+    )
+
+
+def _lecture_3_app() -> App:
+    # сервис лекции 3 импортирует пакет `demo_service` от корня lecture_3
+    sys.path.insert(0, str(_ROOT / "lecture_3"))
+    return importlib.import_module("demo_service.api").app
+
+
+def _lecture_4_app() -> App:
+    return importlib.import_module("lecture_4.demo_service.api.main").create_app()
+
+
+_ADMIN_AUTH = (b"authorization", b"Basic YWRtaW46c3VwZXJTZWNyZXRBZG1pblBhc3N3b3JkMTIz")
+
+SCENARIOS = [
+    Scenario(
+        "lecture_1.application",
+        _attr("lecture_1", "application"),
+        [Request("GET", "/"), Request("GET", "/missing")],
+    ),
+    Scenario(
+        "lecture_1.hw.math_plain_asgi",
+        _attr("lecture_1.hw.math_plain_asgi", "app"),
+        [
+            Request("GET", "/factorial", b"n=100"),
+            Request("GET", "/fibonacci/100"),
+            _json("POST", "/mean", [1, 2.5, 3, 4.5]),
+            Request("GET", "/factorial", b"n=lol"),
+            Request("GET", "/missing"),
+        ],
+    ),
+    Scenario(
+        "lecture_1.math_example",
+        _attr("lecture_1.math_example", "app"),
+        [
+            Request("GET", "/factorial", b"n=100"),
+            Request("GET", "/fibonacci/100"),
+            _json("GET", "/mean", [1, 2.5, 3, 4.5]),
+        ],
+    ),
+    Scenario(
+        "lecture_2.hw.shop_api",
+        _attr("lecture_2.hw.shop_api.main", "app"),
+        [
+            Request("GET", "/item/1"),
+            Request("GET", "/item", b"limit=10&min_price=10"),
+            Request("GET", "/cart/1"),
+            Request("GET", "/cart", b"limit=10"),
+            _json("POST", "/item", {"name": "item", "price": 10.0}),
+        ],
+        setup=[
+            *(_json("POST", "/item", {"name": f"item {i}", "price": 5.0 + i}) for i in range(100)),
+            *(Request("POST", "/cart") for _ in range(10)),
+            *(Request("POST", f"/cart/{1 + i % 10}/add/{1 + i}") for i in range(50)),
+        ],
+    ),
+    Scenario(
+        "lecture_2.rest_example",
+        _attr("lecture_2.rest_example.main", "app"),
+        [
+            Request("GET", "/pokemon/0"),
+            Request("GET", "/pokemon/", b"limit=10"),
+            _json("POST", "/pokemon/", {"name": "pikachu", "published": True}),
+        ],
+        setup=[_json("POST", "/pokemon/", {"name": f"pokemon {i}", "published": True}) for i in range(20)],
+    ),
+    Scenario(
+        "lecture_3.demo_service",
+        _lecture_3_app,
+        [
+            Request("POST", "/get-user", b"id=0"),
+            _json("POST", "/create-user", {"username": "user", "first_name": "a", "last_name": "b"}),
+        ],
+        setup=[_json("POST", "/create-user", {"username": "user", "first_name": "a", "last_name": "b"})],
+    ),
+    Scenario(
+        "lecture_4.demo_service",
+        _lecture_4_app,
+        [
+            Request("POST", "/user-get", b"id=1", headers=(_ADMIN_AUTH,)),
+            Request("POST", "/user-get", b"id=1"),
+        ],
+        setup=[
+            _json(
+                "POST",
+                "/user-register",
+                {"username": "bench", "name": "Bench", "birthdate": "2000-01-01T00:00:00", "password": "benchPassword123"},
+            )
+        ],
+    ),
+]
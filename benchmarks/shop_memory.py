@@ -0,0 +1,75 @@
+"""Память на товар и корзину в shop_api: прежние pydantic-модели против записей со __slots__.
+
+Прежнее хранилище - `Item` и `Cart` со списком `CartItem`, где у каждой позиции
+своя копия названия товара; нынешнее - `ItemRecord` и `CartRecord` с парами
+(id товара, количество). Считается прирост памяти по tracemalloc при создании
+`--count` товаров и стольких же корзин по `--lines` позиций (под tracemalloc
+это медленно, поэтому по умолчанию их меньше миллиона; итог пересчитывается
+на миллион).
+
+Запуск: `python -m benchmarks.shop_memory [--count 200000] [--lines 3]`
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+from typing import Callable
+
+from lecture_2.hw.shop_api.main import Cart, CartItem, Item
+from lecture_2.hw.shop_api.storage import CartRecord, ItemRecord
+
+
+def models(count: int, lines: int) -> tuple[dict, dict]:
+    items = {id: Item(id=id, name=f"item {id}", price=random.uniform(1, 1000)) for id in range(1, count + 1)}
+    carts = {}
+    for id in range(1, count + 1):
+        cart_items = []
+        for item_id in random.sample(range(1, count + 1), lines):
+            item = items[item_id]
+            cart_items.append(CartItem(id=item_id, name=item.name, quantity=1, available=True))
+        carts[id] = Cart(id=id, items=cart_items)
+    return items, carts
+
+
+def records(count: int, lines: int) -> tuple[dict, dict]:
+    items = {id: ItemRecord(id, f"item {id}", random.uniform(1, 1000)) for id in range(1, count + 1)}
+    carts = {}
+    for id in range(1, count + 1):
+        cart = CartRecord(id)
+        for item_id in random.sample(range(1, count + 1), lines):
+            cart.lines[item_id] = 1
+        carts[id] = cart
+    return items, carts
+
+
+def bytes_per_entity(build: Callable[[int, int], tuple[dict, dict]], count: int, lines: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        storage = build(count, lines)
+        gc.collect()
+        used, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del storage
+    # на одну сущность: товар плюс корзина считаются за две
+    return used / (2 * count)
+
+
+def main(count: int, lines: int) -> None:
+    random.seed(0)
+    legacy = bytes_per_entity(models, count, lines)
+    current = bytes_per_entity(records, count, lines)
+    print(f"{count} items + {count} carts x {lines} lines")
+    print(f"{'pydantic':>10} {legacy:>8.0f} B/entity {legacy * 1_000_000 / 2**20:>8.1f} MiB per million")
+    print(f"{'slots':>10} {current:>8.0f} B/entity {current * 1_000_000 / 2**20:>8.1f} MiB per million")
+    print(f"{'saving':>10} {legacy / current:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--lines", type=int, default=3)
+    args = parser.parse_args()
+    main(args.count, args.lines)
@@ -0,0 +1,65 @@
+"""Время старта shop_api с журналом и снимками: чтение снимка, хвост журнала, индексы.
+
+Каталог наполняется напрямую через `LogStorage`, без HTTP: `--items` товаров,
+каждая десятая - корзина на три позиции. Затем снимается снимок, в журнал
+дописывается `--tail` изменений и процесс как бы падает - журнал сброшен, но
+снимок после хвоста не снят. Замеряется `use_storage` нового хранилища.
+
+Запуск: `python -m benchmarks.shop_recovery [--items 1000000] [--tail 100000]`
+"""
+
+import argparse
+import random
+import tempfile
+import time
+
+from lecture_2.hw.shop_api import main as shop
+from lecture_2.hw.shop_api.oplog import LogStorage
+from lecture_2.hw.shop_api.storage import CartRecord, ItemRecord
+
+
+def fill(directory: str, count: int, tail: int) -> None:
+    storage = LogStorage(directory)
+    items, carts = storage.load()
+    for id in range(1, count + 1):
+        items[id] = ItemRecord(id, f"item {id}", random.uniform(1, 1000))
+        storage.save_item(items[id])
+    for id in range(1, count // 10 + 1):
+        carts[id] = cart = CartRecord(id)
+        storage.save_cart(cart)
+        for item_id in random.sample(range(1, count + 1), 3):
+            cart.lines[item_id] = 1
+            storage.save_line(cart, item_id)
+    storage.snapshot()
+
+    for _ in range(tail):
+        item = items[random.randint(1, count)]
+        item.price = random.uniform(1, 1000)
+        storage.save_item(item)
+    storage.flush()
+    # падение: без close, значит и без снимка при закрытии
+    storage._stop.set()
+
+
+def main(count: int, tail: int) -> None:
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        fill(directory, count, tail)
+        print(f"fill {count} items, {count // 10} carts, {tail} tail ops: {time.perf_counter() - started:.1f} s")
+
+        storage = LogStorage(directory)
+        started = time.perf_counter()
+        shop.use_storage(storage)
+        restarted = time.perf_counter() - started
+        storage.close()
+
+    print(f"restart with indexes: {restarted:.2f} s ({len(shop.items_db)} items, {len(shop.carts_db)} carts)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=1_000_000)
+    parser.add_argument("--tail", type=int, default=100_000)
+    args = parser.parse_args()
+    main(args.items, args.tail)
@@ -0,0 +1,59 @@
+"""shop_api в памяти против SQLite с отложенной записью: задержки на смеси чтений и записей.
+
+Запросы идут в процессе через `benchmarks.asgi`; для SQLite база создаётся во
+временном каталоге, а фоновый поток пишет в неё пачками, пока идёт замер.
+
+Запуск: `python -m benchmarks.shop_storage [--requests 20000]`
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+
+from benchmarks.asgi import Request, call, measure
+from benchmarks.scenarios import _json
+from lecture_2.hw.shop_api import main as shop
+from lecture_2.hw.shop_api.storage import MemoryStorage, SqliteStorage
+
+SETUP = [
+    *(_json("POST", "/item", {"name": f"item {i}", "price": 5.0 + i}) for i in range(100)),
+    *(Request("POST", "/cart") for _ in range(10)),
+]
+
+REQUESTS = [
+    Request("GET", "/item/1"),
+    Request("GET", "/cart/1"),
+    Request("GET", "/cart", b"limit=10&min_price=10"),
+    _json("POST", "/item", {"name": "item", "price": 10.0}),
+    _json("PATCH", "/item/2", {"price": 12.5}),
+    Request("POST", "/cart/3/add/4"),
+    Request("POST", "/cart"),
+]
+
+
+async def run(storage, count: int):
+    shop.use_storage(storage)
+    try:
+        for request in SETUP:
+            await call(shop.app, request)
+        return await measure(shop.app, REQUESTS, count)
+    finally:
+        storage.close()
+
+
+async def main(count: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        results = {
+            "memory": await run(MemoryStorage(), count),
+            "sqlite": await run(SqliteStorage(os.path.join(directory, "shop.db")), count),
+        }
+    for name, result in results.items():
+        print(f"{name:8} {result.rps:>9.0f} rps  p50 {result.p50_ms:.3f} ms  p99 {result.p99_ms:.3f} ms")
+    print(f"p99 sqlite / memory: {results['sqlite'].p99_ms / results['memory'].p99_ms:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20_000)
+    asyncio.run(main(parser.parse_args().requests))
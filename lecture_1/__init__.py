@@ -1,18 +1,16 @@
+from http import HTTPStatus
 from typing import Any, Awaitable, Callable
 
+from lecture_1.routing import Router, StaticResponse
+
+router = Router()
+router.add("GET", "/", StaticResponse(HTTPStatus.OK, b"Hello, world!"))
+
 
 async def application(
-    _: dict[str, Any],
-    __: Callable[[], Awaitable[dict[str, Any]]],
+    scope: dict[str, Any],
+    receive: Callable[[], Awaitable[dict[str, Any]]],
     send: Callable[[dict[str, Any]], Awaitable[None]],
 ) -> None:
-    await send(
-        {
-            "type": "http.response.start",
-            "status": 200,
-            "headers": [
-                [b"content-type", b"text/plain"],
-            ],
-        }
-    )
-    await send({"type": "http.response.body", "body": b"Hello, world!"})
+    if scope["type"] == "http":
+        await router(scope, receive, send)
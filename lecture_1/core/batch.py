@@ -0,0 +1,38 @@
+from typing import Any
+
+from lecture_1.core.factorial import factorials
+from lecture_1.core.fibonacci import fibonacci_pairs
+
+OPERATIONS = ("factorial", "fibonacci")
+
+
+def parse_batch(data: Any, max_size: int) -> list[tuple[str, int]]:
+    """Проверяет тело `[{"op": ..., "n": ...}, ...]`; ValueError - невалидный формат.
+
+    Отрицательные n пропускаются: их проверяет вызывающий, чтобы ответить 400.
+    """
+    if not isinstance(data, list) or len(data) > max_size:
+        raise ValueError("batch must be a list of operations")
+
+    operations = []
+    for item in data:
+        if not isinstance(item, dict) or item.keys() != {"op", "n"}:
+            raise ValueError("operation must have exactly 'op' and 'n'")
+        op, n = item["op"], item["n"]
+        if op not in OPERATIONS or not isinstance(n, int) or isinstance(n, bool):
+            raise ValueError("unknown operation or non-integer n")
+        operations.append((op, n))
+
+    return operations
+
+
+def compute_batch(operations: list[tuple[str, int]]) -> list[int]:
+    """Результаты в порядке запроса; одинаковые и соседние n считаются один раз."""
+    fibonacci = fibonacci_pairs(n for op, n in operations if op == "fibonacci")
+    factorial = factorials(n for op, n in operations if op == "factorial")
+
+    # как и GET /fibonacci/{n}, батч отдаёт F(n + 1)
+    return [
+        fibonacci[n][1] if op == "fibonacci" else factorial[n]
+        for op, n in operations
+    ]
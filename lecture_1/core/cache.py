@@ -0,0 +1,83 @@
+from collections import OrderedDict
+from typing import Hashable
+
+# меняется, если меняется формат или смысл закэшированных ответов
+ETAG_VERSION = "v1"
+
+
+class ByteBudgetLRU[_TKey: Hashable, _TVal]:
+    """LRU-кэш, ограниченный суммарным размером значений в байтах, а не числом записей."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+
+        self._entries: OrderedDict[_TKey, tuple[_TVal, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: _TKey) -> bool:
+        return key in self._entries
+
+    def get(self, key: _TKey) -> _TVal | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: _TKey, value: _TVal, size: int) -> bool:
+        """Кладёт значение в кэш; False, если оно больше всего бюджета."""
+        if size > self.max_bytes:
+            return False
+
+        if (previous := self._entries.pop(key, None)) is not None:
+            self.bytes -= previous[1]
+
+        self._entries[key] = (value, size)
+        self.bytes += size
+
+        while self.bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+
+        return True
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+def make_etag(*key: object) -> str:
+    """Сильный ETag из ключа: ответ математического API зависит только от параметров."""
+    return '"' + "-".join(map(str, (ETAG_VERSION, *key))) + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        # для If-None-Match сравнение слабое: префикс W/ не учитывается
+        if candidate.removeprefix("W/") == etag:
+            return True
+
+    return False
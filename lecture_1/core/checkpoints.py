@@ -0,0 +1,188 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+from functools import cache
+from pathlib import Path
+
+from lecture_1.core.factorial import range_product
+from lecture_1.core.fibonacci import fibonacci_pair as doubling_pair
+
+_MAGIC = b"MATHCKP2"
+# magic, шаг, число контрольных точек, blake2b всего, что после заголовка;
+# дальше смещения и сами числа
+_HEADER = struct.Struct("<8sQQ32s")
+_OFFSET = struct.Struct("<Q")
+# на каждую точку k хранятся F(k), F(k + 1) и k!
+_VALUES_PER_POINT = 3
+
+
+class CheckpointTable:
+    """F(k), F(k + 1) и k! для k = 0, step, 2 * step, ..., limit из отображённого в память файла.
+
+    Файл открывается только на чтение, поэтому все процессы хоста делят одни и
+    те же страницы page cache; числа декодируются из него при обращении.
+    Обрезанный или подменённый файл не проходит проверку в конструкторе
+    (ValueError), а не отдаёт неверные числа.
+    """
+
+    __slots__ = ("step", "count", "_mmap")
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._validate()
+        except (ValueError, struct.error):
+            self._mmap.close()
+            raise ValueError(f"{path} is not a valid checkpoint table") from None
+
+    def _validate(self) -> None:
+        magic, self.step, self.count, digest = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC or self.step <= 0 or self.count <= 0:
+            raise ValueError("bad header")
+        size = len(self._mmap)
+        offsets = self.count * _VALUES_PER_POINT + 1
+        data = _HEADER.size + offsets * _OFFSET.size
+        if data > size:
+            raise ValueError("truncated offsets")
+        # смещения идут подряд от конца таблицы смещений ровно до конца файла
+        previous = data
+        for index in range(offsets):
+            offset, = _OFFSET.unpack_from(self._mmap, _HEADER.size + index * _OFFSET.size)
+            if offset < previous or offset > size or (index == 0 and offset != data):
+                raise ValueError("bad offsets")
+            previous = offset
+        if previous != size:
+            raise ValueError("bad offsets")
+        if hashlib.blake2b(memoryview(self._mmap)[_HEADER.size :], digest_size=32).digest() != digest:
+            raise ValueError("checksum mismatch")
+
+    @property
+    def limit(self) -> int:
+        return self.step * (self.count - 1)
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def factorial(self, n: int) -> int:
+        if n < 0:
+            raise ValueError("n must be non-negative")
+
+        point = n // self.step
+        if point >= self.count:
+            return math.factorial(n)
+
+        k = point * self.step
+        return self._value(point, 2) * range_product(k + 1, n)
+
+    def fibonacci_pair(self, n: int) -> tuple[int, int]:
+        """(F(n), F(n + 1)) от ближайшей контрольной точки k <= n.
+
+        F(k + m) = F(k) * F(m + 1) + (F(k + 1) - F(k)) * F(m) и
+        F(k + m + 1) = F(k + 1) * F(m + 1) + F(k) * F(m), где m < step:
+        большие числа умножаются только на маленькие.
+        """
+        if n < 0:
+            raise ValueError("n must be non-negative")
+
+        point = n // self.step
+        if point >= self.count:
+            return doubling_pair(n)
+
+        return _advance(self._value(point, 0), self._value(point, 1), n - point * self.step)
+
+    def _value(self, point: int, index: int) -> int:
+        position = _HEADER.size + (point * _VALUES_PER_POINT + index) * _OFFSET.size
+        start, = _OFFSET.unpack_from(self._mmap, position)
+        end, = _OFFSET.unpack_from(self._mmap, position + _OFFSET.size)
+        return int.from_bytes(self._mmap[start:end], "little")
+
+
+def _advance(a: int, b: int, m: int) -> tuple[int, int]:
+    # (F(k), F(k + 1)) -> (F(k + m), F(k + m + 1))
+    fm, fm1 = doubling_pair(m)
+    return a * fm1 + (b - a) * fm, b * fm1 + a * fm
+
+
+def build(path: str | os.PathLike, step: int, limit: int) -> None:
+    """Считает таблицу и атомарно кладёт её в path.
+
+    Файл пишется рядом и переименовывается, так что воркеры, стартующие
+    одновременно, видят либо целую таблицу, либо никакой.
+    """
+    if step <= 0 or limit < 0:
+        raise ValueError("step must be positive and limit non-negative")
+
+    values = []
+    a, b, factorial = 0, 1, 1
+    for k in range(0, limit + 1, step):
+        if k:
+            # досчитываем от предыдущей точки, а не с нуля
+            a, b = _advance(a, b, step)
+            factorial *= range_product(k - step + 1, k)
+        values.extend((a, b, factorial))
+
+    encoded = [value.to_bytes((value.bit_length() + 7) // 8, "little") for value in values]
+    offsets_size = (len(encoded) + 1) * _OFFSET.size
+    offset = _HEADER.size + offsets_size
+
+    offsets = []
+    for chunk in encoded:
+        offsets.append(_OFFSET.pack(offset))
+        offset += len(chunk)
+    offsets.append(_OFFSET.pack(offset))
+    digest = hashlib.blake2b(digest_size=32)
+    for chunk in (*offsets, *encoded):
+        digest.update(chunk)
+
+    path = Path(path)
+    # каталог только для владельца: таблицу не должен подменить другой пользователь
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    fd, temporary = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(_HEADER.pack(_MAGIC, step, len(values) // _VALUES_PER_POINT, digest.digest()))
+            file.writelines(offsets)
+            file.writelines(encoded)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def load(path: str | os.PathLike, step: int, limit: int) -> CheckpointTable:
+    """Открывает таблицу, а если её нет, она повреждена или с другими параметрами - строит заново."""
+    try:
+        table = open_table(os.fspath(path))
+    except (OSError, ValueError):
+        table = None
+
+    if table is None or table.step != step or table.limit != limit // step * step:
+        open_table.cache_clear()
+        build(path, step, limit)
+        table = open_table(os.fspath(path))
+
+    return table
+
+
+@cache
+def open_table(path: str | os.PathLike) -> CheckpointTable:
+    """Одно отображение файла на процесс."""
+    return CheckpointTable(path)
+
+
+# функции верхнего уровня, чтобы их можно было отправить в пул процессов;
+# без таблицы (path=None) считается с нуля
+def factorial(path: str | None, n: int) -> int:
+    if path is None:
+        return math.factorial(n)
+    return open_table(path).factorial(n)
+
+
+def fibonacci_pair(path: str | None, n: int) -> tuple[int, int]:
+    if path is None:
+        return doubling_pair(n)
+    return open_table(path).fibonacci_pair(n)
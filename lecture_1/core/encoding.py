@@ -0,0 +1,159 @@
+import decimal
+from enum import IntEnum
+from typing import Iterable, Iterator
+
+
+class Base(IntEnum):
+    DECIMAL = 10
+    HEX = 16
+
+
+_CONTEXT = decimal.Context(
+    prec=decimal.MAX_PREC,
+    Emax=decimal.MAX_EMAX,
+    Emin=decimal.MIN_EMIN,
+    traps=[decimal.Inexact],
+)
+# до этого размера Decimal(n) быстрее, чем рекурсия
+_BINARY_LEAF_BITS = 128
+# размер куска десятичной записи, который отдаётся за раз
+_DECIMAL_CHUNK_DIGITS = 4096
+_HEX_CHUNK_BYTES = 32 * 1024
+# ~3900 цифр: такие числа быстрее и безопасно (лимит 4300) переводить через str()
+_SMALL_INT_BITS = 13_000
+
+
+def int_to_decimal(n: int) -> decimal.Decimal:
+    """Переводит int в Decimal делением пополам по битам.
+
+    n = hi * 2^k + lo, а умножение в libmpdec субквадратичное, поэтому перевод
+    не упирается ни в квадратичный int -> str, ни в лимит цифр Python 3.12.
+    """
+    powers: dict[int, decimal.Decimal] = {}
+
+    def power_of_two(width: int) -> decimal.Decimal:
+        if (result := powers.get(width)) is None:
+            if width <= _BINARY_LEAF_BITS:
+                result = _CONTEXT.power(2, width)
+            else:
+                half = width >> 1
+                result = _CONTEXT.multiply(power_of_two(half), power_of_two(width - half))
+            powers[width] = result
+        return result
+
+    def convert(value: int, width: int) -> decimal.Decimal:
+        if width <= _BINARY_LEAF_BITS:
+            return decimal.Decimal(value)
+        half = width >> 1
+        high = value >> half
+        low = value - (high << half)
+        return _CONTEXT.add(
+            _CONTEXT.multiply(convert(high, width - half), power_of_two(half)),
+            convert(low, half),
+        )
+
+    if n < 0:
+        return _CONTEXT.minus(convert(-n, (-n).bit_length()))
+    return convert(n, n.bit_length())
+
+
+def iter_decimal(n: int) -> Iterator[str]:
+    """Десятичная запись n кусками по ~4096 цифр, слева направо."""
+    if n < 0:
+        yield "-"
+        n = -n
+
+    if n.bit_length() <= _SMALL_INT_BITS:
+        yield str(n)
+        return
+
+    value = int_to_decimal(n)
+    yield from _decimal_chunks(value, value.adjusted() + 1, 0)
+
+
+def _decimal_chunks(value: decimal.Decimal, digits: int, width: int) -> Iterator[str]:
+    # width == 0 - старшая часть без ведущих нулей, иначе ровно width цифр
+    if digits <= _DECIMAL_CHUNK_DIGITS:
+        text = str(value)
+        yield text.zfill(width) if width else text
+        return
+
+    # деление на степень десяти в десятичном представлении - просто сдвиг
+    low_digits = digits // 2
+    high = value.scaleb(-low_digits, _CONTEXT).to_integral_value(decimal.ROUND_DOWN, _CONTEXT)
+    low = _CONTEXT.subtract(value, high.scaleb(low_digits, _CONTEXT))
+    yield from _decimal_chunks(high, digits - low_digits, width - low_digits if width else 0)
+    yield from _decimal_chunks(low, low_digits, low_digits)
+
+
+def iter_hex(n: int) -> Iterator[str]:
+    """Шестнадцатеричная запись n с префиксом 0x кусками, слева направо."""
+    if n < 0:
+        yield "-"
+        n = -n
+
+    yield "0x"
+    if n == 0:
+        yield "0"
+        return
+
+    raw = n.to_bytes((n.bit_length() + 7) // 8, "big")
+    with memoryview(raw) as view:
+        for start in range(0, len(raw), _HEX_CHUNK_BYTES):
+            chunk = view[start : start + _HEX_CHUNK_BYTES].hex()
+            yield chunk.lstrip("0") if start == 0 else chunk
+
+
+def iter_json_int(n: int, base: Base = Base.DECIMAL) -> Iterator[str]:
+    """Число как значение JSON кусками; в 16-ричном виде - строка."""
+    if base == Base.HEX:
+        yield '"'
+        yield from iter_hex(n)
+        yield '"'
+    else:
+        yield from iter_decimal(n)
+
+
+def iter_result_json(n: int, base: Base = Base.DECIMAL) -> Iterator[str]:
+    """Документ `{"result": ...}` кусками; в 16-ричном виде число отдаётся строкой."""
+    if base == Base.HEX:
+        yield '{"result": "'
+        yield from iter_hex(n)
+        yield '"}'
+    else:
+        yield '{"result": '
+        yield from iter_decimal(n)
+        yield "}"
+
+
+def iter_results_json(values: Iterable[int], base: Base = Base.DECIMAL) -> Iterator[str]:
+    """Документ `{"results": [...]}` кусками, по одному числу за раз."""
+    yield '{"results": ['
+    for index, value in enumerate(values):
+        if index:
+            yield ", "
+        yield from iter_json_int(value, base)
+    yield "]}"
+
+
+def iter_ndjson_results(first: int, values: Iterable[int], base: Base = Base.DECIMAL) -> Iterator[str]:
+    """NDJSON: строка `{"n": ..., "result": ...}` на каждое значение, n = first, first + 1, ..."""
+    for n, value in enumerate(values, first):
+        yield f'{{"n": {n}, "result": '
+        yield from iter_json_int(value, base)
+        yield "}\n"
+
+
+def join_pieces(pieces: Iterable[str], size: int) -> Iterator[str]:
+    """Склеивает мелкие куски в строки не короче size, чтобы не слать их по одному."""
+    buffer = []
+    buffered = 0
+    for piece in pieces:
+        buffer.append(piece)
+        buffered += len(piece)
+        if buffered >= size:
+            yield "".join(buffer)
+            buffer.clear()
+            buffered = 0
+    if buffer:
+        yield "".join(buffer)
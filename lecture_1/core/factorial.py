@@ -0,0 +1,77 @@
+import math
+from decimal import Context, Decimal
+from typing import Iterable
+
+# ниже этой длины отрезка последовательное умножение быстрее рекурсии
+_PRODUCT_LEAF = 16
+
+# до этого n факториал дешевле посчитать точно, дальше - ряд Стирлинга
+_EXACT_MAGNITUDE_LIMIT = 1_000
+# запас точности сверх длины n: дробная часть log10(n!) должна остаться точной
+_MAGNITUDE_GUARD_DIGITS = 40
+_PI = Decimal("3.14159265358979323846264338327950288419716939937510582097494459")
+# B(2k) / (2k * (2k - 1)) для k = 1..5; при n > 1000 следующий член меньше 1e-33
+_STIRLING_SERIES = tuple(
+    Decimal(numerator) / Decimal(denominator)
+    for numerator, denominator in ((1, 12), (-1, 360), (1, 1260), (-1, 1680), (1, 1188))
+)
+
+
+def range_product(low: int, high: int) -> int:
+    """Произведение low * (low + 1) * ... * high; 1 для пустого отрезка.
+
+    Отрезок делится пополам, чтобы перемножались числа сопоставимой длины:
+    так работает быстрое умножение больших int.
+    """
+    if high < low:
+        return 1
+    if high - low < _PRODUCT_LEAF:
+        return math.prod(range(low, high + 1))
+
+    middle = (low + high) // 2
+    return range_product(low, middle) * range_product(middle + 1, high)
+
+
+def factorials(ns: Iterable[int]) -> dict[int, int]:
+    """n! для всех n; каждый следующий получается из ближайшего меньшего."""
+    result = {}
+    previous_n, previous = 0, 1
+
+    for n in sorted(set(ns)):
+        previous *= range_product(previous_n + 1, n)
+        previous_n = n
+        result[n] = previous
+
+    return result
+
+
+def factorial_magnitude(n: int) -> dict[str, int | float]:
+    """Порядок n! без вычисления самого числа: n! ~ mantissa * 10 ** (digits - 1).
+
+    log10(n!) считается рядом Стирлинга в decimal с точностью, растущей с длиной
+    n, поэтому и число цифр, и ведущие цифры верны даже для n ~ 10^1000, где
+    float-значение math.lgamma уже теряет всю дробную часть.
+    """
+    if n < 0:
+        raise ValueError("n must be non-negative")
+
+    context = Context(prec=len(str(n)) + _MAGNITUDE_GUARD_DIGITS)
+    if n <= _EXACT_MAGNITUDE_LIMIT:
+        log10 = context.log10(Decimal(math.factorial(n)))
+    else:
+        x = Decimal(n)
+        ln = context.subtract(context.multiply(x, context.ln(x)), x)
+        ln = context.add(ln, context.ln(context.multiply(2 * _PI, x)) / 2)
+        power = x
+        square = context.multiply(x, x)
+        for coefficient in _STIRLING_SERIES:
+            ln = context.add(ln, context.divide(coefficient, power))
+            power = context.multiply(power, square)
+        log10 = context.divide(ln, context.ln(Decimal(10)))
+
+    exponent = int(log10)
+    return {
+        "digits": exponent + 1,
+        "log10": float(log10),
+        "mantissa": float(context.power(Decimal(10), log10 - exponent)),
+    }
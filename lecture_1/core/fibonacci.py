@@ -0,0 +1,89 @@
+import math
+from typing import Iterable, Iterator
+
+# при меньшем разрыве между соседними n дешевле досчитать сложениями
+_INCREMENTAL_GAP = 256
+# F(n) ~ phi^n / sqrt(5): десятичных цифр примерно n * log10(phi)
+_LOG10_PHI = math.log10((1 + math.sqrt(5)) / 2)
+# `{"n": ..., "result": }` и перевод строки вокруг числа в строке NDJSON
+_NDJSON_LINE_OVERHEAD = 20
+
+
+def fibonacci_pair(n: int) -> tuple[int, int]:
+    """Возвращает пару (F(n), F(n + 1)) методом быстрого удвоения за O(log n) шагов.
+
+    Используются тождества F(2k) = F(k) * (2F(k + 1) - F(k)) и
+    F(2k + 1) = F(k)^2 + F(k + 1)^2, биты n обходятся от старшего к младшему.
+    """
+    if n < 0:
+        raise ValueError("n must be non-negative")
+
+    a, b = 0, 1
+    for bit in bin(n)[2:]:
+        c = a * (2 * b - a)
+        d = a * a + b * b
+        if bit == "1":
+            a, b = d, c + d
+        else:
+            a, b = c, d
+
+    return a, b
+
+
+def fibonacci(n: int) -> int:
+    return fibonacci_pair(n)[0]
+
+
+def fibonacci_digits(n: int, mod: int | None = None) -> int:
+    """Верхняя оценка числа десятичных цифр F(n) (или остатка по модулю mod)."""
+    if mod is not None:
+        return len(str(mod - 1))
+    return int(n * _LOG10_PHI) + 1
+
+
+def fibonacci_range_size(low: int, high: int, mod: int | None = None) -> int:
+    """Верхняя оценка размера NDJSON со значениями F(low)..F(high) в десятичной записи."""
+    line = _NDJSON_LINE_OVERHEAD + len(str(high)) + fibonacci_digits(high, mod)
+    return (high - low + 1) * line
+
+
+def fibonacci_pairs(ns: Iterable[int]) -> dict[int, tuple[int, int]]:
+    """(F(n), F(n + 1)) для всех n.
+
+    n обходятся по возрастанию: близкие значения досчитываются сложениями от
+    предыдущего, а к далёким быстрее перейти удвоением с нуля.
+    """
+    result = {}
+    previous_n, a, b = 0, 0, 1
+
+    for n in sorted(set(ns)):
+        if n - previous_n <= _INCREMENTAL_GAP:
+            for _ in range(n - previous_n):
+                a, b = b, a + b
+        else:
+            a, b = fibonacci_pair(n)
+        previous_n = n
+        result[n] = (a, b)
+
+    return result
+
+
+def iter_fibonacci(
+    low: int,
+    high: int,
+    start: tuple[int, int] | None = None,
+    mod: int | None = None,
+) -> Iterator[int]:
+    """F(low), F(low + 1), ..., F(high) (по модулю mod, если он задан).
+
+    Быстрым методом считается только начальная пара (F(low), F(low + 1)) - её
+    можно передать готовой в start; дальше ряд продолжается сложениями, и в
+    памяти остаются лишь два соседних числа.
+    """
+    if low < 0:
+        raise ValueError("n must be non-negative")
+
+    a, b = start if start is not None else fibonacci_pair(low)
+    for _ in range(low, high + 1):
+        yield a
+        a, b = b, (a + b) % mod if mod else a + b
@@ -0,0 +1,54 @@
+from lecture_1.core import checkpoints
+from lecture_1.core.batch import compute_batch
+from lecture_1.core.encoding import Base, iter_json_int, iter_ndjson_results, iter_results_json
+from lecture_1.core.fibonacci import iter_fibonacci
+from lecture_1.core.modular import factorial_mod, fibonacci_pair_mod
+
+
+def evaluate(
+    op: str, n: int, mod: int | None = None, checkpoint_path: str | None = None, prime: bool | None = None
+) -> int:
+    """n! или F(n + 1), при заданном mod - по модулю; checkpoint_path - таблица опорных точек.
+
+    prime - уже посчитанный is_prime(mod), если он известен вызывающему.
+    """
+    if op == "factorial":
+        return checkpoints.factorial(checkpoint_path, n) if mod is None else factorial_mod(n, mod, prime)
+    # исторически API отдаёт F(n + 1): fib(0) == fib(1) == 1
+    _, result = checkpoints.fibonacci_pair(checkpoint_path, n) if mod is None else fibonacci_pair_mod(n, mod)
+    return result
+
+
+def evaluate_json(
+    op: str,
+    n: int,
+    mod: int | None,
+    checkpoint_path: str | None,
+    base: Base = Base.DECIMAL,
+    prime: bool | None = None,
+) -> str:
+    """Результат evaluate как значение JSON.
+
+    Перевод большого числа в десятичную запись дороже самого вычисления, поэтому
+    он делается там же, где вычисление, - в процессе пула, а не в event loop.
+    """
+    return "".join(iter_json_int(evaluate(op, n, mod, checkpoint_path, prime), base))
+
+
+def batch_json(operations: list[tuple[str, int]], base: Base = Base.DECIMAL) -> str:
+    """Документ `{"results": [...]}` для батча, целиком."""
+    return "".join(iter_results_json(compute_batch(operations), base))
+
+
+def fibonacci_range_ndjson(
+    low: int, high: int, mod: int | None, checkpoint_path: str | None, base: Base = Base.DECIMAL
+) -> str:
+    """NDJSON-строки `{"n": k, "result": F(k + 1)}` для k = low..high.
+
+    Один отрезок ответа /fibonacci?from=&to=: начинается со своей пары
+    F(low + 1), F(low + 2), поэтому отрезки можно считать независимо. Перевод
+    чисел в текст дороже сложений и делается здесь, в процессе пула.
+    """
+    start = checkpoints.fibonacci_pair(checkpoint_path, low + 1) if mod is None else fibonacci_pair_mod(low + 1, mod)
+    values = iter_fibonacci(low + 1, high + 1, start, mod)
+    return "".join(iter_ndjson_results(low, values, base))
@@ -0,0 +1,126 @@
+import re
+
+_WS = rb"[ \t\n\r]*"
+_VALUE = rb"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?|NaN|-?Infinity|true|false"
+# последовательность значений, каждое из которых закрыто запятой: "1, 2.5 ,3,"
+_VALUES = re.compile(rb"(?:%s(?:%s)%s,)*" % (_WS, _VALUE, _WS))
+_WS_CHARS = b" \t\n\r"
+# float() понимает и целые, но json.loads отдаёт для них int - повторяем это
+_NOT_INT_MARKERS = re.compile(rb"[.eENIft]")
+_SPECIAL_MARKERS = re.compile(rb"[NIft]")
+_FRACTION_WITH_EXPONENT = re.compile(rb"\.[0-9]+[eE]")
+
+_START, _VALUES_STATE, _END = range(3)
+
+
+def _to_number(token: bytes) -> int | float:
+    token = token.strip(_WS_CHARS)
+    if token == b"true":
+        return True
+    if token == b"false":
+        return False
+    if _NOT_INT_MARKERS.search(token):
+        return float(token)
+    return int(token)
+
+
+class StreamingMean:
+    """Инкрементальный разбор JSON-массива чисел со сворачиванием в сумму и количество.
+
+    Принимает тот же язык, что и `json.loads` + проверка на список int/float,
+    но хранит только незаконченный хвост последнего чанка, а не всё тело.
+    """
+
+    __slots__ = ("count", "total", "max_token_size", "_tail", "_state")
+
+    def __init__(self, max_token_size: int = 64 * 1024) -> None:
+        self.count = 0
+        self.total: int | float = 0
+        self.max_token_size = max_token_size
+
+        self._tail = b""
+        self._state = _START
+
+    def feed(self, chunk: bytes) -> None:
+        if self._state == _END:
+            if chunk.strip(_WS_CHARS):
+                raise ValueError("unexpected data after array")
+            return
+
+        data = self._tail + chunk if self._tail else chunk
+        self._tail = b""
+
+        if self._state == _START:
+            data = data.lstrip(_WS_CHARS)
+            if not data:
+                return
+            if data[0] != ord("["):
+                raise ValueError("body must be an array")
+            data = data[1:]
+            self._state = _VALUES_STATE
+
+        end = data.find(b"]")
+        if end != -1:
+            if data[end + 1 :].strip(_WS_CHARS):
+                raise ValueError("unexpected data after array")
+            self._fold_last(data[:end])
+            self._state = _END
+            return
+
+        cut = data.rfind(b",") + 1
+        self._fold(data[:cut])
+
+        # в хвосте остаётся начало следующего числа; пробелы ужимаем до одного,
+        # чтобы граница токена ("1 2" - ошибка) не потерялась
+        tail = data[cut:]
+        stripped = tail.strip(_WS_CHARS)
+        if stripped and tail[-1:] in (b" ", b"\t", b"\n", b"\r"):
+            stripped += b" "
+        if len(stripped) > self.max_token_size:
+            raise ValueError("number is too long")
+        self._tail = stripped
+
+    def result(self) -> float | None:
+        """Среднее значение или None для пустого массива."""
+        if self._state != _END:
+            raise ValueError("body is not a complete array")
+        if self.count == 0:
+            return None
+        return self.total / self.count
+
+    def _fold(self, segment: bytes) -> None:
+        if not segment:
+            return
+        if _VALUES.fullmatch(segment) is None:
+            raise ValueError("body must be an array of numbers")
+
+        tokens = segment.split(b",")
+        tokens.pop()
+        # sum с накопленным стартом сохраняет порядок сложения, как у sum(data)
+        if not _NOT_INT_MARKERS.search(segment):
+            self.total = sum(map(int, tokens), self.total)
+        elif self._only_floats(segment, len(tokens)):
+            self.total = sum(map(float, tokens), self.total)
+        else:
+            self.total = sum(map(_to_number, tokens), self.total)
+        self.count += len(tokens)
+
+    @staticmethod
+    def _only_floats(segment: bytes, size: int) -> bool:
+        # значения уже проверены регуляркой: в каждом не больше одной точки и одной
+        # экспоненты, так что дробные можно посчитать без разбора каждого токена
+        if _SPECIAL_MARKERS.search(segment):
+            return False
+        floats = segment.count(b".")
+        exponents = segment.count(b"e") + segment.count(b"E")
+        if exponents:
+            floats += exponents - len(_FRACTION_WITH_EXPONENT.findall(segment))
+        return floats == size
+
+    def _fold_last(self, segment: bytes) -> None:
+        if not segment.strip(_WS_CHARS):
+            # "[]" допустим, а "[1,]" - нет: после запятой должно идти значение
+            if self.count:
+                raise ValueError("trailing comma")
+            return
+        self._fold(segment + b",")
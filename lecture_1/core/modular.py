@@ -0,0 +1,102 @@
+import math
+
+# столько множителей перемножается как обычные int перед взятием остатка
+_SEGMENT = 64
+# детерминированный тест Миллера - Рабина для всех m < 3.3 * 10^24
+_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+# модули не больше этого: для них is_prime точен и занимает микросекунды
+MAX_MODULUS = 3 * 10**24
+
+
+def fibonacci_pair_mod(n: int, m: int) -> tuple[int, int]:
+    """(F(n) mod m, F(n + 1) mod m) за O(log n) умножений по модулю.
+
+    Это возведение матрицы [[1, 1], [1, 0]] в степень n, записанное через
+    тождества быстрого удвоения: у степеней этой матрицы всего два различных
+    элемента, поэтому хранить всю матрицу не нужно.
+    """
+    if n < 0:
+        raise ValueError("n must be non-negative")
+    if m < 1:
+        raise ValueError("m must be positive")
+
+    a, b = 0, 1 % m
+    for bit in bin(n)[2:]:
+        c = a * (2 * b - a) % m
+        d = (a * a + b * b) % m
+        if bit == "1":
+            a, b = d, (c + d) % m
+        else:
+            a, b = c, d
+
+    return a, b
+
+
+def factorial_mod(n: int, m: int, prime: bool | None = None) -> int:
+    """n! mod m.
+
+    При n >= m ответ 0, так как m делит n!. Иначе множители перемножаются
+    отрезками и произведение останавливается, как только остаток обнулился.
+    Для простого m и n > m / 2 считается короче через теорему Вильсона:
+    (m - 1)! = -1 (mod m), значит n! = -1 / ((n + 1) * ... * (m - 1)).
+    prime - уже известный is_prime(m), чтобы не проверять m повторно.
+    """
+    if n < 0:
+        raise ValueError("n must be non-negative")
+    if m < 1:
+        raise ValueError("m must be positive")
+    if n >= m:
+        return 0
+
+    if 2 * n > m and (is_prime(m) if prime is None else prime):
+        tail = _product_mod(n + 1, m - 1, m)
+        return -pow(tail, -1, m) % m
+
+    return _product_mod(1, n, m)
+
+
+def factorial_mod_cost(n: int, m: int, prime: bool | None = None) -> int:
+    """Сколько множителей придётся перебрать factorial_mod в худшем случае."""
+    if n >= m:
+        return 0
+    if 2 * n > m and (is_prime(m) if prime is None else prime):
+        return m - 1 - n
+    return n
+
+
+def is_prime(m: int) -> bool:
+    """Детерминированный тест для m <= MAX_MODULUS; для больших m - ValueError."""
+    if m > MAX_MODULUS:
+        raise ValueError("m is too large for a deterministic primality test")
+    if m < 2:
+        return False
+    for p in _WITNESSES:
+        if m % p == 0:
+            return m == p
+
+    d, s = m - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    for a in _WITNESSES:
+        x = pow(a, d, m)
+        if x in (1, m - 1):
+            continue
+        for _ in range(s - 1):
+            x = x * x % m
+            if x == m - 1:
+                break
+        else:
+            return False
+
+    return True
+
+
+def _product_mod(low: int, high: int, m: int) -> int:
+    result = 1 % m
+    for start in range(low, high + 1, _SEGMENT):
+        result = result * math.prod(range(start, min(start + _SEGMENT, high + 1))) % m
+        if result == 0:
+            break
+    return result
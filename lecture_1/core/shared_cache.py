@@ -0,0 +1,198 @@
+import fcntl
+import hashlib
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from typing import Iterator
+
+_MAGIC = b"SHMCACH2"
+# magic, ёмкость кольца данных, число корзин, позиция записи, попадания, промахи,
+# вытеснения
+_HEADER = struct.Struct("<8sQQQQQQ")
+# хэш ключа (0 - пустой слот), позиция записи в кольце, длины ключа и значения
+_SLOT = struct.Struct("<QQII")
+# слотов в корзине; при переполнении вытесняется самая старая запись корзины
+_WAYS = 4
+_ALIGN = 8
+
+
+class SharedResultCache:
+    """Кэш байтовых значений в именованном сегменте shared memory, общий для процессов хоста.
+
+    Данные пишутся в кольцевой буфер: новые записи затирают самые старые (FIFO),
+    а индекс - открытая хэш-таблица из корзин по _WAYS слотов - ссылается на
+    позиции в кольце. Запись, которую кольцо уже обогнало, считается удалённой.
+    Все операции идут под flock на файле в собственном каталоге приложения
+    lock_dir (между процессами) и под threading.Lock (между потоками одного
+    процесса: flock на общем дескрипторе их не различает). Заголовок уже
+    существующего сегмента сверяется с его размером; чужой или устаревший
+    сегмент с тем же именем пересоздаётся.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_bytes: int = 64 * 1024 * 1024,
+        buckets: int = 16_384,
+        lock_dir: str | None = None,
+    ) -> None:
+        self.name = name
+        self._thread_lock = threading.Lock()
+        lock_dir = lock_dir or _default_lock_dir()
+        os.makedirs(lock_dir, mode=0o700, exist_ok=True)
+        self._lock_path = os.path.join(lock_dir, f"{name}.lock")
+        # O_NOFOLLOW: подложенная вместо файла ссылка не откроется
+        descriptor = os.open(self._lock_path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        self._lock_file = os.fdopen(descriptor, "a+b")
+
+        with self._locked():
+            try:
+                self._shm = shared_memory.SharedMemory(name)
+            except FileNotFoundError:
+                self._shm = self._create(max_bytes, buckets)
+            else:
+                if not self._valid(self._shm):
+                    self._shm.unlink()
+                    self._shm.close()
+                    self._shm = self._create(max_bytes, buckets)
+            # сегмент переживает отдельные воркеры: его не должен удалять
+            # resource_tracker того процесса, который завершится первым
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+
+            self._buf = self._shm.buf
+            _, self.max_bytes, self._buckets, *_ = _HEADER.unpack_from(self._buf)
+
+        self._data = _HEADER.size + self._buckets * _WAYS * _SLOT.size
+        # одно значение не должно вытеснять больше восьмой части кольца
+        self.max_value_bytes = self.max_bytes // 8
+
+    def get(self, key: str) -> bytes | None:
+        encoded = key.encode()
+        key_hash = _hash(encoded)
+
+        with self._locked():
+            _, _, _, write_pos, hits, misses, _ = _HEADER.unpack_from(self._buf)
+            for slot in self._bucket(key_hash):
+                slot_hash, position, key_size, value_size = _SLOT.unpack_from(self._buf, slot)
+                if slot_hash != key_hash or position < write_pos - self.max_bytes:
+                    continue
+                if key_size + value_size > self.max_value_bytes:
+                    continue
+                start = self._data + position % self.max_bytes
+                if self._buf[start : start + key_size] != encoded:
+                    continue
+                self._set_counters(hits + 1, misses)
+                return bytes(self._buf[start + key_size : start + key_size + value_size])
+
+            self._set_counters(hits, misses + 1)
+            return None
+
+    def put(self, key: str, value: bytes) -> bool:
+        """Кладёт значение; False - если оно больше max_value_bytes."""
+        encoded = key.encode()
+        size = len(encoded) + len(value)
+        if size > self.max_value_bytes:
+            return False
+        key_hash = _hash(encoded)
+
+        with self._locked():
+            magic, capacity, buckets, position, hits, misses, evictions = _HEADER.unpack_from(self._buf)
+            # запись должна лежать в кольце непрерывно: хвост при необходимости пропускаем
+            offset = position % capacity
+            if offset + size > capacity:
+                position += capacity - offset
+            start = self._data + position % capacity
+            self._buf[start : start + len(encoded)] = encoded
+            self._buf[start + len(encoded) : start + size] = value
+            write_pos = position + (size + _ALIGN - 1) // _ALIGN * _ALIGN
+
+            # тот же ключ, пустой или устаревший слот, иначе - самый старый в корзине.
+            # Вытеснение считается, когда занимается слот другого ключа: и живого,
+            # и уже затёртого кольцом - так каждая потерянная запись учтена один раз
+            victim, victim_hash, victim_position = None, 0, None
+            for slot in self._bucket(key_hash):
+                slot_hash, slot_position, _, _ = _SLOT.unpack_from(self._buf, slot)
+                if slot_hash == key_hash or slot_hash == 0 or slot_position < write_pos - capacity:
+                    victim, victim_hash = slot, slot_hash
+                    break
+                if victim_position is None or slot_position < victim_position:
+                    victim, victim_hash, victim_position = slot, slot_hash, slot_position
+            if victim_hash not in (0, key_hash):
+                evictions += 1
+            _HEADER.pack_into(self._buf, 0, magic, capacity, buckets, write_pos, hits, misses, evictions)
+            _SLOT.pack_into(self._buf, victim, key_hash, position, len(encoded), len(value))
+            return True
+
+    def stats(self) -> dict[str, int | float]:
+        with self._locked():
+            _, _, _, write_pos, hits, misses, evictions = _HEADER.unpack_from(self._buf)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            "evictions": evictions,
+            "bytes_written": write_pos,
+            "max_bytes": self.max_bytes,
+        }
+
+    def close(self) -> None:
+        self._buf = None
+        self._shm.close()
+        self._lock_file.close()
+
+    def unlink(self) -> None:
+        """Удаляет сегмент для всех процессов; вызывать, когда кэш больше никому не нужен."""
+        self._shm.unlink()
+        try:
+            os.unlink(self._lock_path)
+        except FileNotFoundError:
+            pass
+
+    def _create(self, max_bytes: int, buckets: int) -> shared_memory.SharedMemory:
+        index_size = buckets * _WAYS * _SLOT.size
+        shm = shared_memory.SharedMemory(self.name, create=True, size=_HEADER.size + index_size + max_bytes)
+        # новый сегмент заполнен нулями: индекс уже пуст
+        _HEADER.pack_into(shm.buf, 0, _MAGIC, max_bytes, buckets, 0, 0, 0, 0)
+        return shm
+
+    @staticmethod
+    def _valid(shm: shared_memory.SharedMemory) -> bool:
+        """Заголовок наш и описывает раскладку, которая помещается в сегмент."""
+        if shm.size < _HEADER.size:
+            return False
+        magic, capacity, buckets, *_ = _HEADER.unpack_from(shm.buf)
+        return (
+            magic == _MAGIC
+            and capacity > 0
+            and buckets > 0
+            and _HEADER.size + buckets * _WAYS * _SLOT.size + capacity <= shm.size
+        )
+
+    def _bucket(self, key_hash: int) -> range:
+        first = _HEADER.size + key_hash % self._buckets * _WAYS * _SLOT.size
+        return range(first, first + _WAYS * _SLOT.size, _SLOT.size)
+
+    def _set_counters(self, hits: int, misses: int) -> None:
+        struct.pack_into("<QQ", self._buf, _HEADER.size - 24, hits, misses)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._thread_lock:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+
+def _default_lock_dir() -> str:
+    # не общий /tmp: там файл блокировки мог бы заранее создать другой пользователь
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "shared_result_cache")
+
+
+def _hash(key: bytes) -> int:
+    # hash() в каждом процессе свой, нужен стабильный; 0 зарезервирован под пустой слот
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little") | 1
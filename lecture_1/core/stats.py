@@ -0,0 +1,77 @@
+import json
+
+import numpy as np
+
+# форматы упакованных значений в теле application/octet-stream (little-endian)
+DTYPES = {
+    "float64": np.dtype("<f8"),
+    "int64": np.dtype("<i8"),
+}
+PERCENTILES = (25, 50, 75, 90, 99)
+# блоки по 1M значений (8 МБ float64) - временные массивы не растут с размером тела
+_BLOCK_SIZE = 1 << 20
+
+
+def from_packed(buffer: bytes | bytearray | memoryview, dtype: str) -> np.ndarray:
+    """Представление тела как массива без копирования; ValueError - не тот размер/формат."""
+    if dtype not in DTYPES:
+        raise ValueError("unknown dtype")
+    if len(buffer) % DTYPES[dtype].itemsize:
+        raise ValueError("body size is not a multiple of the item size")
+
+    return np.frombuffer(buffer, dtype=DTYPES[dtype])
+
+
+def mean_and_variance(values: np.ndarray) -> tuple[float, float]:
+    """Среднее и дисперсия за один проход по блокам (объединение по Чану)."""
+    count, mean, m2 = 0, 0.0, 0.0
+    for start in range(0, values.size, _BLOCK_SIZE):
+        block = values[start : start + _BLOCK_SIZE].astype(np.float64, copy=False)
+        block_mean = block.mean()
+        block_m2 = float(np.square(block - block_mean).sum())
+
+        total = count + block.size
+        delta = block_mean - mean
+        mean += delta * block.size / total
+        m2 += block_m2 + delta * delta * count * block.size / total
+        count = total
+
+    return float(mean), m2 / count
+
+
+def summarize(values: np.ndarray) -> dict[str, float | dict[str, float]]:
+    """Среднее, дисперсия, min/max и перцентили непустого массива."""
+    mean, variance = mean_and_variance(values)
+    # все уровни одним вызовом: одно разбиение массива вместо пяти
+    percentiles = np.percentile(values, PERCENTILES)
+
+    return {
+        "result": mean,
+        "count": int(values.size),
+        "variance": variance,
+        "min": values.min().item(),
+        "max": values.max().item(),
+        "percentiles": {
+            str(level): float(value) for level, value in zip(PERCENTILES, percentiles)
+        },
+    }
+
+
+def summarize_packed(buffer: bytes | bytearray, dtype: str, with_stats: bool) -> dict[str, float | dict] | None:
+    """Ответ /mean для упакованного тела: среднее или сводка summarize; None - тело пустое."""
+    values = from_packed(buffer, dtype)
+    if values.size == 0:
+        return None
+    if with_stats:
+        return summarize(values)
+    return {"result": float(values.mean(dtype=np.float64))}
+
+
+def summarize_json(body: bytes | bytearray) -> dict[str, float | dict] | None:
+    """summarize для JSON-массива чисел; ValueError - не массив чисел, None - массив пуст."""
+    data = json.loads(body)
+    if not isinstance(data, list) or not all(isinstance(x, (int, float)) for x in data):
+        raise ValueError("expected an array of numbers")
+    if not data:
+        return None
+    return summarize(np.asarray(data, dtype=np.float64))
@@ -0,0 +1,126 @@
+import asyncio
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+
+class AdmissionRejected(Exception):
+    """Отказ в допуске; retry_after None - запрос не уложится в бюджет никогда."""
+
+    def __init__(self, retry_after: int | None) -> None:
+        if retry_after is None:
+            super().__init__("request alone exceeds the slow lane budget")
+        else:
+            super().__init__(f"slow lane is full, retry after {retry_after} s")
+        self.retry_after = retry_after
+
+
+class Lane:
+    """Очередь с собственным бюджетом параллельности и учётом предсказанной работы."""
+
+    __slots__ = (
+        "concurrency",
+        "running",
+        "queued",
+        "pending_cost",
+        "admitted",
+        "rejected",
+        "total_wait",
+        "max_wait",
+        "_semaphore",
+    )
+
+    def __init__(self, concurrency: int) -> None:
+        self.concurrency = concurrency
+        self.running = 0
+        self.queued = 0
+        # сумма оценок (в секундах) для ждущих и выполняемых запросов
+        self.pending_cost = 0.0
+        self.admitted = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    @property
+    def backlog(self) -> float:
+        """Через сколько секунд освободится очередь, если оценки верны."""
+        return self.pending_cost / self.concurrency
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "concurrency": self.concurrency,
+            "running": self.running,
+            "queued": self.queued,
+            "backlog_seconds": self.backlog,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "wait_ms_avg": self.total_wait / self.admitted * 1000 if self.admitted else 0.0,
+            "wait_ms_max": self.max_wait * 1000,
+        }
+
+
+class AdmissionController:
+    """Разводит запросы по быстрой и медленной очереди по оценке их стоимости.
+
+    Дешёвые запросы не ждут за тяжёлыми: у каждой очереди свой лимит
+    одновременно выполняемых. Медленная очередь отказывает, если после
+    добавления запроса на её разбор уйдёт больше max_slow_backlog секунд.
+    Запрос, который сам по себе дольше max_slow_backlog, не принимается
+    даже в пустую очередь: повтор ему не поможет, и retry_after у отказа None
+    (приложение отвечает на такой отказ 400, а не 503).
+    """
+
+    def __init__(
+        self,
+        slow_threshold: float = 0.005,
+        fast_concurrency: int = 256,
+        slow_concurrency: int | None = None,
+        max_slow_backlog: float = 10.0,
+    ) -> None:
+        self.slow_threshold = slow_threshold
+        self.max_slow_backlog = max_slow_backlog
+        self.fast = Lane(fast_concurrency)
+        self.slow = Lane(slow_concurrency or os.cpu_count() or 1)
+
+    @asynccontextmanager
+    async def admit(self, cost: float) -> AsyncIterator[None]:
+        lane = self.slow if cost >= self.slow_threshold else self.fast
+        if cost > self.max_slow_backlog:
+            lane.rejected += 1
+            raise AdmissionRejected(None)
+        if (
+            lane is self.slow
+            and (lane.running or lane.queued)
+            and (lane.pending_cost + cost) / lane.concurrency > self.max_slow_backlog
+        ):
+            lane.rejected += 1
+            raise AdmissionRejected(max(1, math.ceil(lane.backlog)))
+
+        lane.queued += 1
+        lane.pending_cost += cost
+        started = time.perf_counter()
+        try:
+            await lane._semaphore.acquire()
+        except BaseException:
+            lane.queued -= 1
+            lane.pending_cost -= cost
+            raise
+
+        wait = time.perf_counter() - started
+        lane.queued -= 1
+        lane.running += 1
+        lane.admitted += 1
+        lane.total_wait += wait
+        lane.max_wait = max(lane.max_wait, wait)
+        try:
+            yield
+        finally:
+            lane.running -= 1
+            lane.pending_cost -= cost
+            lane._semaphore.release()
+
+    def stats(self) -> dict[str, dict[str, int | float]]:
+        return {"fast": self.fast.stats(), "slow": self.slow.stats()}
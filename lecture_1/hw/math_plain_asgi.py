@@ -1,31 +1,213 @@
+import asyncio
+import contextlib
 import json
-import math
+import os
 from http import HTTPStatus
+from pathlib import Path
 from urllib.parse import parse_qs
 
+from lecture_1.core import checkpoints
+from lecture_1.core.cache import ByteBudgetLRU, etag_matches, make_etag
+from lecture_1.core.batch import parse_batch
+from lecture_1.core.encoding import Base, join_pieces
+from lecture_1.core.fibonacci import fibonacci_digits, fibonacci_range_size
+from lecture_1.core.factorial import factorial_magnitude
+from lecture_1.core.jobs import batch_json, evaluate_json, fibonacci_range_ndjson
+from lecture_1.core.mean import StreamingMean
+from lecture_1.core.modular import MAX_MODULUS, factorial_mod_cost, is_prime
+from lecture_1.core.stats import summarize_json, summarize_packed
+from lecture_1.hw.admission import AdmissionController, AdmissionRejected
+from lecture_1.hw.offload import ComputeDispatcher, DispatcherOverloaded
+from lecture_1.routing import (
+    CONTENT_TOO_LARGE,
+    JSON_HEADERS,
+    NOT_FOUND,
+    SERVICE_UNAVAILABLE,
+    UNPROCESSABLE_ENTITY,
+    Router,
+    StaticResponse,
+    get_header,
+)
+
+# до этих порогов вычисление укладывается в ~1 мс и дешевле пересылки в процесс
+FACTORIAL_INLINE_LIMIT = 5_000
+FIBONACCI_INLINE_LIMIT = 50_000
+
+# n! mod m перебирает до min(n, m) множителей (~7 млн в секунду): мелкие
+# считаются на месте, совсем большие отклоняются, чтобы не упереться в таймаут
+MODULAR_FACTORIAL_INLINE_STEPS = 10_000
+MAX_MODULAR_FACTORIAL_STEPS = 50_000_000
+
+# approx=true: порядок n! за O(длина n); точность растёт с длиной n, поэтому
+# n длиннее ~100 цифр уходит в пул, а длиннее 1000 цифр - отклоняется
+APPROX_FACTORIAL_INLINE_LIMIT = 10**100
+MAX_APPROX_FACTORIAL = 10**1000
+
+# ответы, которые не кладутся в кэш, отдаются потоком по кускам такого размера
+STREAM_CHUNK_SIZE = 64 * 1024
+NDJSON_HEADERS = [(b"content-type", b"application/x-ndjson")]
+
+# готовые ответы /factorial и /fibonacci; один ответ не должен занимать больше
+# восьмой части бюджета, чтобы не вытеснять весь кэш разом
+RESULT_CACHE_BYTES = 64 * 1024 * 1024
+MAX_CACHED_BODY_BYTES = RESULT_CACHE_BYTES // 8
+
+# тела, которые читаются в память целиком, не больше этого; больше - 413
+MAX_BODY_BYTES = 64 * 1024 * 1024
+# упакованные значения /mean занимают ровно 8 байт на число, поэтому им свой,
+# больший лимит (по умолчанию 1 ГиБ - 128M float64); задаётся MATH_MAX_PACKED_BODY_BYTES
+MAX_PACKED_BODY_BYTES = int(os.environ.get("MATH_MAX_PACKED_BODY_BYTES") or 1024 * 1024 * 1024)
+# тела /mean больше этого разбираются и сводятся в пуле, а не в event loop
+STATS_INLINE_BYTES = 1024 * 1024
+
+# /fibonacci?from=a&to=b: не больше MAX_FIBONACCI_RANGE строк, иначе 400.
+# Ответ считается в пуле отрезками примерно по FIBONACCI_SEGMENT_BYTES текста,
+# так что в памяти не больше двух отрезков при любом размере диапазона
+MAX_FIBONACCI_RANGE = 100_000
+FIBONACCI_SEGMENT_BYTES = 1024 * 1024
+
+# батч из многих мелких операций тоже стоит унести из event loop
+MAX_BATCH_SIZE = 100_000
+BATCH_INLINE_SIZE = 1_000
+
+# websocket-канал: сколько запросов одного соединения считаются одновременно;
+# пока все слоты заняты, следующие сообщения не читаются
+WEBSOCKET_PATH = "/ws"
+MAX_WEBSOCKET_IN_FLIGHT = 64
+
+# грубая модель времени вычисления в секундах по замерам: умножение больших
+# int растёт как n^1.6 (Карацуба), n! mod m - линейно по числу множителей
+FACTORIAL_COST = 2e-9
+FIBONACCI_COST = 2e-11
+MODULAR_STEP_COST = 1.5e-7
+# строка диапазона /fibonacci: накладные плюс перевод числа в текст (~ цифр^1.2)
+FIBONACCI_LINE_COST = 1e-5
+FIBONACCI_ENCODE_COST = 4e-8
+
+# F(k), F(k + 1) и k! для каждого тысячного k: запросы досчитывают от ближайшей
+# точки; файл общий для всех воркеров хоста и строится при первом старте (~1 с).
+# Лежит в собственном каталоге приложения (0700), а не в общем /tmp;
+# путь можно задать через MATH_CHECKPOINT_PATH
+CHECKPOINT_PATH = Path(
+    os.environ.get("MATH_CHECKPOINT_PATH")
+    or Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "math_plain_asgi" / "checkpoints"
+)
+CHECKPOINT_STEP = 1_000
+CHECKPOINT_LIMIT = 100_000
+
+# путь к загруженной таблице; None - считаем с нуля
+checkpoint_path: str | None = None
+
+class BodyTooLarge(Exception):
+    pass
+
+
+dispatcher = ComputeDispatcher(max_pending=32, timeout=30.0)
+router = Router()
+cache = ByteBudgetLRU(max_bytes=RESULT_CACHE_BYTES)
+# запросы дороже 5 мс идут в медленную очередь с лимитом по числу процессов пула
+admission = AdmissionController(slow_threshold=0.005, max_slow_backlog=10.0)
+
+
 async def app(scope, receive, send):
+    global checkpoint_path
+
     if scope["type"] == "http":
-        method = scope["method"]
-        path = scope["path"]
-
-        if method == "GET" and path == "/factorial":
-            await factor(scope, receive, send)
-        elif method == "GET" and path.startswith("/fibonacci"):
-            await fib(scope, receive, send)
-        elif method == "POST" and path == "/mean":
-            await mean(scope, receive, send)
-        else:
-            await not_found(send)
+        await router(scope, receive, send)
+    elif scope["type"] == "websocket":
+        await websocket(scope, receive, send)
     elif scope["type"] == "lifespan":
         while True:
             message = await receive()
             if message["type"] == "lifespan.startup":
+                # таблица открывается до пула, чтобы воркеры унаследовали отображение
+                try:
+                    checkpoints.load(CHECKPOINT_PATH, CHECKPOINT_STEP, CHECKPOINT_LIMIT)
+                    checkpoint_path = str(CHECKPOINT_PATH)
+                except OSError:
+                    checkpoint_path = None
+                dispatcher.start()
                 await send({"type": "lifespan.startup.complete"})
             elif message["type"] == "lifespan.shutdown":
+                dispatcher.shutdown()
+                checkpoint_path = None
                 await send({"type": "lifespan.shutdown.complete"})
                 return
 
+# много запросов по одному соединению: {"id": ..., "op": "fibonacci", "n": 10}
+# с необязательными base и mod; ответы {"id": ..., "result": ...} или
+# {"id": ..., "error": ...} уходят по мере готовности, а не по порядку
+async def websocket(scope, receive, send):
+    message = await receive()
+    if message["type"] != "websocket.connect":
+        return
+    if scope["path"] != WEBSOCKET_PATH:
+        # закрытие до accept сервер превращает в 403
+        await send({"type": "websocket.close", "code": 1008})
+        return
+    await send({"type": "websocket.accept"})
+
+    slots = asyncio.Semaphore(MAX_WEBSOCKET_IN_FLIGHT)
+    send_lock = asyncio.Lock()
+    tasks = set()
+
+    async def handle(text):
+        try:
+            reply = await websocket_reply(text)
+            async with send_lock:
+                await send({"type": "websocket.send", "text": reply})
+        finally:
+            slots.release()
+
+    try:
+        while True:
+            await slots.acquire()
+            message = await receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            task = asyncio.create_task(handle(message.get("text") or message.get("bytes") or b""))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    finally:
+        # ответы отключившемуся клиенту уже некуда отправить
+        for task in tasks:
+            task.cancel()
+
+async def websocket_reply(text):
+    request_id = None
+    try:
+        request = json.loads(text)
+        if not isinstance(request, dict):
+            raise ValueError("request must be an object")
+        request_id = request.get("id")
+        op, n, mod = request.get("op"), request.get("n"), request.get("mod")
+        if op not in ("factorial", "fibonacci") or type(n) is not int:
+            raise ValueError("invalid op or n")
+        if mod is not None and (type(mod) is not int or not 1 <= mod <= MAX_MODULUS):
+            raise ValueError("invalid mod")
+        base = Base(request.get("base", Base.DECIMAL))
+    except ValueError:
+        return json.dumps({"id": request_id, "error": "Unprocessable Entity"})
+
+    if n < 0:
+        return json.dumps({"id": request_id, "error": "Неверное значение, должно быть неотрицательным"})
+    prime = is_prime(mod) if op == "factorial" and mod is not None else None
+    if prime is not None and factorial_mod_cost(n, mod, prime) > MAX_MODULAR_FACTORIAL_STEPS:
+        return json.dumps({"id": request_id, "error": "Слишком большое n для такого mod"})
+
+    try:
+        result = await compute(op, n, mod, base, prime)
+    except AdmissionRejected as error:
+        if error.retry_after is None:
+            return json.dumps({"id": request_id, "error": "Слишком большое n"})
+        return json.dumps({"id": request_id, "error": "Service Unavailable", "retry_after": error.retry_after})
+    except (DispatcherOverloaded, TimeoutError):
+        return json.dumps({"id": request_id, "error": "Service Unavailable"})
+
+    return "".join(('{"id": ', json.dumps(request_id), ', "result": ', result, "}"))
+
 # получаем строку и вычисляем факториал
+@router.route("GET", "/factorial")
 async def factor(scope, receive, send):
     query_string = scope.get("query_string", b"").decode()
     query_params = parse_qs(query_string)
@@ -44,20 +226,161 @@ async def factor(scope, receive, send):
     if n < 0:
         await bad_request(send, "Неверное значение, должно быть неотрицательным")
         return
+    base = parse_base(query_params)
+    if base is None:
+        await unprocessable_entity(send)
+        return
+    try:
+        mod = parse_mod(query_params)
+    except ValueError:
+        await unprocessable_entity(send)
+        return
+    approx = parse_flag(query_params, "approx")
+    if approx is None or (approx and mod is not None):
+        await unprocessable_entity(send)
+        return
+    if approx:
+        await approx_factorial(send, n)
+        return
+    # простота mod проверяется один раз на запрос, дальше результат передаётся
+    prime = is_prime(mod) if mod is not None else None
+    if mod is not None and factorial_mod_cost(n, mod, prime) > MAX_MODULAR_FACTORIAL_STEPS:
+        await bad_request(send, "Слишком большое n для такого mod")
+        return
+    key = ("factorial", int(base), n) if mod is None else ("factorial", int(base), n, mod)
+    if await cached_response(scope, send, key):
+        return
     # если ок - 200 и json
-    result = math.factorial(n)
-    await json_response(send, {"result": result})
+    try:
+        result = await compute("factorial", n, mod, base, prime)
+    except AdmissionRejected as error:
+        await admission_rejected(send, error)
+        return
+    except (DispatcherOverloaded, TimeoutError):
+        await service_unavailable(send)
+        return
+    await int_response(send, result, key)
+
+# /fibonacci?from=a&to=b: NDJSON-строки {"n": k, "result": ...} для k = a..b;
+# сложения дёшевы, но перевод каждого числа в текст - нет, поэтому ответ
+# считается в пуле отрезками, каждый от своей начальной пары: пока один
+# отрезок отправляется, следующий уже считается. Допуск учитывает весь диапазон
+async def fibonacci_range(scope, send):
+    query_params = parse_qs(scope.get("query_string", b"").decode())
+    try:
+        low, high = int(query_params["from"][0]), int(query_params["to"][0])
+        mod = parse_mod(query_params)
+    except (KeyError, ValueError):
+        await unprocessable_entity(send)
+        return
+    base = parse_base(query_params)
+    if base is None:
+        await unprocessable_entity(send)
+        return
+    if low < 0:
+        await bad_request(send, "Неверное значение, должно быть неотрицательным")
+        return
+    if high < low:
+        await bad_request(send, "Неверный диапазон, from больше to")
+        return
+    if high - low >= MAX_FIBONACCI_RANGE:
+        await bad_request(send, "Слишком большой диапазон")
+        return
+
+    first = None
+    try:
+        async with admission.admit(estimate_range_cost(low, high, mod)):
+            async with contextlib.aclosing(fibonacci_segments(low, high, mod, base)) as segments:
+                # первый отрезок - до заголовков, чтобы отказ пула ещё мог стать 503
+                first = await anext(segments)
+                await send({"type": "http.response.start", "status": HTTPStatus.OK, "headers": NDJSON_HEADERS})
+                await send_text(send, first)
+                async for segment in segments:
+                    await send_text(send, segment)
+                await send({"type": "http.response.body", "body": b""})
+    except AdmissionRejected as error:
+        await admission_rejected(send, error)
+    except (DispatcherOverloaded, TimeoutError):
+        # после начала ответа статус уже не поменять: исключение уходит серверу,
+        # и тот обрывает соединение, так что клиент видит неполный ответ
+        if first is not None:
+            raise
+        await service_unavailable(send)
+
+async def fibonacci_segments(low, high, mod, base):
+    # исторически API отдаёт F(n + 1), поэтому ряд - F(from + 1)..F(to + 1);
+    # длина отрезка - по самой длинной, последней строке диапазона
+    line_size = fibonacci_range_size(high + 1, high + 1, mod)
+    step = max(1, FIBONACCI_SEGMENT_BYTES // line_size)
+
+    def schedule(first):
+        last = min(first + step - 1, high)
+        heavy = first > FIBONACCI_INLINE_LIMIT or (last - first + 1) * line_size > STREAM_CHUNK_SIZE
+        return asyncio.ensure_future(
+            dispatcher.run(fibonacci_range_ndjson, first, last, mod, checkpoint_path, base, heavy=heavy)
+        )
+
+    starts = iter(range(low, high + 1, step))
+    pending = schedule(next(starts))
+    try:
+        for start in starts:
+            segment = await pending
+            pending = schedule(start)
+            yield segment
+        yield await pending
+    finally:
+        pending.cancel()
+
+async def send_text(send, text):
+    for chunk in iter_slices(text, STREAM_CHUNK_SIZE):
+        await send({"type": "http.response.body", "body": chunk.encode(), "more_body": True})
+
+# общий для HTTP и websocket путь: очередь допуска, затем диспетчер;
+# результат - уже готовое значение JSON, чтобы большое число переводилось
+# в текст в процессе пула, а не в event loop. prime - is_prime(mod) для
+# факториала по модулю, если обработчик его уже посчитал
+async def compute(op, n, mod=None, base=Base.DECIMAL, prime=None):
+    if op == "factorial" and mod is not None and prime is None:
+        prime = is_prime(mod)
+    async with admission.admit(estimate_cost(op, n, mod, prime)):
+        return await dispatcher.run(
+            evaluate_json, op, n, mod, checkpoint_path, base, prime, heavy=is_heavy(op, n, mod, prime)
+        )
 
-# Фибоначчи
+def is_heavy(op, n, mod=None, prime=None):
+    if op == "factorial":
+        if mod is None:
+            return n > FACTORIAL_INLINE_LIMIT
+        return factorial_mod_cost(n, mod, prime) > MODULAR_FACTORIAL_INLINE_STEPS
+    # F(n) по модулю - O(log n) умножений небольших чисел, всегда на месте
+    return mod is None and n > FIBONACCI_INLINE_LIMIT
+
+# только порядок n!: число цифр, log10 и ведущие цифры
+async def approx_factorial(send, n):
+    if n >= MAX_APPROX_FACTORIAL:
+        await bad_request(send, "Слишком большое n")
+        return
+    try:
+        result = await dispatcher.run(
+            factorial_magnitude, n, heavy=n > APPROX_FACTORIAL_INLINE_LIMIT
+        )
+    except (DispatcherOverloaded, TimeoutError):
+        await service_unavailable(send)
+        return
+    await json_response(send, result)
+
+# Фибоначчи; без n в пути - 422
+@router.route("GET", "/fibonacci")
+@router.route("GET", "/fibonacci/{n}")
 async def fib(scope, receive, send):
     #извлекаем параметр 'n' из пути
-    parts = scope["path"].split("/")
-    if len(parts) < 3:
-        await unprocessable_entity(send)
+    n_value = scope["path_params"].get("n")
+    if n_value is None:
+        await fibonacci_range(scope, send)
         return
 
     try:
-        n = int(parts[2])
+        n = int(n_value)
     except ValueError:
         # если нет - 422
         await unprocessable_entity(send)
@@ -67,82 +390,350 @@ async def fib(scope, receive, send):
         await bad_request(send, "Неверное значение, должно быть неотрицательным")
         return
 
-    a, b = 0, 1
-    for _ in range(n):
-        a, b = b, a + b
+    query_params = parse_qs(scope.get("query_string", b"").decode())
+    base = parse_base(query_params)
+    if base is None:
+        await unprocessable_entity(send)
+        return
+    try:
+        mod = parse_mod(query_params)
+    except ValueError:
+        await unprocessable_entity(send)
+        return
+    key = ("fibonacci", int(base), n) if mod is None else ("fibonacci", int(base), n, mod)
+    if await cached_response(scope, send, key):
+        return
 
-    await json_response(send, {"result": b})
+    try:
+        result = await compute("fibonacci", n, mod, base)
+    except AdmissionRejected as error:
+        await admission_rejected(send, error)
+        return
+    except (DispatcherOverloaded, TimeoutError):
+        await service_unavailable(send)
+        return
+    await int_response(send, result, key)
 
 
+@router.route("POST", "/mean")
 async def mean(scope, receive, send):
-    body = await get_request_body(receive)
+    query_params = parse_qs(scope.get("query_string", b"").decode())
+    with_stats = parse_flag(query_params, "stats")
+    if with_stats is None:
+        await unprocessable_entity(send)
+        return
+
+    content_type = (get_header(scope, b"content-type") or "").partition(";")[0].strip()
+    if content_type == "application/octet-stream":
+        await packed_mean(scope, receive, send, query_params, with_stats)
+    elif with_stats:
+        await json_stats(receive, send)
+    else:
+        await streaming_mean(receive, send)
+
+async def streaming_mean(receive, send):
+    # тело разбирается по мере поступления чанков: в памяти только сумма и счётчик
+    parser = StreamingMean()
     try:
-        data = json.loads(body)
-        if not isinstance(data, list) or not all(isinstance(x, (int, float)) for x in data):
-            raise ValueError
-    except (json.JSONDecodeError, ValueError):
+        more_body = True
+        while more_body:
+            message = await receive()
+            parser.feed(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        result = parser.result()
+    except ValueError:
         await unprocessable_entity(send)
         return
 
-    if not data:
+    if result is None:
         await bad_request(send, "Неверное значение, должно быть массивом")
         return
 
-    result = sum(data) / len(data)
     await json_response(send, {"result": result})
 
-async def get_request_body(receive):
-    body = b""
+# тело - упакованные float64/int64, читаются через np.frombuffer без копирования;
+# большое тело сводится в пуле процессов
+async def packed_mean(scope, receive, send, query_params, with_stats):
+    content_length = get_header(scope, b"content-length")
+    dtype = query_params.get("dtype", ["float64"])[0]
+    try:
+        body = await read_body(receive, int(content_length) if content_length else None, MAX_PACKED_BODY_BYTES)
+        result = await dispatcher.run(
+            summarize_packed, body, dtype, with_stats, heavy=len(body) > STATS_INLINE_BYTES
+        )
+    except BodyTooLarge:
+        await content_too_large(send)
+        return
+    except ValueError:
+        await unprocessable_entity(send)
+        return
+    except (DispatcherOverloaded, TimeoutError):
+        await service_unavailable(send)
+        return
+
+    if result is None:
+        await bad_request(send, "Неверное значение, должно быть массивом")
+        return
+    await json_response(send, result)
+
+# статистике нужны все значения, поэтому JSON здесь разбирается целиком -
+# для большого тела в пуле, вместе с проверкой и перцентилями
+async def json_stats(receive, send):
+    try:
+        body = await read_body(receive)
+        result = await dispatcher.run(summarize_json, body, heavy=len(body) > STATS_INLINE_BYTES)
+    except BodyTooLarge:
+        await content_too_large(send)
+        return
+    except ValueError:
+        await unprocessable_entity(send)
+        return
+    except (DispatcherOverloaded, TimeoutError):
+        await service_unavailable(send)
+        return
+
+    if result is None:
+        await bad_request(send, "Неверное значение, должно быть массивом")
+        return
+    await json_response(send, result)
+
+def parse_flag(query_params, name):
+    value = query_params.get(name, ["false"])[0].lower()
+    if value in ("true", "1"):
+        return True
+    if value in ("false", "0"):
+        return False
+    return None
+
+# основание системы счисления для ответа: 10 (по умолчанию) или 16
+def parse_base(query_params):
+    values = query_params.get("base")
+    if not values:
+        return Base.DECIMAL
+    try:
+        return Base(int(values[0]))
+    except ValueError:
+        return None
+
+# оценка времени вычисления для очереди допуска
+def estimate_cost(op, n, mod=None, prime=None):
+    if mod is not None:
+        return factorial_mod_cost(n, mod, prime) * MODULAR_STEP_COST if op == "factorial" else 0.0
+    coefficient = FACTORIAL_COST if op == "factorial" else FIBONACCI_COST
+    # ограничение не даёт float переполниться на огромных n
+    return coefficient * float(min(n, 10**100)) ** 1.6
+
+# первая пара плюс перевод в текст каждой строки; цифры - по последнему,
+# самому длинному числу диапазона
+def estimate_range_cost(low, high, mod=None):
+    digits = fibonacci_digits(high + 1, mod)
+    line_cost = FIBONACCI_LINE_COST + FIBONACCI_ENCODE_COST * digits**1.2
+    return estimate_cost("fibonacci", low + 1, mod) + (high - low + 1) * line_cost
+
+# модуль для ответа по модулю; None - без него, ValueError - не целое
+# от 1 до MAX_MODULUS (выше тест простоты перестаёт быть точным)
+def parse_mod(query_params):
+    values = query_params.get("mod")
+    if not values:
+        return None
+    mod = int(values[0])
+    if not 1 <= mod <= MAX_MODULUS:
+        raise ValueError("mod out of range")
+    return mod
+
+# несколько операций за один запрос: [{"op": "factorial", "n": 5}, ...]
+@router.route("POST", "/batch")
+async def batch(scope, receive, send):
+    base = parse_base(parse_qs(scope.get("query_string", b"").decode()))
+    try:
+        if base is None:
+            raise ValueError
+        operations = parse_batch(json.loads(await read_body(receive)), MAX_BATCH_SIZE)
+    except BodyTooLarge:
+        await content_too_large(send)
+        return
+    except ValueError:
+        await unprocessable_entity(send)
+        return
+
+    if any(n < 0 for _, n in operations):
+        await bad_request(send, "Неверное значение, должно быть неотрицательным")
+        return
+
+    heavy = len(operations) > BATCH_INLINE_SIZE or any(
+        n > (FACTORIAL_INLINE_LIMIT if op == "factorial" else FIBONACCI_INLINE_LIMIT)
+        for op, n in operations
+    )
+    cost = sum(estimate_cost(op, n) for op, n in operations)
+    try:
+        async with admission.admit(cost):
+            body = await dispatcher.run(batch_json, operations, base, heavy=heavy)
+    except AdmissionRejected as error:
+        await admission_rejected(send, error)
+        return
+    except (DispatcherOverloaded, TimeoutError):
+        await service_unavailable(send)
+        return
+
+    await stream_json(send, iter_slices(body, STREAM_CHUNK_SIZE))
+
+# при известном content-length тело пишется в заранее выделенный буфер;
+# тело больше limit (по умолчанию MAX_BODY_BYTES) - BodyTooLarge, причём по
+# content-length - ещё до чтения
+async def read_body(receive, size=None, limit=None):
+    limit = MAX_BODY_BYTES if limit is None else limit
+    if size is None:
+        chunks = []
+        received = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunk = message.get("body", b"")
+            received += len(chunk)
+            if received > limit:
+                raise BodyTooLarge
+            chunks.append(chunk)
+            more_body = message.get("more_body", False)
+        return b"".join(chunks)
+
+    if size < 0:
+        raise ValueError("negative content-length")
+    if size > limit:
+        raise BodyTooLarge
+    buffer = bytearray(size)
+    received = 0
     more_body = True
-    while more_body:
-        message = await receive()
-        body += message.get("body", b"")
-        more_body = message.get("more_body", False)
-    return body.decode()
+    with memoryview(buffer) as view:
+        while more_body:
+            message = await receive()
+            chunk = message.get("body", b"")
+            if received + len(chunk) > size:
+                raise ValueError("body is longer than content-length")
+            view[received : received + len(chunk)] = chunk
+            received += len(chunk)
+            more_body = message.get("more_body", False)
+    if received != size:
+        raise ValueError("body is shorter than content-length")
+    return buffer
 
-async def json_response(send, data, status=HTTPStatus.OK):
-    response_body = json.dumps(data).encode()
+# глубина очередей допуска и время ожидания в них
+@router.route("GET", "/admission/stats")
+async def admission_stats(scope, receive, send):
+    await json_response(send, admission.stats())
+
+@router.route("GET", "/cache/stats")
+async def cache_stats(scope, receive, send):
+    await json_response(send, cache.stats())
+
+# 304 по If-None-Match или готовый ответ из кэша; False - нужно считать
+async def cached_response(scope, send, key):
+    etag = make_etag(*key)
+    if etag_matches(get_header(scope, b"if-none-match"), etag):
+        await send({
+            "type": "http.response.start",
+            "status": HTTPStatus.NOT_MODIFIED,
+            "headers": [(b"etag", etag.encode())],
+        })
+        await send({"type": "http.response.body", "body": b""})
+        return True
+
+    response = cache.get(key)
+    if response is None:
+        return False
+    await response.send_to(send)
+    return True
+
+# value - готовое значение JSON (десятичная запись или строка "0x...")
+async def int_response(send, value, cache_key=None):
+    etag_headers = () if cache_key is None else ((b"etag", make_etag(*cache_key).encode()),)
+
+    if cache_key is None or len(value) > MAX_CACHED_BODY_BYTES:
+        pieces = ('{"result": ', *iter_slices(value, STREAM_CHUNK_SIZE), "}")
+        await stream_json(send, pieces, etag_headers)
+        return
+
+    body = b"".join((b'{"result": ', value.encode(), b"}"))
+    response = StaticResponse(HTTPStatus.OK, body, b"application/json", etag_headers)
+    cache.put(cache_key, response, len(body))
+    await response.send_to(send)
+
+def iter_slices(text, size):
+    for start in range(0, len(text), size):
+        yield text[start : start + size]
+
+async def stream_json(send, pieces, headers=(), content_headers=JSON_HEADERS):
+    # большой ответ кодируется по частям и уходит несколькими сообщениями
     await send({
         "type": "http.response.start",
-        "status": status,
-        "headers": [
-            (b"content-type", b"application/json"),
-        ],
+        "status": HTTPStatus.OK,
+        "headers": [*content_headers, *headers],
     })
+    # последний кусок уходит без more_body, поэтому отправка отстаёт на один
+    chunks = join_pieces(pieces, STREAM_CHUNK_SIZE)
+    previous = next(chunks, "")
+    for chunk in chunks:
+        await send({
+            "type": "http.response.body",
+            "body": previous.encode(),
+            "more_body": True,
+        })
+        previous = chunk
     await send({
         "type": "http.response.body",
-        "body": response_body,
+        "body": previous.encode(),
     })
 
-async def not_found(send):
+async def json_response(send, data, status=HTTPStatus.OK):
+    response_body = json.dumps(data).encode()
     await send({
         "type": "http.response.start",
-        "status": HTTPStatus.NOT_FOUND,
-        "headers": [(b"content-type", b"text/plain")],
+        "status": status,
+        "headers": JSON_HEADERS,
     })
     await send({
         "type": "http.response.body",
-        "body": b"Not Found",
+        "body": response_body,
     })
 
+# ответы об ошибках собраны заранее и не пересобираются на каждый запрос
+_bad_requests = {}
+
+async def not_found(send):
+    await NOT_FOUND.send_to(send)
+
 async def bad_request(send, message):
-    await send({
-        "type": "http.response.start",
-        "status": HTTPStatus.BAD_REQUEST,
-        "headers": [(b"content-type", b"text/plain")],
-    })
-    await send({
-        "type": "http.response.body",
-        "body": message.encode(),
-    })
+    response = _bad_requests.get(message)
+    if response is None:
+        response = _bad_requests[message] = StaticResponse(
+            HTTPStatus.BAD_REQUEST, message.encode()
+        )
+    await response.send_to(send)
 
 async def unprocessable_entity(send):
-    await send({
-        "type": "http.response.start",
-        "status": HTTPStatus.UNPROCESSABLE_ENTITY,
-        "headers": [(b"content-type", b"text/plain")],
-    })
-    await send({
-        "type": "http.response.body",
-        "body": b"Unprocessable Entity",
-    })
+    await UNPROCESSABLE_ENTITY.send_to(send)
+
+async def content_too_large(send):
+    await CONTENT_TOO_LARGE.send_to(send)
+
+async def service_unavailable(send):
+    await SERVICE_UNAVAILABLE.send_to(send)
+
+_retry_later = {}
+
+async def retry_later(send, seconds):
+    response = _retry_later.get(seconds)
+    if response is None:
+        response = _retry_later[seconds] = StaticResponse(
+            HTTPStatus.SERVICE_UNAVAILABLE,
+            b"Service Unavailable",
+            headers=((b"retry-after", str(seconds).encode()),),
+        )
+    await response.send_to(send)
+
+# очередь занята - 503 с Retry-After; запрос сам дороже всего бюджета -
+# 400, как и другие слишком дорогие запросы: повтор ему не поможет
+async def admission_rejected(send, error):
+    if error.retry_after is None:
+        await bad_request(send, "Слишком большое n")
+    else:
+        await retry_later(send, error.retry_after)
@@ -0,0 +1,66 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+
+
+class DispatcherOverloaded(Exception):
+    pass
+
+
+class ComputeDispatcher:
+    """Выполняет дешёвые вычисления прямо в event loop, а тяжёлые - в пуле процессов.
+
+    Пул поднимается в `lifespan.startup` и гасится в `lifespan.shutdown`; пока он
+    не запущен (например, в тестах без lifespan), всё считается inline.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        max_pending: int = 32,
+        timeout: float = 30.0,
+    ) -> None:
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+
+        self._pool: ProcessPoolExecutor | None = None
+        self._pending = 0
+
+    @property
+    def started(self) -> bool:
+        return self._pool is not None
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def start(self) -> None:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def run[_TRes](
+        self,
+        func: Callable[..., _TRes],
+        *args: Any,
+        heavy: bool,
+    ) -> _TRes:
+        if not heavy or self._pool is None:
+            return func(*args)
+
+        if self._pending >= self.max_pending:
+            raise DispatcherOverloaded("compute queue is full")
+
+        self._pending += 1
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._pool, func, *args)
+            # отмена по таймауту снимает задачу, если она ещё ждёт в очереди пула;
+            # уже запущенная досчитается в фоне, но её результат будет отброшен
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending -= 1
@@ -1,49 +1,247 @@
+import functools
+import json
 import math
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import JSONResponse
+import numpy as np
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+
+from lecture_1.core.cache import etag_matches, make_etag
+from lecture_1.core.encoding import Base, iter_ndjson_results, iter_result_json, join_pieces
+from lecture_1.core.factorial import factorial_magnitude
+from lecture_1.core.fibonacci import fibonacci_pair, iter_fibonacci
+from lecture_1.core.modular import MAX_MODULUS, factorial_mod, factorial_mod_cost, fibonacci_pair_mod, is_prime
+from lecture_1.core.shared_cache import SharedResultCache
+
+# числа длиннее ~3000 цифр отдаются потоком, иначе json упрётся в лимит цифр int
+STREAMING_THRESHOLD_BITS = 10_000
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# готовые ответы /factorial и /fibonacci в shared memory, общей для всех
+# воркеров uvicorn на хосте; одно значение - не больше восьмой части кольца
+RESULT_CACHE_NAME = "math_example_results_v1"
+RESULT_CACHE_BYTES = 64 * 1024 * 1024
+MAX_CACHED_BODY_BYTES = RESULT_CACHE_BYTES // 8
+
+# approx=true считает log10(n!) с точностью ~ длине n
+MAX_APPROX_FACTORIAL = 10**1000
+
+# /fibonacci?from=a&to=b: не больше стольких строк
+MAX_FIBONACCI_RANGE = 100_000
+
+# n! mod m перебирает до min(n, m) множителей, больше этого не считаем
+MAX_MODULAR_FACTORIAL_STEPS = 50_000_000
+
+# тела /mean больше этого разбираются в пуле потоков, чтобы не держать event loop
+MEAN_INLINE_BYTES = 64 * 1024
 
 app = FastAPI()
+_FLOAT_LIST = TypeAdapter(list[float])
+
+
+# сегмент открывается один раз на процесс, при первом запросе
+@functools.cache
+def get_result_cache() -> SharedResultCache:
+    return SharedResultCache(RESULT_CACHE_NAME, max_bytes=RESULT_CACHE_BYTES)
+
+
+ResultCache = Annotated[SharedResultCache, Depends(get_result_cache)]
 
 
 @app.get("/factorial")
-def get_factorial(n: Annotated[int, Query()]) -> JSONResponse:
+def get_factorial(
+    n: Annotated[int, Query()],
+    cache: ResultCache,
+    base: Annotated[Base, Query()] = Base.DECIMAL,
+    mod: Annotated[int | None, Query(ge=1, le=MAX_MODULUS)] = None,
+    approx: Annotated[bool, Query()] = False,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
     if n < 0:
         raise HTTPException(
             status_code=HTTPStatus.BAD_REQUEST,
             detail="Invalid value for n, must be non-negative",
         )
+    if approx:
+        return approx_factorial(n, mod)
+    # простота mod проверяется один раз на запрос
+    prime = is_prime(mod) if mod is not None else None
+    if mod is not None and factorial_mod_cost(n, mod, prime) > MAX_MODULAR_FACTORIAL_STEPS:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Invalid value for n, too large for this mod",
+        )
+
+    key = ("factorial", int(base), n) if mod is None else ("factorial", int(base), n, mod)
+    if (response := cached_response(cache, key, if_none_match)) is not None:
+        return response
 
-    result = math.factorial(n)
+    result = math.factorial(n) if mod is None else factorial_mod(n, mod, prime)
 
-    return JSONResponse({"result": result})
+    return int_response(cache, result, base, key)
+
+
+def approx_factorial(n: int, mod: int | None) -> JSONResponse:
+    if mod is not None:
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail="approx and mod cannot be combined",
+        )
+    if n >= MAX_APPROX_FACTORIAL:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Invalid value for n, too large",
+        )
+
+    return JSONResponse(factorial_magnitude(n))
+
+
+@app.get("/fibonacci")
+def get_fibonacci_range(
+    low: Annotated[int, Query(alias="from", ge=0)],
+    high: Annotated[int, Query(alias="to", ge=0)],
+    base: Annotated[Base, Query()] = Base.DECIMAL,
+    mod: Annotated[int | None, Query(ge=1, le=MAX_MODULUS)] = None,
+) -> StreamingResponse:
+    if high < low:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Invalid range, from must not exceed to",
+        )
+    if high - low >= MAX_FIBONACCI_RANGE:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Invalid range, too large",
+        )
+
+    # F(from + 1) считается один раз, дальше ряд продолжается сложениями по ходу
+    # отправки; синхронный итератор Starlette обходит в пуле потоков, не в event loop
+    start = fibonacci_pair(low + 1) if mod is None else fibonacci_pair_mod(low + 1, mod)
+    values = iter_fibonacci(low + 1, high + 1, start, mod)
+
+    return StreamingResponse(
+        join_pieces(iter_ndjson_results(low, values, base), STREAM_CHUNK_SIZE),
+        media_type="application/x-ndjson",
+    )
 
 
 @app.get("/fibonacci/{n}")
-def get_fibonacci(n: int) -> JSONResponse:
+def get_fibonacci(
+    n: int,
+    cache: ResultCache,
+    base: Annotated[Base, Query()] = Base.DECIMAL,
+    mod: Annotated[int | None, Query(ge=1, le=MAX_MODULUS)] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
     if n < 0:
         raise HTTPException(
             status_code=HTTPStatus.BAD_REQUEST,
             detail="Invalid value for n, must be non-negative",
         )
 
-    a, b = 0, 1
-    for _ in range(n):
-        a, b = b, a + b
+    key = ("fibonacci", int(base), n) if mod is None else ("fibonacci", int(base), n, mod)
+    if (response := cached_response(cache, key, if_none_match)) is not None:
+        return response
 
-    return JSONResponse({"result": b})
+    # исторически API отдаёт F(n + 1): fib(0) == fib(1) == 1
+    _, result = fibonacci_pair(n) if mod is None else fibonacci_pair_mod(n, mod)
 
+    return int_response(cache, result, base, key)
 
-@app.get("/mean")
-def get_mean(data: list[float]) -> JSONResponse:
-    if len(data) == 0:
+
+# тело читается как есть: FastAPI сначала делал json.loads, а потом проверял
+# каждый элемент list[float]; схема тела для документации описана вручную
+@app.get(
+    "/mean",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": {"type": "array", "items": {"type": "number"}}}},
+        }
+    },
+)
+async def get_mean(request: Request) -> Response:
+    body = await request.body()
+    if len(body) <= MEAN_INLINE_BYTES:
+        result = mean_of_body(body)
+    else:
+        result = await run_in_threadpool(mean_of_body, body)
+
+    return Response(json.dumps({"result": result}), media_type="application/json")
+
+
+def mean_of_body(body: bytes) -> float:
+    # разбор и проверка за один проход в pydantic-core, без промежуточных
+    # объектов json.loads; результат сразу в непрерывный float64-массив
+    try:
+        values = np.array(_FLOAT_LIST.validate_json(body), dtype=np.float64)
+    except ValidationError as error:
+        errors = [{**item, "loc": ("body", *item["loc"])} for item in error.errors()]
+        raise RequestValidationError(errors) from error
+
+    if values.size == 0:
         raise HTTPException(
             status_code=HTTPStatus.BAD_REQUEST,
             detail="Invalid value for body, must be non-empty array of floats",
         )
 
-    result = sum(data) / len(data)
+    return float(values.mean())
+
+
+@app.get("/cache/stats")
+def get_cache_stats(cache: ResultCache) -> JSONResponse:
+    return JSONResponse(cache.stats())
+
+
+def cached_response(
+    cache: SharedResultCache,
+    key: tuple[str | int, ...],
+    if_none_match: str | None,
+) -> Response | None:
+    etag = make_etag(*key)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers={"etag": etag})
+
+    body = cache.get(cache_key(key))
+    if body is None:
+        return None
+
+    return Response(body, media_type="application/json", headers={"etag": etag})
+
+
+def int_response(
+    cache: SharedResultCache,
+    value: int,
+    base: Base,
+    key: tuple[str | int, ...],
+) -> Response:
+    headers = {"etag": make_etag(*key)}
+
+    # bit_length / 3 - оценка сверху длины и десятичной, и 16-ричной записи
+    if value.bit_length() <= STREAMING_THRESHOLD_BITS:
+        response = JSONResponse(
+            {"result": value if base == Base.DECIMAL else hex(value)},
+            headers=headers,
+        )
+        body = bytes(response.body)
+    elif value.bit_length() // 3 <= MAX_CACHED_BODY_BYTES:
+        body = "".join(iter_result_json(value, base)).encode()
+        response = Response(body, media_type="application/json", headers=headers)
+    else:
+        return StreamingResponse(
+            iter_result_json(value, base),
+            media_type="application/json",
+            headers=headers,
+        )
+
+    cache.put(cache_key(key), body)
+    return response
+
 
-    return JSONResponse({"result": result})
+def cache_key(key: tuple[str | int, ...]) -> str:
+    return ":".join(map(str, key))
@@ -0,0 +1,132 @@
+import re
+from http import HTTPStatus
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Mapping
+
+Scope = dict[str, Any]
+Receive = Callable[[], Awaitable[dict[str, Any]]]
+Send = Callable[[dict[str, Any]], Awaitable[None]]
+Handler = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+_PARAM = re.compile(r"\{(\w+)\}")
+
+_NO_PARAMS: Mapping[str, str] = MappingProxyType({})
+
+JSON_HEADERS = [(b"content-type", b"application/json")]
+
+
+class StaticResponse:
+    """Ответ, сообщения которого собраны один раз и переиспользуются на каждый запрос."""
+
+    __slots__ = ("start", "body")
+
+    def __init__(
+        self,
+        status: int,
+        body: bytes,
+        content_type: bytes | None = b"text/plain",
+        headers: tuple[tuple[bytes, bytes], ...] = (),
+    ) -> None:
+        if content_type is not None:
+            headers = ((b"content-type", content_type), *headers)
+        self.start = {
+            "type": "http.response.start",
+            "status": status,
+            "headers": list(headers),
+        }
+        self.body = {"type": "http.response.body", "body": body}
+
+    async def send_to(self, send: Send) -> None:
+        await send(self.start)
+        await send(self.body)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send(self.start)
+        await send(self.body)
+
+
+NOT_FOUND = StaticResponse(HTTPStatus.NOT_FOUND, b"Not Found")
+UNPROCESSABLE_ENTITY = StaticResponse(HTTPStatus.UNPROCESSABLE_ENTITY, b"Unprocessable Entity")
+SERVICE_UNAVAILABLE = StaticResponse(HTTPStatus.SERVICE_UNAVAILABLE, b"Service Unavailable")
+CONTENT_TOO_LARGE = StaticResponse(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, b"Content Too Large")
+
+
+def get_header(scope: Scope, name: bytes) -> str | None:
+    """Значение заголовка запроса; name - в нижнем регистре, как в ASGI."""
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class Router:
+    """Таблица маршрутов для "голых" ASGI-приложений.
+
+    Пути без параметров ищутся обращением к словарю path -> method -> handler;
+    шаблоны вида `/fibonacci/{n}` заранее компилируются в регулярки и
+    группируются по методу и первому сегменту пути, а значения параметров
+    кладутся в `scope["path_params"]`.
+    """
+
+    def __init__(self, not_found: Handler = NOT_FOUND) -> None:
+        self.not_found = not_found
+
+        self._static: dict[str, dict[str, Handler]] = {}
+        self._dynamic: dict[tuple[str, str], list[tuple[re.Pattern[str], Handler]]] = {}
+
+    def add(self, method: str, path: str, handler: Handler) -> None:
+        if _PARAM.search(path) is None:
+            self._static.setdefault(path, {})[method] = handler
+            return
+
+        pattern = "".join(
+            f"(?P<{part}>[^/]*)" if index % 2 else re.escape(part)
+            for index, part in enumerate(_PARAM.split(path))
+        )
+        key = (method, _first_segment(path))
+        self._dynamic.setdefault(key, []).append((re.compile(pattern), handler))
+
+    def route(self, method: str, path: str) -> Callable[[Handler], Handler]:
+        def decorator(handler: Handler) -> Handler:
+            self.add(method, path, handler)
+            return handler
+
+        return decorator
+
+    def match(self, method: str, path: str) -> tuple[Handler, Mapping[str, str]] | None:
+        methods = self._static.get(path)
+        if methods is not None and (handler := methods.get(method)) is not None:
+            return handler, _NO_PARAMS
+
+        candidates = self._dynamic.get((method, _first_segment(path)))
+        if candidates is not None:
+            for pattern, handler in candidates:
+                if (found := pattern.fullmatch(path)) is not None:
+                    return handler, found.groupdict()
+
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # то же, что match(), но без лишнего вызова функции на каждый запрос
+        path = scope["path"]
+        method = scope["method"]
+
+        methods = self._static.get(path)
+        if methods is not None and (handler := methods.get(method)) is not None:
+            scope["path_params"] = _NO_PARAMS
+            await handler(scope, receive, send)
+            return
+
+        candidates = self._dynamic.get((method, path[1:].partition("/")[0]))
+        if candidates is not None:
+            for pattern, handler in candidates:
+                if (found := pattern.fullmatch(path)) is not None:
+                    scope["path_params"] = found.groupdict()
+                    await handler(scope, receive, send)
+                    return
+
+        await self.not_found(scope, receive, send)
+
+
+def _first_segment(path: str) -> str:
+    return path[1:].partition("/")[0]
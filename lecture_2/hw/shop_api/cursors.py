@@ -0,0 +1,43 @@
+import base64
+import json
+import math
+
+
+def encode_cursor(kind: str, *key) -> str:
+    """Непрозрачный курсор: base64url от JSON [kind, *key] без паддинга."""
+    raw = json.dumps([kind, *key], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def cursor_kind(cursor: str) -> str:
+    """kind, с которым курсор был выдан; ValueError, если курсор повреждён."""
+    data = _load(cursor)
+    if not data or not isinstance(data[0], str):
+        raise ValueError("malformed cursor")
+    return data[0]
+
+
+def decode_cursor(cursor: str, kind: str, size: int) -> list:
+    """Ключ из курсора, выданного encode_cursor(kind, ...) с size компонентами.
+
+    Все компоненты - конечные числа, последний - id, то есть целое.
+    Бросает ValueError, если курсор повреждён или выдан для другого списка.
+    """
+    data = _load(cursor)
+    if len(data) != size + 1 or data[0] != kind:
+        raise ValueError("cursor does not belong to this listing")
+    key = data[1:]
+    if not all(type(part) in (int, float) and math.isfinite(part) for part in key) or type(key[-1]) is not int:
+        raise ValueError("malformed cursor")
+    return key
+
+
+def _load(cursor: str) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("malformed cursor") from e
+    if not isinstance(data, list):
+        raise ValueError("malformed cursor")
+    return data
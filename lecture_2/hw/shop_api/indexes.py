@@ -0,0 +1,85 @@
+from bisect import bisect_left, bisect_right, insort
+from math import inf
+from typing import Iterable, Iterator, Optional
+
+
+class RangeIndex:
+    """Отсортированный список пар (значение, id) для выборок по диапазону значений.
+
+    Поиск границ диапазона - бинарный, поэтому выборка стоит O(log N + limit);
+    вставка и удаление - O(log N) на поиск плюс сдвиг хвоста списка.
+    """
+
+    def __init__(self, keys: Iterable[tuple[float, int]] = ()):
+        # построение из готовых пар - одна сортировка вместо N вставок
+        self._keys: list[tuple[float, int]] = sorted(keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, value: float, id: int) -> None:
+        insort(self._keys, (value, id))
+
+    def add_many(self, keys: Iterable[tuple[float, int]]) -> None:
+        keys = list(keys)
+        if len(keys) <= 16:
+            for key in keys:
+                insort(self._keys, key)
+        else:
+            # timsort сливает две упорядоченные серии за O(N + k log k)
+            self._keys.extend(sorted(keys))
+            self._keys.sort()
+
+    def remove(self, value: float, id: int) -> None:
+        key = (value, id)
+        position = bisect_left(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            del self._keys[position]
+
+    def count(self, low: Optional[float] = None, high: Optional[float] = None) -> int:
+        """Число пар с low <= значение <= high - оценка селективности за O(log N)."""
+        start, end = self._bounds(low, high)
+        return end - start
+
+    def scan(
+        self,
+        low: Optional[float] = None,
+        high: Optional[float] = None,
+        after: Optional[tuple[float, int]] = None,
+    ) -> Iterator[tuple[float, int]]:
+        """Лениво перебирает пары (значение, id) диапазона, начиная сразу за after."""
+        start, end = self._bounds(low, high, after)
+        for position in range(start, end):
+            yield self._keys[position]
+
+    def range(
+        self,
+        low: Optional[float] = None,
+        high: Optional[float] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        after: Optional[tuple[float, int]] = None,
+    ) -> list[int]:
+        """id с low <= значение <= high по возрастанию (значение, id), начиная с offset-го.
+
+        after - последняя уже выданная пара (значение, id): выборка продолжается
+        сразу за ней, даже если саму пару с тех пор удалили.
+        """
+        start, end = self._bounds(low, high, after)
+        start += offset
+        if limit is not None:
+            end = min(end, start + limit)
+        return [id for _, id in self._keys[start:end]]
+
+    def _bounds(
+        self,
+        low: Optional[float] = None,
+        high: Optional[float] = None,
+        after: Optional[tuple[float, int]] = None,
+    ) -> tuple[int, int]:
+        # (x,) меньше любой пары (x, id), а (x, inf) - больше
+        start = 0 if low is None else bisect_left(self._keys, (low,))
+        if after is not None:
+            start = max(start, bisect_right(self._keys, after))
+        end = len(self._keys) if high is None else bisect_right(self._keys, (high, inf))
+        return start, end
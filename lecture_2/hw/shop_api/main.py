@@ -1,9 +1,19 @@
 from fastapi import FastAPI, HTTPException, status, Query, Body, Response, WebSocket, WebSocketDisconnect, Request
-from pydantic import BaseModel
+from pydantic import BaseModel, PositiveInt
 from typing import List, Dict, Optional
+import functools
+import gc
+import os
+import threading
 import uuid
 from prometheus_client import Counter, Histogram, start_http_server, generate_latest
 from contextlib import asynccontextmanager
+
+from lecture_2.hw.shop_api.cursors import cursor_kind, decode_cursor, encode_cursor
+from lecture_2.hw.shop_api.indexes import RangeIndex
+from lecture_2.hw.shop_api.oplog import LogStorage
+from lecture_2.hw.shop_api.storage import CartRecord, ItemRecord, MemoryStorage, SqliteStorage, Storage
+
 app = FastAPI()
 
 # Модели данных
@@ -41,14 +51,143 @@ class Cart(BaseModel):
     price: float = 0.0  # общая сумма заказа
     quantity: int = 0  # общее количество товаров в корзине
 
-# Имитированные "базы данных"
-items_db: Dict[int, Item] = {}
-carts_db: Dict[int, Cart] = {}
+# Имитированные "базы данных": компактные записи, модели выше - только для ответов
+items_db: Dict[int, ItemRecord] = {}
+carts_db: Dict[int, CartRecord] = {}
+
+# Индексы товаров по цене: все товары и только не удалённые,
+# чтобы show_deleted=False не требовал фильтрации
+prices_all = RangeIndex()
+prices_active = RangeIndex()
+
+# Обратный индекс: id товара -> id корзин, где он лежит.
+# Итоги корзин хранятся в самих корзинах, а изменения товара доходят
+# только до корзин из этого списка
+cart_items_by_item: Dict[int, List[int]] = {}
+
+# Индексы корзин по общей сумме и количеству товаров для фильтров списка корзин
+cart_prices = RangeIndex()
+cart_quantities = RangeIndex()
+
+# Обработчики синхронные и выполняются в пуле потоков FastAPI, а изменение
+# товара или корзины - несколько шагов над индексами (убрать, изменить,
+# вернуть). Поэтому всё, что читает или меняет состояние магазина, идёт
+# под одной блокировкой
+state_lock = threading.Lock()
+
+
+def serialized(handler):
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        with state_lock:
+            return handler(*args, **kwargs)
+    return wrapper
+
+
+def index_item(item: ItemRecord):
+    prices_all.add(item.price, item.id)
+    if not item.deleted:
+        prices_active.add(item.price, item.id)
+        for cart_id in cart_items_by_item.get(item.id, ()):
+            cart = carts_db[cart_id]
+            add_to_totals(cart, item.price * cart.lines[item.id], cart.lines[item.id])
+
+
+def unindex_item(item: ItemRecord):
+    prices_all.remove(item.price, item.id)
+    prices_active.remove(item.price, item.id)
+    if not item.deleted:
+        for cart_id in cart_items_by_item.get(item.id, ()):
+            cart = carts_db[cart_id]
+            add_to_totals(cart, -item.price * cart.lines[item.id], -cart.lines[item.id])
+
+
+def index_cart(cart: CartRecord):
+    cart_prices.add(cart.price, cart.id)
+    cart_quantities.add(cart.quantity, cart.id)
+
+
+def add_to_totals(cart: CartRecord, amount: float, quantity: int):
+    cart_prices.remove(cart.price, cart.id)
+    cart_quantities.remove(cart.quantity, cart.id)
+    cart.quantity += quantity
+    # без доступных товаров сумма ровно ноль, а не остаток ошибок округления
+    cart.price = cart.price + amount if cart.quantity else 0.0
+    index_cart(cart)
+
+def item_model(item: ItemRecord) -> Item:
+    return Item(id=item.id, name=item.name, price=item.price, deleted=item.deleted)
+
+
+def cart_model(cart: CartRecord) -> Cart:
+    cart_items = []
+    for item_id, quantity in cart.lines.items():
+        item = items_db[item_id]
+        cart_items.append(CartItem(id=item_id, name=item.name, quantity=quantity, available=not item.deleted))
+    return Cart(id=cart.id, items=cart_items, price=cart.price, quantity=cart.quantity)
+
+# Курсор следующей страницы списков отдаётся в заголовке, чтобы тело
+# ответа осталось списком, как и при пагинации через offset
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Сколько товаров можно создать или положить в корзину одним запросом
+MAX_BATCH_SIZE = 10_000
+
+
+def parse_cursor(cursor: str, kind: str, size: int) -> list:
+    try:
+        return decode_cursor(cursor, kind, size)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
 
 # Счетчики для генерации уникальных идентификаторов
 item_id_counter = 0
 cart_id_counter = 0
 
+# Хранилище, куда уходят изменения; записи выше - рабочая копия в памяти
+storage: Storage = MemoryStorage()
+
+
+@serialized
+def use_storage(new_storage: Storage):
+    """Переключает магазин на хранилище и восстанавливает из него записи, индексы и счётчики."""
+    global storage, items_db, carts_db, prices_all, prices_active, cart_items_by_item
+    global cart_prices, cart_quantities, item_id_counter, cart_id_counter
+    # при старте создаются миллионы объектов без циклов: проходы сборщика
+    # по растущей куче только замедлили бы восстановление в несколько раз
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        storage = new_storage
+        items_db, carts_db = storage.load()
+        # индексы строятся целиком, а не по одной вставке
+        cart_items_by_item = {}
+        for cart in carts_db.values():
+            for item_id, quantity in cart.lines.items():
+                cart_items_by_item.setdefault(item_id, []).append(cart.id)
+                item = items_db[item_id]
+                if not item.deleted:
+                    cart.price += item.price * quantity
+                    cart.quantity += quantity
+        keys = sorted((item.price, item.id) for item in items_db.values())
+        prices_all = RangeIndex(keys)
+        prices_active = RangeIndex([key for key in keys if not items_db[key[1]].deleted])
+        cart_prices = RangeIndex((cart.price, cart.id) for cart in carts_db.values())
+        cart_quantities = RangeIndex((cart.quantity, cart.id) for cart in carts_db.values())
+    finally:
+        if gc_enabled:
+            gc.enable()
+    item_id_counter = max(items_db, default=0)
+    cart_id_counter = max(carts_db, default=0)
+
+
+# SHOP_DATABASE - путь к файлу SQLite, SHOP_LOG_DIR - каталог журнала со снимками;
+# без них состояние живёт только в памяти
+if os.environ.get("SHOP_DATABASE"):
+    use_storage(SqliteStorage(os.environ["SHOP_DATABASE"]))
+elif os.environ.get("SHOP_LOG_DIR"):
+    use_storage(LogStorage(os.environ["SHOP_LOG_DIR"]))
+
 
 @app.get("/")
 def read_root():
@@ -56,73 +195,107 @@ def read_root():
 
 # Создание новой корзины
 @app.post("/cart", status_code=status.HTTP_201_CREATED)
+@serialized
 def create_cart(response: Response):
     global cart_id_counter
     cart_id_counter += 1
     cart_id = cart_id_counter
-    new_cart = Cart(id=cart_id)
+    new_cart = CartRecord(cart_id)
     carts_db[cart_id] = new_cart
+    index_cart(new_cart)
+    storage.save_cart(new_cart)
     response.headers["location"] = f"/cart/{cart_id}"
     return {"id": cart_id}
 
 # Получение корзины по идентификатору
 @app.get("/cart/{id}")
+@serialized
 def get_cart(id: int):
     if id not in carts_db:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Корзина не найдена")
-    cart = carts_db[id]
-    total_price = 0.0
-    total_quantity = 0
-    for cart_item in cart.items:
-        item = items_db.get(cart_item.id)
-        if item:
-            cart_item.available = not item.deleted
-            cart_item.name = item.name  # Обновляем название товара
-            total_price += item.price * cart_item.quantity
-            total_quantity += cart_item.quantity
-        else:
-            cart_item.available = False  # Товар не найден
-    cart.price = total_price
-    cart.quantity = total_quantity
-    return cart
+    # итоги поддерживаются при изменении товаров, названия и доступность берутся из них
+    return cart_model(carts_db[id])
 
 # Получение списка корзин с фильтрами
 @app.get("/cart")
+@serialized
 def list_carts(
+    response: Response,
     offset: int = Query(0, ge=0),
     limit: int = Query(10, gt=0),
     min_price: Optional[float] = Query(None, ge=0.0),
     max_price: Optional[float] = Query(None, ge=0.0),
     min_quantity: Optional[int] = Query(None, ge=0),
     max_quantity: Optional[int] = Query(None, ge=0),
+    cursor: Optional[str] = Query(None),
 ):
-    carts = list(carts_db.values())
+    # с фильтром по сумме или количеству кандидаты берутся из индекса того из них,
+    # что отбирает меньше корзин, и идут в его порядке; без фильтров - по id
+    # (корзины не удаляются и нумеруются подряд). Порядок зашит в курсор, чтобы
+    # следующие страницы продолжали тот же обход
+    bounds = {
+        "cart_price": (cart_prices, min_price, max_price),
+        "cart_quantity": (cart_quantities, min_quantity, max_quantity),
+    }
+    if cursor is not None:
+        try:
+            order = cursor_kind(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+        if order not in bounds:
+            order = "cart"
+    else:
+        filtered = [kind for kind, (_, low, high) in bounds.items() if low is not None or high is not None]
+        order = min(filtered, key=lambda kind: bounds[kind][0].count(*bounds[kind][1:]), default="cart")
+
+    if order == "cart":
+        first_id = 1
+        if cursor is not None:
+            (last_id,) = parse_cursor(cursor, "cart", 1)
+            first_id = int(last_id) + 1
+        candidates = range(first_id, cart_id_counter + 1)
+    else:
+        index, low, high = bounds[order]
+        after = None
+        if cursor is not None:
+            after = tuple(parse_cursor(cursor, order, 2))
+        candidates = (cart_id for _, cart_id in index.scan(low, high, after))
+
+    # страница набирается с одной лишней корзиной, чтобы знать, нужен ли курсор
     filtered_carts = []
-    for cart in carts:
-        total_price = 0.0
-        total_quantity = 0
-        for cart_item in cart.items:
-            item = items_db.get(cart_item.id)
-            if item and not item.deleted:
-                total_price += item.price * cart_item.quantity
-                total_quantity += cart_item.quantity
-        cart.price = total_price
-        cart.quantity = total_quantity
-        if min_price is not None and total_price < min_price:
+    skipped = 0
+    for cart_id in candidates:
+        cart = carts_db.get(cart_id)
+        if cart is None:
             continue
-        if max_price is not None and total_price > max_price:
+        if min_price is not None and cart.price < min_price:
             continue
-        if min_quantity is not None and total_quantity < min_quantity:
+        if max_price is not None and cart.price > max_price:
             continue
-        if max_quantity is not None and total_quantity > max_quantity:
+        if min_quantity is not None and cart.quantity < min_quantity:
+            continue
+        if max_quantity is not None and cart.quantity > max_quantity:
+            continue
+        if skipped < offset:
+            skipped += 1
             continue
         filtered_carts.append(cart)
-    start = offset
-    end = offset + limit
-    return filtered_carts[start:end]
+        if len(filtered_carts) > limit:
+            break
+    if len(filtered_carts) > limit:
+        del filtered_carts[limit:]
+        last = filtered_carts[-1]
+        if order == "cart_price":
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(order, last.price, last.id)
+        elif order == "cart_quantity":
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(order, last.quantity, last.id)
+        else:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(order, last.id)
+    return [cart_model(cart) for cart in filtered_carts]
 
 # Добавление товара в корзину
 @app.post("/cart/{cart_id}/add/{item_id}")
+@serialized
 def add_item_to_cart(cart_id: int, item_id: int):
     if cart_id not in carts_db:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Корзина не найдена")
@@ -130,99 +303,160 @@ def add_item_to_cart(cart_id: int, item_id: int):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Товар не найден")
     cart = carts_db[cart_id]
     item = items_db[item_id]
-    for cart_item in cart.items:
-        if cart_item.id == item_id:
-            cart_item.quantity += 1
-            break
-    else:
-        cart_item = CartItem(
-            id=item_id,
-            name=item.name,
-            quantity=1,
-            available=not item.deleted
-        )
-        cart.items.append(cart_item)
+    add_to_cart(cart, item_id, 1)
+    storage.save_line(cart, item_id)
+    if not item.deleted:
+        add_to_totals(cart, item.price, 1)
     return {"message": "Товар добавлен в корзину"}
 
+
+def add_to_cart(cart: CartRecord, item_id: int, quantity: int):
+    if item_id not in cart.lines:
+        cart.lines[item_id] = 0
+        cart_items_by_item.setdefault(item_id, []).append(cart.id)
+    cart.lines[item_id] += quantity
+
+# Добавление нескольких товаров в корзину: id товара -> количество
+@app.post("/cart/{cart_id}/items")
+@serialized
+def add_items_to_cart(cart_id: int, quantities: Dict[int, PositiveInt] = Body(..., max_length=MAX_BATCH_SIZE)):
+    if cart_id not in carts_db:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Корзина не найдена")
+    # всё проверяется до первого изменения, чтобы запрос применился целиком или никак
+    missing = [item_id for item_id in quantities if item_id not in items_db]
+    if missing:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Товары не найдены: {missing}")
+    cart = carts_db[cart_id]
+    amount, count = 0.0, 0
+    for item_id, quantity in quantities.items():
+        add_to_cart(cart, item_id, quantity)
+        item = items_db[item_id]
+        if not item.deleted:
+            amount += item.price * quantity
+            count += quantity
+    # позиции сохраняются одной пачкой, итоги и индексы корзин обновляются один раз
+    storage.save_lines(cart, list(quantities))
+    if count:
+        add_to_totals(cart, amount, count)
+    return cart_model(cart)
+
 # Добавление нового товара
 @app.post("/item", status_code=status.HTTP_201_CREATED)
+@serialized
 def create_item(item: ItemCreate, response: Response):
     global item_id_counter
     item_id_counter += 1
     item_id = item_id_counter
-    new_item = Item(id=item_id, name=item.name, price=item.price, deleted=False)
+    new_item = ItemRecord(item_id, item.name, item.price)
     items_db[item_id] = new_item
+    index_item(new_item)
+    storage.save_item(new_item)
     response.headers["location"] = f"/item/{item_id}"
-    return new_item.model_dump()
+    return item_model(new_item).model_dump()
+
+# Добавление нескольких товаров одним запросом: тело проверяется целиком до создания
+@app.post("/item/batch", status_code=status.HTTP_201_CREATED)
+@serialized
+def create_items(items: List[ItemCreate] = Body(..., max_length=MAX_BATCH_SIZE)):
+    global item_id_counter
+    new_items = []
+    for item in items:
+        item_id_counter += 1
+        new_item = ItemRecord(item_id_counter, item.name, item.price)
+        items_db[new_item.id] = new_item
+        new_items.append(new_item)
+    storage.save_items(new_items)
+    # у новых товаров ещё нет корзин, так что достаточно индексов цен
+    keys = [(item.price, item.id) for item in new_items]
+    prices_all.add_many(keys)
+    prices_active.add_many(keys)
+    return {"ids": [item.id for item in new_items]}
 
 # Получение товара по идентификатору
 @app.get("/item/{id}")
+@serialized
 def get_item(id: int):
     if id not in items_db or items_db[id].deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Товар не найден")
-    return items_db[id].model_dump()
+    return item_model(items_db[id]).model_dump()
 
 # Получение списка товаров с фильтрами
 @app.get("/item")
+@serialized
 def list_items(
+    response: Response,
     offset: int = Query(0, ge=0),
     limit: int = Query(10, gt=0),
     min_price: Optional[float] = Query(None, ge=0.0),
     max_price: Optional[float] = Query(None, ge=0.0),
     show_deleted: bool = Query(False),
+    cursor: Optional[str] = Query(None),
 ):
-    items = list(items_db.values())
-    filtered_items = []
-    for item in items:
-        if not show_deleted and item.deleted:
-            continue
-        if min_price is not None and item.price < min_price:
-            continue
-        if max_price is not None and item.price > max_price:
-            continue
-        filtered_items.append(item)
-    start = offset
-    end = offset + limit
-    return [item.model_dump() for item in filtered_items[start:end]]
+    # товары упорядочены по (цене, id); границы диапазона ищутся бинарным поиском,
+    # а курсор хранит последнюю выданную пару и продолжает выборку сразу за ней
+    after = None
+    if cursor is not None:
+        after = tuple(parse_cursor(cursor, "item", 2))
+    index = prices_all if show_deleted else prices_active
+    # на один больше, чтобы знать, есть ли следующая страница
+    item_ids = index.range(min_price, max_price, offset, limit + 1, after=after)
+    items = [items_db[item_id] for item_id in item_ids[:limit]]
+    if len(item_ids) > limit:
+        last = items[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor("item", last.price, last.id)
+    return [item_model(item).model_dump() for item in items]
 
 # Замена товара по идентификатору
 @app.put("/item/{id}")
+@serialized
 def replace_item(id: int, new_item: ItemCreate):
     if id not in items_db:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Товар не найден")
     item = items_db[id]
     if item.deleted:
         raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED)
+    unindex_item(item)
     item.name = new_item.name
     item.price = new_item.price
-    return item
+    index_item(item)
+    storage.save_item(item)
+    return item_model(item)
 
 # Частичное обновление товара по идентификатору
 @app.patch("/item/{id}")
+@serialized
 def update_item(id: int, item_updates: ItemUpdate = Body(default={})):
     if id not in items_db:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Товар не найден")
     item = items_db[id]
     if item.deleted:
         raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED)
-    update_data = item_updates.model_dump(exclude_unset=True)
+    # null не затирает поле: товар без цены нельзя держать в индексе
+    update_data = item_updates.model_dump(exclude_unset=True, exclude_none=True)
     if "deleted" in update_data:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Поле 'deleted' нельзя менять")
     if not update_data:
-        return item  # No updates provided, return the item as is
+        return item_model(item)  # No updates provided, return the item as is
+    unindex_item(item)
     for key, value in update_data.items():
         setattr(item, key, value)
-    return item
+    index_item(item)
+    storage.save_item(item)
+    return item_model(item)
 
 # Удаление товара по идентификатору
 @app.delete("/item/{id}")
+@serialized
 def delete_item(id: int):
     if id not in items_db:
         return {"message": "Товар уже удален"}
     item = items_db[id]
     if item.deleted:
         return {"message": "Товар уже удален"}
+    unindex_item(item)
     item.deleted = True
+    index_item(item)
+    storage.save_item(item)
     return {"message": "Товар удален"}
 
 
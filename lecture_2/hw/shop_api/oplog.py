@@ -0,0 +1,300 @@
+import atexit
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional
+
+from lecture_2.hw.shop_api.storage import CartRecord, ItemRecord
+
+logger = logging.getLogger(__name__)
+
+# Записи журнала хранят полное новое состояние строки, а не разницу, поэтому
+# повторное применение безвредно: снимок можно снимать без остановки записи
+_ITEM = struct.Struct("<BqdBI")  # тег, id, цена, удалён, длина названия; дальше название
+_CART = struct.Struct("<Bq")  # тег, id корзины
+_LINE = struct.Struct("<Bqqq")  # тег, id корзины, id товара, количество
+# группа записей одной пачки; длина в байтах, дальше сами записи. Группа
+# с оборванным хвостом отбрасывается целиком
+_GROUP = struct.Struct("<BI")
+_ITEM_TAG, _CART_TAG, _LINE_TAG, _GROUP_TAG = 1, 2, 3, 4
+
+_SNAPSHOT_MAGIC = b"SHOPSNP1"
+# magic, число товаров, корзин, позиций в корзинах, байт в названиях (UTF-8)
+_SNAPSHOT_HEADER = struct.Struct("<8sQQQQ")
+
+
+class LogStorage:
+    """Журнал изменений (append-only) плюс периодические снимки состояния.
+
+    Каталог содержит сегменты журнала log.NNNNNNNN и снимки snapshot.NNNNNNNN.
+    Снимок с номером N - состояние не старше начала сегмента N, поэтому при
+    старте читается последний снимок и проигрываются только сегменты с
+    номерами от N. Запись в журнал буферизуется и сбрасывается фоновым
+    потоком раз в flush_interval секунд; он же раз в snapshot_interval секунд
+    снимает снимок, если журнал вырос, и удаляет ставшие ненужными файлы.
+    """
+
+    def __init__(self, directory: str, flush_interval: float = 0.05, snapshot_interval: float = 60.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.snapshot_interval = snapshot_interval
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._log = None
+        self._sequence = 0
+        self._dirty = False
+        self._items: Optional[Dict[int, ItemRecord]] = None
+        self._carts: Optional[Dict[int, CartRecord]] = None
+        self._stop = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="shop-oplog", daemon=True)
+        atexit.register(self.close)
+
+    def load(self) -> tuple[Dict[int, ItemRecord], Dict[int, CartRecord]]:
+        snapshots = self._files("snapshot.")
+        segments = self._files("log.")
+        start = snapshots[-1] if snapshots else 0
+        if snapshots:
+            items, carts = _read_snapshot(self._path("snapshot.", start))
+        else:
+            items, carts = {}, {}
+        for sequence in segments:
+            if sequence >= start:
+                _replay(self._path("log.", sequence), items, carts)
+
+        # дописывать в непустой сегмент нельзя: его хвост мог оборваться при падении
+        self._items, self._carts = items, carts
+        sequence = max([start, *segments])
+        if sequence not in segments or os.path.getsize(self._path("log.", sequence)):
+            sequence += 1
+        self._open_segment(sequence)
+        self._worker.start()
+        return items, carts
+
+    def save_item(self, item: ItemRecord) -> None:
+        self._append(_item_record(item))
+
+    def save_items(self, items: List[ItemRecord]) -> None:
+        self._append_group([_item_record(item) for item in items])
+
+    def save_cart(self, cart: CartRecord) -> None:
+        self._append(_CART.pack(_CART_TAG, cart.id))
+
+    def save_line(self, cart: CartRecord, item_id: int) -> None:
+        self._append(_LINE.pack(_LINE_TAG, cart.id, item_id, cart.lines[item_id]))
+
+    def save_lines(self, cart: CartRecord, item_ids: List[int]) -> None:
+        self._append_group([_LINE.pack(_LINE_TAG, cart.id, item_id, cart.lines[item_id]) for item_id in item_ids])
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._log is not None:
+                self._log.flush()
+
+    def snapshot(self) -> None:
+        """Снимает снимок текущего состояния и удаляет покрытые им сегменты и снимки."""
+        with self._lock:
+            if self._items is None or self._log is None:
+                return
+            sequence = self._sequence + 1
+            self._open_segment(sequence)
+            self._dirty = False
+            # поля записей копируются под блокировкой один раз: колонки и текст
+            # названий строятся из одной копии, и переименование во время
+            # записи снимка не сдвигает остальные названия. Более новые
+            # состояния записей есть в сегменте sequence
+            items = [(item.id, item.name, item.price, item.deleted) for item in list(self._items.values())]
+            carts = list(self._carts.values())
+            cart_ids = [cart.id for cart in carts]
+            lines = [(cart.id, item_id, quantity) for cart in carts for item_id, quantity in list(cart.lines.items())]
+
+        path = self._path("snapshot.", sequence)
+        _write_snapshot(path, items, cart_ids, lines)
+        for old in self._files("snapshot."):
+            if old < sequence:
+                os.unlink(self._path("snapshot.", old))
+        for old in self._files("log."):
+            if old < sequence:
+                os.unlink(self._path("log.", old))
+
+    def close(self) -> None:
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self._worker.is_alive():
+            self._worker.join()
+        if self._dirty:
+            # с готовым снимком следующий старт не проигрывает журнал
+            self.snapshot()
+        with self._lock:
+            if self._log is not None:
+                self._log.flush()
+                os.fsync(self._log.fileno())
+                self._log.close()
+                self._log = None
+        atexit.unregister(self.close)
+
+    def _append(self, record: bytes) -> None:
+        with self._lock:
+            self._log.write(record)
+            self._dirty = True
+
+    def _append_group(self, records: List[bytes]) -> None:
+        payload = b"".join(records)
+        self._append(_GROUP.pack(_GROUP_TAG, len(payload)) + payload)
+
+    def _open_segment(self, sequence: int) -> None:
+        if self._log is not None:
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            self._log.close()
+        self._sequence = sequence
+        self._log = open(self._path("log.", sequence), "ab")
+
+    def _run(self) -> None:
+        last_snapshot = time.monotonic()
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+                if self._dirty and time.monotonic() - last_snapshot >= self.snapshot_interval:
+                    self.snapshot()
+                    last_snapshot = time.monotonic()
+            except OSError:
+                logger.exception("shop log flush failed, will retry")
+
+    def _path(self, prefix: str, sequence: int) -> str:
+        return os.path.join(self.directory, f"{prefix}{sequence:08d}")
+
+    def _files(self, prefix: str) -> list[int]:
+        sequences = []
+        for name in os.listdir(self.directory):
+            suffix = name[len(prefix):]
+            if name.startswith(prefix) and suffix.isdigit():
+                sequences.append(int(suffix))
+        return sorted(sequences)
+
+
+def _item_record(item: ItemRecord) -> bytes:
+    name = item.name.encode()
+    return _ITEM.pack(_ITEM_TAG, item.id, item.price, item.deleted, len(name)) + name
+
+
+def _write_snapshot(
+    path: str,
+    items: list[tuple[int, str, float, bool]],
+    cart_ids: list[int],
+    lines: list[tuple[int, int, int]],
+) -> None:
+    """Пишет снимок из копий: товары (id, название, цена, удалён),
+    id корзин и позиции (id корзины, id товара, количество)."""
+    # колонки вместо записей: при загрузке они читаются из mmap целиком.
+    # Товары идут по (цене, id), чтобы индексы цен при старте строились
+    # сортировкой почти упорядоченных данных
+    items = sorted(items, key=lambda item: (item[2], item[0]))
+    columns = [
+        array("q", [item[0] for item in items]),
+        array("d", [item[2] for item in items]),
+        array("B", [item[3] for item in items]),
+        array("I", [len(item[1]) for item in items]),
+        array("q", cart_ids),
+        array("q", [line[0] for line in lines]),
+        array("q", [line[1] for line in lines]),
+        array("q", [line[2] for line in lines]),
+    ]
+    blob = "".join(item[1] for item in items).encode()
+
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as file:
+        file.write(_SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, len(items), len(cart_ids), len(lines), len(blob)))
+        for column in columns:
+            column.tofile(file)
+        file.write(blob)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+def _read_snapshot(path: str) -> tuple[Dict[int, ItemRecord], Dict[int, CartRecord]]:
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        magic, item_count, cart_count, line_count, blob_size = _SNAPSHOT_HEADER.unpack_from(mapped)
+        if magic != _SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a shop snapshot")
+        view = memoryview(mapped)
+        position = _SNAPSHOT_HEADER.size
+
+        def column(format: str, count: int) -> list:
+            nonlocal position
+            size = struct.calcsize(format) * count
+            values = view[position : position + size].cast(format).tolist()
+            position += size
+            return values
+
+        ids, prices = column("q", item_count), column("d", item_count)
+        deleted, name_sizes = column("B", item_count), column("I", item_count)
+        cart_ids = column("q", cart_count)
+        line_carts, line_items = column("q", line_count), column("q", line_count)
+        line_quantities = column("q", line_count)
+        text = str(view[position : position + blob_size], "utf-8")
+        view.release()
+
+    # длины названий - в символах, поэтому текст декодируется один раз целиком
+    items = {}
+    ends = accumulate(name_sizes)
+    offset = 0
+    for id, price, flag, end in zip(ids, prices, deleted, ends):
+        items[id] = ItemRecord(id, text[offset:end], price, bool(flag))
+        offset = end
+    carts = {id: CartRecord(id) for id in cart_ids}
+    for cart_id, item_id, quantity in zip(line_carts, line_items, line_quantities):
+        carts[cart_id].lines[item_id] = quantity
+    return items, carts
+
+
+def _replay(path: str, items: Dict[int, ItemRecord], carts: Dict[int, CartRecord]) -> None:
+    with open(path, "rb") as file:
+        data = file.read()
+    for record in _records(data):
+        tag = record[0]
+        if tag == _ITEM_TAG:
+            _, id, price, deleted, name = record
+            items[id] = ItemRecord(id, name, price, bool(deleted))
+        elif tag == _CART_TAG:
+            carts.setdefault(record[1], CartRecord(record[1]))
+        else:
+            _, cart_id, item_id, quantity = record
+            carts[cart_id].lines[item_id] = quantity
+
+
+def _records(data: bytes, position: int = 0, end: Optional[int] = None) -> Iterator[tuple]:
+    end = len(data) if end is None else end
+    while position < end:
+        tag = data[position]
+        if tag == _ITEM_TAG and position + _ITEM.size <= end:
+            _, id, price, deleted, size = _ITEM.unpack_from(data, position)
+            name_end = position + _ITEM.size + size
+            if name_end > end:
+                break
+            yield tag, id, price, deleted, data[position + _ITEM.size : name_end].decode()
+            position = name_end
+        elif tag == _CART_TAG and position + _CART.size <= end:
+            yield _CART.unpack_from(data, position)
+            position += _CART.size
+        elif tag == _LINE_TAG and position + _LINE.size <= end:
+            yield _LINE.unpack_from(data, position)
+            position += _LINE.size
+        elif tag == _GROUP_TAG and position + _GROUP.size <= end:
+            _, size = _GROUP.unpack_from(data, position)
+            group_end = position + _GROUP.size + size
+            if group_end > end:
+                break
+            yield from _records(data, position + _GROUP.size, group_end)
+            position = group_end
+        else:
+            # оборванная при падении последняя запись или группа
+            logger.warning("ignoring %d trailing bytes of shop log", end - position)
+            break
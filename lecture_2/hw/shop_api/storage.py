@@ -0,0 +1,226 @@
+import atexit
+import logging
+import sqlite3
+import threading
+from typing import Dict, List, Protocol
+
+logger = logging.getLogger(__name__)
+
+
+class ItemRecord:
+    """Товар в хранилище. Pydantic-модели строятся только для ответа."""
+
+    __slots__ = ("id", "name", "price", "deleted")
+
+    def __init__(self, id: int, name: str, price: float, deleted: bool = False):
+        self.id = id
+        self.name = name
+        self.price = price
+        self.deleted = deleted
+
+
+class CartRecord:
+    """Корзина в хранилище: только количества товаров и поддерживаемые итоги.
+
+    Название и доступность позиции берутся из товара при построении ответа,
+    поэтому в корзине их копий нет.
+    """
+
+    __slots__ = ("id", "lines", "price", "quantity")
+
+    def __init__(self, id: int):
+        self.id = id
+        self.lines: Dict[int, int] = {}  # id товара -> количество, в порядке добавления
+        self.price = 0.0  # сумма по доступным товарам
+        self.quantity = 0  # количество доступных товаров
+
+
+class Storage(Protocol):
+    """Куда магазин сохраняет изменения.
+
+    Обработчики работают с записями в памяти и сообщают хранилищу о каждом
+    изменении; load отдаёт сохранённое состояние при старте. save_items и
+    save_lines сохраняют пачку целиком: после падения она либо есть вся,
+    либо её нет.
+    """
+
+    def load(self) -> tuple[Dict[int, ItemRecord], Dict[int, CartRecord]]: ...
+
+    def save_item(self, item: ItemRecord) -> None: ...
+
+    def save_items(self, items: List[ItemRecord]) -> None: ...
+
+    def save_cart(self, cart: CartRecord) -> None: ...
+
+    def save_line(self, cart: CartRecord, item_id: int) -> None: ...
+
+    def save_lines(self, cart: CartRecord, item_ids: List[int]) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class MemoryStorage:
+    """Состояние только в памяти процесса: после перезапуска магазин пуст."""
+
+    def load(self) -> tuple[Dict[int, ItemRecord], Dict[int, CartRecord]]:
+        return {}, {}
+
+    def save_item(self, item: ItemRecord) -> None:
+        pass
+
+    def save_items(self, items: List[ItemRecord]) -> None:
+        pass
+
+    def save_cart(self, cart: CartRecord) -> None:
+        pass
+
+    def save_line(self, cart: CartRecord, item_id: int) -> None:
+        pass
+
+    def save_lines(self, cart: CartRecord, item_ids: List[int]) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteStorage:
+    """SQLite в режиме WAL с отложенной записью (write-behind).
+
+    save_* только запоминают последнее состояние строки; фоновый поток раз
+    в flush_interval секунд (или раньше, если накопилось max_batch строк)
+    пишет всё накопленное одной транзакцией. Ответ уходит до записи на диск,
+    поэтому при падении процесса теряются изменения последнего интервала;
+    при штатном завершении close дописывает их.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.05, max_batch: int = 10_000):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # в WAL с synchronous=NORMAL коммит не ждёт fsync, целостность базы сохраняется
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                price REAL NOT NULL,
+                deleted INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS carts (id INTEGER PRIMARY KEY);
+            CREATE TABLE IF NOT EXISTS cart_lines (
+                cart_id INTEGER NOT NULL,
+                item_id INTEGER NOT NULL,
+                quantity INTEGER NOT NULL,
+                UNIQUE (cart_id, item_id)
+            );
+            """
+        )
+
+        # ожидающие записи: ключ строки -> её последнее состояние
+        self._items: Dict[int, tuple] = {}
+        self._carts: Dict[int, tuple] = {}
+        self._lines: Dict[tuple[int, int], tuple] = {}
+        self._pending_lock = threading.Lock()
+        # один сброс за раз, чтобы пачки ложились в базу в порядке изменений
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name="shop-sqlite-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def load(self) -> tuple[Dict[int, ItemRecord], Dict[int, CartRecord]]:
+        self.flush()
+        with self._flush_lock:
+            items = {
+                id: ItemRecord(id, name, price, bool(deleted))
+                for id, name, price, deleted in self._connection.execute("SELECT id, name, price, deleted FROM items")
+            }
+            carts = {id: CartRecord(id) for (id,) in self._connection.execute("SELECT id FROM carts")}
+            # upsert не меняет rowid, поэтому порядок rowid - порядок добавления в корзину
+            lines = self._connection.execute("SELECT cart_id, item_id, quantity FROM cart_lines ORDER BY rowid")
+            for cart_id, item_id, quantity in lines:
+                carts[cart_id].lines[item_id] = quantity
+        return items, carts
+
+    def save_item(self, item: ItemRecord) -> None:
+        self.save_items([item])
+
+    def save_items(self, items: List[ItemRecord]) -> None:
+        # пачка встаёт в очередь под одной блокировкой, поэтому flush забирает
+        # её целиком и пишет одной транзакцией
+        self._enqueue("_items", {item.id: (item.id, item.name, item.price, int(item.deleted)) for item in items})
+
+    def save_cart(self, cart: CartRecord) -> None:
+        self._enqueue("_carts", {cart.id: (cart.id,)})
+
+    def save_line(self, cart: CartRecord, item_id: int) -> None:
+        self.save_lines(cart, [item_id])
+
+    def save_lines(self, cart: CartRecord, item_ids: List[int]) -> None:
+        self._enqueue("_lines", {(cart.id, item_id): (cart.id, item_id, cart.lines[item_id]) for item_id in item_ids})
+
+    def flush(self) -> None:
+        """Пишет накопленные изменения одной транзакцией."""
+        with self._flush_lock:
+            with self._pending_lock:
+                items, self._items = self._items, {}
+                carts, self._carts = self._carts, {}
+                lines, self._lines = self._lines, {}
+            if not (items or carts or lines):
+                return
+            try:
+                with self._connection:
+                    self._connection.execute("BEGIN")
+                    self._connection.executemany(
+                        "INSERT INTO items (id, name, price, deleted) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (id) DO UPDATE SET name = excluded.name, price = excluded.price, "
+                        "deleted = excluded.deleted",
+                        items.values(),
+                    )
+                    self._connection.executemany("INSERT OR IGNORE INTO carts (id) VALUES (?)", carts.values())
+                    self._connection.executemany(
+                        "INSERT INTO cart_lines (cart_id, item_id, quantity) VALUES (?, ?, ?) "
+                        "ON CONFLICT (cart_id, item_id) DO UPDATE SET quantity = excluded.quantity",
+                        lines.values(),
+                    )
+            except Exception:
+                # возвращаем пачку в очередь, не затирая более свежие изменения тех же строк
+                with self._pending_lock:
+                    self._items = {**items, **self._items}
+                    self._carts = {**carts, **self._carts}
+                    self._lines = {**lines, **self._lines}
+                raise
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._writer.join()
+        self.flush()
+        self._connection.close()
+        atexit.unregister(self.close)
+
+    def _enqueue(self, table: str, rows: dict) -> None:
+        # словарь берётся под блокировкой: flush подменяет его на новый, и
+        # взятый раньше мог уже уйти писателю
+        with self._pending_lock:
+            getattr(self, table).update(rows)
+            size = len(self._items) + len(self._carts) + len(self._lines)
+        if size >= self.max_batch:
+            self._wake.set()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                # поток писателя не должен умирать: без него изменения копятся в памяти
+                logger.exception("shop storage flush failed, will retry")
@@ -0,0 +1,147 @@
+import asyncio
+from http import HTTPStatus
+
+import httpx
+import pytest
+
+from lecture_1.hw import math_plain_asgi
+from lecture_1.hw.admission import AdmissionController, AdmissionRejected
+
+
+@pytest.mark.asyncio
+async def test_lanes_by_cost():
+    controller = AdmissionController(slow_threshold=0.01, slow_concurrency=2)
+
+    async with controller.admit(0.001):
+        assert controller.fast.running == 1
+        async with controller.admit(1.0):
+            assert controller.slow.running == 1
+            assert controller.slow.backlog == 0.5
+
+    stats = controller.stats()
+    assert stats["fast"]["admitted"] == stats["slow"]["admitted"] == 1
+    assert stats["slow"]["running"] == stats["slow"]["backlog_seconds"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_lane_rejects_over_backlog():
+    controller = AdmissionController(slow_concurrency=1, max_slow_backlog=5.0)
+
+    async with controller.admit(4.5):
+        with pytest.raises(AdmissionRejected) as error:
+            async with controller.admit(1.0):
+                pass
+
+        # быстрая очередь при этом не страдает
+        async with controller.admit(0.0001):
+            pass
+
+    assert error.value.retry_after == 5
+    assert controller.slow.rejected == 1
+    async with controller.admit(1.0):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_request_over_budget_is_rejected_even_when_idle():
+    controller = AdmissionController(slow_concurrency=1, max_slow_backlog=5.0)
+
+    with pytest.raises(AdmissionRejected) as error:
+        async with controller.admit(7.5):
+            pass
+
+    assert error.value.retry_after is None
+    assert controller.slow.rejected == 1
+    assert (controller.slow.queued, controller.slow.backlog) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_concurrency_budget_queues_requests():
+    controller = AdmissionController(slow_concurrency=1)
+    release = asyncio.Event()
+
+    async def hold():
+        async with controller.admit(1.0):
+            await release.wait()
+
+    holders = [asyncio.create_task(hold()) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    assert (controller.slow.running, controller.slow.queued) == (1, 2)
+    assert controller.slow.backlog == 3.0
+
+    release.set()
+    await asyncio.gather(*holders)
+
+    assert (controller.slow.running, controller.slow.queued) == (0, 0)
+    assert controller.stats()["slow"]["wait_ms_max"] > 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_is_not_counted():
+    controller = AdmissionController(slow_concurrency=1)
+
+    async with controller.admit(1.0):
+        waiter = asyncio.create_task(controller.admit(1.0).__aenter__())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert controller.slow.queued == 0
+        assert controller.slow.backlog == 1.0
+
+
+@pytest.fixture()
+def admission(monkeypatch) -> AdmissionController:
+    controller = AdmissionController(slow_concurrency=1, max_slow_backlog=1.0)
+    monkeypatch.setattr(math_plain_asgi, "admission", controller)
+    return controller
+
+
+@pytest.mark.asyncio
+async def test_app_answers_503_with_retry_after(admission: AdmissionController):
+    transport = httpx.ASGITransport(app=math_plain_asgi.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        async with admission.admit(0.9):
+            rejected = await client.get("/factorial", params={"n": 100_001})
+            cheap = await client.get("/fibonacci/10")
+            stats = await client.get("/admission/stats")
+
+    assert rejected.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert rejected.headers["retry-after"] == "1"
+    assert cheap.status_code == HTTPStatus.OK
+    assert stats.json()["slow"] | {"wait_ms_avg": 0, "wait_ms_max": 0} == {
+        "concurrency": 1,
+        "running": 1,
+        "queued": 0,
+        "backlog_seconds": 0.9,
+        "admitted": 1,
+        "rejected": 1,
+        "wait_ms_avg": 0,
+        "wait_ms_max": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_app_rejects_request_over_budget(admission: AdmissionController):
+    transport = httpx.ASGITransport(app=math_plain_asgi.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        # ~2.6 с по оценке при бюджете 1 с: повтор не поможет, поэтому 400, а не 503
+        response = await client.get("/factorial", params={"n": 500_000})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.text == "Слишком большое n"
+    assert "retry-after" not in response.headers
+    assert admission.slow.admitted == 0
+
+
+@pytest.mark.asyncio
+async def test_fibonacci_range_is_charged_for_every_line(admission: AdmissionController):
+    transport = httpx.ASGITransport(app=math_plain_asgi.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        # первая пара дешёвая, но перевод трёхсот чисел по ~40 тыс. цифр в текст - нет
+        response = await client.get("/fibonacci", params={"from": 200_000, "to": 200_300})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert admission.slow.rejected == 1
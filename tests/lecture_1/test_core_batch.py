@@ -0,0 +1,49 @@
+import math
+
+import pytest
+
+from benchmarks.fibonacci import linear_fibonacci
+from lecture_1.core.batch import compute_batch, parse_batch
+from lecture_1.core.factorial import factorials, range_product
+from lecture_1.core.fibonacci import fibonacci_pairs
+
+
+@pytest.mark.parametrize(("low", "high"), [(1, 0), (1, 1), (5, 5), (3, 10), (1, 1000), (500, 2000)])
+def test_range_product(low: int, high: int):
+    assert range_product(low, high) == math.prod(range(low, high + 1))
+
+
+def test_factorials():
+    ns = [0, 5, 3, 5, 100, 2000]
+
+    assert factorials(ns) == {n: math.factorial(n) for n in ns}
+
+
+def test_fibonacci_pairs():
+    ns = [0, 1, 10, 9, 300, 2000, 2001]
+
+    assert fibonacci_pairs(ns) == {n: (linear_fibonacci(n), linear_fibonacci(n + 1)) for n in ns}
+
+
+def test_compute_batch_keeps_order():
+    operations = [("fibonacci", 10), ("factorial", 5), ("fibonacci", 0), ("factorial", 5)]
+
+    assert compute_batch(operations) == [89, 120, 1, 120]
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        None,
+        {"op": "factorial", "n": 1},
+        [{"op": "factorial"}],
+        [{"op": "factorial", "n": 1, "x": 1}],
+        [{"op": "sqrt", "n": 1}],
+        [{"op": "factorial", "n": 1.5}],
+        [{"op": "factorial", "n": True}],
+        [{"op": "factorial", "n": 1}] * 3,
+    ],
+)
+def test_parse_batch_rejects_invalid(data):
+    with pytest.raises(ValueError):
+        parse_batch(data, max_size=2)
@@ -0,0 +1,65 @@
+import pytest
+
+from lecture_1.core.cache import ByteBudgetLRU, etag_matches, make_etag
+
+
+def test_evicts_least_recently_used_by_bytes():
+    cache = ByteBudgetLRU[str, bytes](max_bytes=10)
+    cache.put("a", b"aaaa", 4)
+    cache.put("b", b"bbbb", 4)
+    assert cache.get("a") == b"aaaa"
+
+    cache.put("c", b"cccc", 4)
+
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    assert cache.bytes == 8
+    assert cache.evictions == 1
+
+
+def test_replacing_key_updates_size():
+    cache = ByteBudgetLRU[str, bytes](max_bytes=10)
+    cache.put("a", b"a" * 8, 8)
+    cache.put("a", b"a" * 2, 2)
+
+    assert cache.bytes == 2
+    assert len(cache) == 1
+
+
+def test_rejects_values_larger_than_budget():
+    cache = ByteBudgetLRU[str, bytes](max_bytes=10)
+
+    assert not cache.put("a", b"a" * 11, 11)
+    assert len(cache) == 0
+
+
+def test_counts_hits_and_misses():
+    cache = ByteBudgetLRU[str, int](max_bytes=10)
+    cache.put("a", 1, 1)
+    cache.get("a")
+    cache.get("b")
+
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+        "entries": 1,
+        "bytes": 1,
+        "max_bytes": 10,
+    }
+
+
+@pytest.mark.parametrize(
+    ("header", "matches"),
+    [
+        (None, False),
+        ("", False),
+        ("*", True),
+        ('"v1-factorial-10-5"', True),
+        ('W/"v1-factorial-10-5"', True),
+        ('"other", "v1-factorial-10-5"', True),
+        ('"v1-factorial-10-6"', False),
+    ],
+)
+def test_etag_matches(header: str | None, matches: bool):
+    assert etag_matches(header, make_etag("factorial", 10, 5)) is matches
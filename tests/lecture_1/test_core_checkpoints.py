@@ -0,0 +1,81 @@
+import math
+
+import pytest
+
+from lecture_1.core import checkpoints
+from lecture_1.core.checkpoints import CheckpointTable
+from lecture_1.core.fibonacci import fibonacci_pair
+
+
+@pytest.fixture()
+def table(tmp_path) -> CheckpointTable:
+    table = checkpoints.load(tmp_path / "table", step=100, limit=1_000)
+    yield table
+    checkpoints.open_table.cache_clear()
+
+
+@pytest.mark.parametrize("n", [0, 1, 99, 100, 101, 555, 1_000, 1_099, 1_100, 2_345])
+def test_values_match_direct_computation(table: CheckpointTable, n: int):
+    assert table.factorial(n) == math.factorial(n)
+    assert table.fibonacci_pair(n) == fibonacci_pair(n)
+
+
+def test_negative(table: CheckpointTable):
+    with pytest.raises(ValueError):
+        table.factorial(-1)
+    with pytest.raises(ValueError):
+        table.fibonacci_pair(-1)
+
+
+def test_load_reuses_existing_file(tmp_path, table: CheckpointTable):
+    modified = (tmp_path / "table").stat().st_mtime_ns
+    checkpoints.open_table.cache_clear()
+
+    checkpoints.load(tmp_path / "table", step=100, limit=1_000)
+
+    assert (tmp_path / "table").stat().st_mtime_ns == modified
+
+
+def test_load_rebuilds_on_other_parameters(tmp_path, table: CheckpointTable):
+    rebuilt = checkpoints.load(tmp_path / "table", step=50, limit=500)
+
+    assert (rebuilt.step, rebuilt.limit) == (50, 500)
+    assert rebuilt.factorial(321) == math.factorial(321)
+
+
+def test_load_rebuilds_garbage(tmp_path):
+    (tmp_path / "table").write_bytes(b"garbage")
+
+    table = checkpoints.load(tmp_path / "table", step=10, limit=100)
+
+    assert table.fibonacci_pair(42) == fibonacci_pair(42)
+    checkpoints.open_table.cache_clear()
+
+
+def test_functions_without_table():
+    assert checkpoints.factorial(None, 20) == math.factorial(20)
+    assert checkpoints.fibonacci_pair(None, 20) == fibonacci_pair(20)
+
+
+@pytest.mark.parametrize("damage", ["truncate", "flip", "offsets"])
+def test_load_rebuilds_damaged_file(tmp_path, damage: str):
+    path = tmp_path / "table"
+    checkpoints.build(path, step=10, limit=100)
+    data = bytearray(path.read_bytes())
+    if damage == "truncate":
+        data = data[:-5]
+    elif damage == "flip":
+        data[-1] ^= 0xFF
+    else:
+        # смещение первого значения указывает за конец файла
+        first = checkpoints._HEADER.size
+        data[first : first + 8] = (len(data) + 100).to_bytes(8, "little")
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(ValueError):
+        CheckpointTable(path)
+    table = checkpoints.load(path, step=10, limit=100)
+
+    assert table.factorial(57) == math.factorial(57)
+    assert table.fibonacci_pair(57) == fibonacci_pair(57)
+    checkpoints.open_table.cache_clear()
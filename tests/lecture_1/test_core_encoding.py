@@ -0,0 +1,71 @@
+import json
+import math
+import random
+import sys
+
+import pytest
+
+from lecture_1.core.encoding import (
+    Base,
+    int_to_decimal,
+    iter_decimal,
+    iter_hex,
+    iter_ndjson_results,
+    iter_result_json,
+    join_pieces,
+)
+
+
+@pytest.fixture(autouse=True)
+def unlimited_int_str_digits():
+    limit = sys.get_int_max_str_digits()
+    sys.set_int_max_str_digits(0)
+    yield
+    sys.set_int_max_str_digits(limit)
+
+
+NUMBERS = [
+    0,
+    1,
+    -7,
+    2**128,
+    10**4096 - 1,
+    10**4096,
+    10**8192 + 1,
+    math.factorial(5000),
+    -math.factorial(3000),
+    *(random.getrandbits(random.randint(1, 100_000)) for _ in range(20)),
+]
+
+
+@pytest.mark.parametrize("n", NUMBERS, ids=range(len(NUMBERS)))
+def test_encodings_match_builtins(n: int):
+    assert int_to_decimal(n) == n
+    assert "".join(iter_decimal(n)) == str(n)
+    assert "".join(iter_hex(n)) == hex(n)
+
+
+def test_result_json_is_valid_json():
+    n = math.factorial(4000)
+
+    assert json.loads("".join(iter_result_json(n))) == {"result": n}
+    assert json.loads("".join(iter_result_json(n, base=16))) == {"result": hex(n)}
+
+
+def test_decimal_is_chunked():
+    assert len(list(iter_decimal(10**20000))) > 1
+
+
+def test_ndjson_results():
+    text = "".join(iter_ndjson_results(7, [1, 255], Base.HEX))
+
+    assert [json.loads(line) for line in text.splitlines()] == [
+        {"n": 7, "result": "0x1"},
+        {"n": 8, "result": "0xff"},
+    ]
+    assert text.endswith("\n")
+
+
+def test_join_pieces():
+    assert list(join_pieces(["ab", "c", "defg", "h"], 3)) == ["abc", "defg", "h"]
+    assert list(join_pieces([], 3)) == []
@@ -0,0 +1,37 @@
+import math
+import sys
+
+import pytest
+
+from lecture_1.core.factorial import factorial_magnitude
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 10, 170, 999, 1_000, 1_001, 1_234, 5_000, 54_321])
+def test_magnitude_matches_exact(n: int):
+    limit = sys.get_int_max_str_digits()
+    sys.set_int_max_str_digits(0)
+    try:
+        digits = str(math.factorial(n))
+    finally:
+        sys.set_int_max_str_digits(limit)
+
+    magnitude = factorial_magnitude(n)
+
+    assert magnitude["digits"] == len(digits)
+    assert magnitude["log10"] == pytest.approx(math.lgamma(n + 1) / math.log(10))
+    assert magnitude["mantissa"] == pytest.approx(float(f"{digits[0]}.{digits[1:17]}"), rel=1e-14)
+
+
+def test_magnitude_huge_n():
+    # 10^12! = 1.40366116037375...e11565705518103
+    assert factorial_magnitude(10**12) == {
+        "digits": 11_565_705_518_104,
+        "log10": pytest.approx(11_565_705_518_103.147),
+        "mantissa": pytest.approx(1.403661160373756, rel=1e-14),
+    }
+    assert factorial_magnitude(10**100)["digits"] > 10**101
+
+
+def test_magnitude_negative():
+    with pytest.raises(ValueError):
+        factorial_magnitude(-1)
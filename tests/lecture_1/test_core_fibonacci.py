@@ -0,0 +1,26 @@
+import pytest
+
+from benchmarks.fibonacci import linear_fibonacci
+from lecture_1.core.fibonacci import fibonacci, fibonacci_pair, iter_fibonacci
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 3, 10, 63, 64, 65, 1000, 4097])
+def test_fibonacci_matches_linear(n: int):
+    assert fibonacci(n) == linear_fibonacci(n)
+    assert fibonacci_pair(n) == (linear_fibonacci(n), linear_fibonacci(n + 1))
+
+
+def test_fibonacci_negative():
+    with pytest.raises(ValueError):
+        fibonacci(-1)
+
+
+@pytest.mark.parametrize(("low", "high"), [(0, 0), (0, 20), (5, 4), (1000, 1010)])
+def test_iter_fibonacci(low: int, high: int):
+    assert list(iter_fibonacci(low, high)) == [linear_fibonacci(n) for n in range(low, high + 1)]
+
+
+def test_iter_fibonacci_with_start_and_mod():
+    start = tuple(x % 97 for x in fibonacci_pair(500))
+
+    assert list(iter_fibonacci(500, 600, start, mod=97)) == [linear_fibonacci(n) % 97 for n in range(500, 601)]
@@ -0,0 +1,40 @@
+import json
+import math
+
+import pytest
+
+from lecture_1.core.encoding import Base
+from lecture_1.core.fibonacci import fibonacci_pair, fibonacci_range_size
+from lecture_1.core.jobs import batch_json, evaluate, evaluate_json, fibonacci_range_ndjson
+
+
+@pytest.mark.parametrize(
+    "op,n,mod,expected",
+    [
+        ("factorial", 20, None, math.factorial(20)),
+        ("factorial", 20, 1_000_003, math.factorial(20) % 1_000_003),
+        ("fibonacci", 90, None, fibonacci_pair(90)[1]),
+        ("fibonacci", 90, 97, fibonacci_pair(90)[1] % 97),
+    ],
+)
+def test_evaluate(op: str, n: int, mod: int | None, expected: int):
+    assert evaluate(op, n, mod) == expected
+    assert json.loads(evaluate_json(op, n, mod, None)) == expected
+    assert json.loads(evaluate_json(op, n, mod, None, Base.HEX)) == hex(expected)
+
+
+def test_batch_json():
+    body = batch_json([("factorial", 5), ("fibonacci", 5)], Base.HEX)
+    assert json.loads(body) == {"results": [hex(120), hex(8)]}
+
+
+@pytest.mark.parametrize(("low", "high", "mod"), [(0, 0, None), (0, 1000, None), (5000, 5100, None), (10, 20, 7)])
+def test_fibonacci_range_ndjson(low: int, high: int, mod: int | None):
+    body = fibonacci_range_ndjson(low, high, mod, None)
+
+    expected = [fibonacci_pair(n)[1] % mod if mod else fibonacci_pair(n)[1] for n in range(low, high + 1)]
+    assert [json.loads(line) for line in body.splitlines()] == [
+        {"n": n, "result": value} for n, value in enumerate(expected, low)
+    ]
+    # оценка размера, по которой приложения отклоняют диапазон, - сверху
+    assert len(body) <= fibonacci_range_size(low + 1, high + 1, mod)
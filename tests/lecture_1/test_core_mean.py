@@ -0,0 +1,99 @@
+import json
+import math
+import random
+
+import pytest
+
+from lecture_1.core.mean import StreamingMean
+
+
+def reference_mean(body: bytes) -> float | None:
+    data = json.loads(body)
+    if not isinstance(data, list) or not all(isinstance(x, (int, float)) for x in data):
+        raise ValueError
+    if not data:
+        return None
+    return sum(data) / len(data)
+
+
+def streaming_mean(body: bytes, chunk_sizes: list[int]) -> float | None:
+    parser = StreamingMean(max_token_size=64)
+    pos = 0
+    for size in chunk_sizes:
+        parser.feed(body[pos : pos + size])
+        pos += size
+    parser.feed(body[pos:])
+    return parser.result()
+
+
+BODIES = [
+    b"[]",
+    b" [ ] \n",
+    b"[1, 2, 3]",
+    b"[1, 2.0, 3.0]",
+    b"[-0.5e3, 1E+2, 0, 10000000000000000000000, 1.0]",
+    b"[true, false, 3]",
+    b"[NaN, 1]",
+    b"[Infinity, -Infinity]",
+    json.dumps([random.uniform(-1e6, 1e6) for _ in range(500)]).encode(),
+    json.dumps([random.randint(-10**12, 10**12) for _ in range(500)]).encode(),
+]
+
+INVALID_BODIES = [
+    b"",
+    b"null",
+    b"{}",
+    b"1",
+    b"[",
+    b"[1,",
+    b"[1,]",
+    b"[,1]",
+    b"[1 2]",
+    b"[01]",
+    b"[1.]",
+    b"[.5]",
+    b"[\"1\"]",
+    b"[null]",
+    b"[[1]]",
+    b"[1]]",
+    b"[1] x",
+]
+
+
+@pytest.mark.parametrize("body", BODIES, ids=range(len(BODIES)))
+def test_streaming_mean_matches_json(body: bytes):
+    expected = reference_mean(body)
+
+    for _ in range(20):
+        chunks = [random.randint(0, 7) for _ in range(len(body) // 2)]
+        result = streaming_mean(body, chunks)
+
+        if expected is None or math.isnan(expected):
+            assert result is expected or math.isnan(result)
+        else:
+            # sum() компенсирует ошибку округления только внутри одного чанка
+            assert result == pytest.approx(expected, rel=1e-12)
+
+
+@pytest.mark.parametrize("body", INVALID_BODIES)
+def test_streaming_mean_rejects_invalid(body: bytes):
+    for chunks in ([], [1] * len(body)):
+        with pytest.raises(ValueError):
+            streaming_mean(body, chunks)
+
+
+def test_streaming_mean_limits_token_size():
+    parser = StreamingMean(max_token_size=8)
+
+    with pytest.raises(ValueError):
+        parser.feed(b"[" + b"1" * 9)
+
+
+def test_streaming_mean_squeezes_whitespace():
+    parser = StreamingMean(max_token_size=8)
+    parser.feed(b"[1")
+    for _ in range(100):
+        parser.feed(b" " * 64)
+    parser.feed(b"]")
+
+    assert parser.result() == 1.0
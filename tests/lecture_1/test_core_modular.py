@@ -0,0 +1,57 @@
+import math
+
+import pytest
+
+from lecture_1.core.fibonacci import fibonacci_pair
+from lecture_1.core.modular import MAX_MODULUS, factorial_mod, factorial_mod_cost, fibonacci_pair_mod, is_prime
+
+
+@pytest.mark.parametrize("m", [1, 2, 7, 10, 97, 1_000_003, 10**9 + 7, 2**61 - 1, 10**12])
+@pytest.mark.parametrize("n", [0, 1, 5, 50, 96, 200, 1_000])
+def test_matches_direct_computation(n: int, m: int):
+    assert factorial_mod(n, m) == math.factorial(n) % m
+    assert fibonacci_pair_mod(n, m) == tuple(x % m for x in fibonacci_pair(n))
+
+
+@pytest.mark.parametrize("n", [600, 990, 996, 1_008])
+def test_factorial_mod_wilson(n: int):
+    # 997 - простое, при n > 498 считается через теорему Вильсона
+    assert factorial_mod(n, 997) == math.factorial(n) % 997
+
+
+def test_huge_n():
+    assert factorial_mod(10**12, 10**9 + 7) == 0
+    assert factorial_mod_cost(10**12, 10**9 + 7) == 0
+    assert fibonacci_pair_mod(10**12, 10**9 + 7) == fibonacci_pair_mod(10**12 % 2_000_000_016, 10**9 + 7)
+
+
+def test_factorial_mod_cost():
+    assert factorial_mod_cost(100, 10**12) == 100
+    assert factorial_mod_cost(10**9 + 5, 10**9 + 7) == 1
+
+
+def test_is_prime():
+    assert [p for p in range(50) if is_prime(p)] == [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47]
+    assert is_prime(2**61 - 1)
+    assert not is_prime(3_215_031_751)  # сильное псевдопростое по основаниям 2, 3, 5, 7
+
+
+def test_precomputed_primality():
+    # переданный prime заменяет проверку: с prime=False путь Вильсона не берётся
+    assert factorial_mod_cost(996, 997, prime=True) == 0
+    assert factorial_mod_cost(996, 997, prime=False) == 996
+    assert factorial_mod(996, 997, prime=True) == factorial_mod(996, 997, prime=False) == 996
+
+
+def test_is_prime_rejects_huge_modulus():
+    assert is_prime(MAX_MODULUS) is False
+    with pytest.raises(ValueError):
+        is_prime(MAX_MODULUS + 1)
+
+
+@pytest.mark.parametrize("args", [(-1, 10), (10, 0)])
+def test_invalid_arguments(args: tuple[int, int]):
+    with pytest.raises(ValueError):
+        factorial_mod(*args)
+    with pytest.raises(ValueError):
+        fibonacci_pair_mod(*args)
@@ -0,0 +1,116 @@
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import pytest
+
+from lecture_1.core.shared_cache import SharedResultCache
+
+
+@pytest.fixture()
+def cache(request) -> SharedResultCache:
+    cache = SharedResultCache(f"test_{os.getpid()}_{request.node.name[:40]}", max_bytes=4096, buckets=8)
+    yield cache
+    cache.close()
+    cache.unlink()
+
+
+def test_get_put(cache: SharedResultCache):
+    assert cache.get("a") is None
+    assert cache.put("a", b"first")
+    assert cache.put("b", b"second")
+    assert cache.put("a", b"updated")
+
+    assert cache.get("a") == b"updated"
+    assert cache.get("b") == b"second"
+    assert cache.stats() | {"bytes_written": 0} == {
+        "hits": 2,
+        "misses": 1,
+        "hit_ratio": 2 / 3,
+        "evictions": 0,
+        "bytes_written": 0,
+        "max_bytes": 4096,
+    }
+
+
+def test_rejects_too_large_values(cache: SharedResultCache):
+    assert not cache.put("big", bytes(cache.max_value_bytes))
+    assert cache.get("big") is None
+
+
+def test_ring_evicts_oldest(cache: SharedResultCache):
+    for i in range(100):
+        cache.put(f"key {i}", bytes([i]) * 100)
+
+    # в кольце на 4 КиБ помещается около 40 последних записей
+    assert cache.get("key 0") is None
+    assert cache.get("key 99") == bytes([99]) * 100
+    assert all(cache.get(f"key {i}") in (None, bytes([i]) * 100) for i in range(100))
+
+
+def test_counts_evictions(cache: SharedResultCache):
+    # 8 корзин по 4 слота: после 100 разных ключей часть слотов занята заново
+    for i in range(100):
+        cache.put(f"key {i}", b"x")
+    cache.put("key 99", b"y")
+
+    assert cache.stats()["evictions"] > 0
+
+
+def test_recreates_foreign_segment(tmp_path):
+    name = f"test_{os.getpid()}_foreign"
+    # сегмент с тем же именем и чужим содержимым, слишком маленький для своего заголовка
+    foreign = shared_memory.SharedMemory(name, create=True, size=4096)
+    foreign.buf[:8] = b"SHMCACH2"
+    foreign.buf[8:24] = (10**9).to_bytes(8, "little") * 2
+    foreign.close()
+
+    cache = SharedResultCache(name, max_bytes=4096, buckets=8, lock_dir=str(tmp_path))
+    try:
+        assert cache.put("a", b"value")
+        assert cache.get("a") == b"value"
+        assert cache.max_bytes == 4096
+    finally:
+        cache.close()
+        cache.unlink()
+
+
+def test_lock_file_in_app_directory(cache: SharedResultCache, tmp_path):
+    other = SharedResultCache(cache.name, lock_dir=str(tmp_path / "locks"))
+    try:
+        assert (tmp_path / "locks" / f"{cache.name}.lock").exists()
+        assert (tmp_path / "locks").stat().st_mode & 0o777 == 0o700
+    finally:
+        other.close()
+
+
+def test_other_instance_sees_values(cache: SharedResultCache):
+    cache.put("shared", b"value")
+
+    other = SharedResultCache(cache.name)
+    try:
+        assert other.max_bytes == 4096
+        assert other.get("shared") == b"value"
+    finally:
+        other.close()
+
+
+def _write(name: str, worker: int) -> None:
+    cache = SharedResultCache(name)
+    for i in range(200):
+        value = f"{worker}:{i}".encode() * (i % 8 + 1)
+        cache.put(f"{worker}:{i}", value)
+        assert cache.get(f"{worker}:{i}") in (None, value)
+    cache.close()
+
+
+def test_concurrent_processes(cache: SharedResultCache):
+    workers = [multiprocessing.Process(target=_write, args=(cache.name, worker)) for worker in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert [worker.exitcode for worker in workers] == [0, 0, 0, 0]
+    assert cache.stats()["hits"] > 0
+    assert all(cache.get(f"{w}:199") in (None, f"{w}:199".encode() * 8) for w in range(4))
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from lecture_1.core import stats
+from lecture_1.core.stats import from_packed, mean_and_variance, summarize, summarize_json, summarize_packed
+
+
+def test_from_packed_is_zero_copy():
+    buffer = bytearray(np.arange(4, dtype="<f8").tobytes())
+    values = from_packed(buffer, "float64")
+
+    buffer[:8] = np.float64(42.0).tobytes()
+
+    assert values[0] == 42.0
+
+
+@pytest.mark.parametrize(("buffer", "dtype"), [(b"\x00" * 7, "float64"), (b"\x00" * 8, "float32")])
+def test_from_packed_rejects_invalid(buffer: bytes, dtype: str):
+    with pytest.raises(ValueError):
+        from_packed(buffer, dtype)
+
+
+def test_mean_and_variance_across_blocks(monkeypatch):
+    monkeypatch.setattr(stats, "_BLOCK_SIZE", 7)
+    values = np.random.default_rng(0).normal(1e6, 3.0, size=1000)
+
+    mean, variance = mean_and_variance(values)
+
+    assert mean == pytest.approx(values.mean())
+    assert variance == pytest.approx(values.var())
+
+
+def test_summarize_int64():
+    summary = summarize(np.arange(1, 101, dtype=np.int64))
+
+    assert summary["result"] == 50.5
+    assert summary["count"] == 100
+    assert summary["min"] == 1 and summary["max"] == 100
+    assert summary["percentiles"]["50"] == 50.5
+
+
+def test_summarize_packed():
+    body = np.array([1.0, 2.0, 6.0], dtype="<f8").tobytes()
+
+    assert summarize_packed(body, "float64", False) == {"result": 3.0}
+    assert summarize_packed(body, "float64", True)["max"] == 6.0
+    assert summarize_packed(b"", "float64", True) is None
+
+
+@pytest.mark.parametrize("body", [b"{}", b"[1, \"x\"]", b"[1,"])
+def test_summarize_json_rejects_invalid(body: bytes):
+    with pytest.raises(ValueError):
+        summarize_json(body)
+
+
+def test_summarize_json():
+    assert summarize_json(b"[]") is None
+    assert summarize_json(b"[1, 2, 6]")["result"] == 3.0
@@ -0,0 +1,179 @@
+import json
+import math
+import os
+import sys
+from http import HTTPStatus
+
+import pytest
+from fastapi.testclient import TestClient
+
+from lecture_1.core.fibonacci import fibonacci_pair
+from lecture_1.core.shared_cache import SharedResultCache
+from lecture_1.math_example import RESULT_CACHE_BYTES, app, get_result_cache
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True, scope="module")
+def result_cache():
+    # отдельный сегмент, чтобы не видеть ответы, закэшированные другими прогонами
+    cache = SharedResultCache(f"test_math_example_{os.getpid()}", max_bytes=RESULT_CACHE_BYTES)
+    app.dependency_overrides[get_result_cache] = lambda: cache
+    yield cache
+    app.dependency_overrides.clear()
+    cache.close()
+    cache.unlink()
+
+
+@pytest.fixture()
+def unlimited_int_str_digits():
+    limit = sys.get_int_max_str_digits()
+    sys.set_int_max_str_digits(0)
+    yield
+    sys.set_int_max_str_digits(limit)
+
+
+def test_factorial_streams_huge_result(unlimited_int_str_digits):
+    response = client.get("/factorial", params={"n": 5000})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {"result": math.factorial(5000)}
+
+
+def test_fibonacci_hex():
+    response = client.get("/fibonacci/10", params={"base": 16})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {"result": hex(89)}
+
+
+def test_invalid_base():
+    response = client.get("/factorial", params={"n": 10, "base": 2})
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.parametrize("path", ["/factorial?n=12", "/fibonacci/12?base=16"])
+def test_conditional_get(path: str):
+    response = client.get(path)
+    cached = client.get(path)
+    not_modified = client.get(path, headers={"if-none-match": response.headers["etag"]})
+
+    assert response.status_code == cached.status_code == HTTPStatus.OK
+    assert response.content == cached.content
+    assert cached.headers["etag"] == response.headers["etag"]
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.parametrize(
+    ("path", "expected"),
+    [
+        ("/factorial?n=1000&mod=1000003", math.factorial(1000) % 1_000_003),
+        ("/factorial?n=1000000000000&mod=1000000007", 0),
+        ("/fibonacci/1000?mod=97", fibonacci_pair(1000)[1] % 97),
+    ],
+)
+def test_mod(path: str, expected: int):
+    response = client.get(path)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {"result": expected}
+
+
+def test_mod_validation():
+    assert client.get("/fibonacci/10", params={"mod": 0}).status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert client.get("/factorial", params={"n": 10, "mod": 10**25}).status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert client.get("/factorial", params={"n": 10**12, "mod": 10**13}).status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_factorial_approx():
+    response = client.get("/factorial", params={"n": 10**12, "approx": True})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["digits"] == 11_565_705_518_104
+    assert client.get("/factorial", params={"n": 10, "approx": True, "mod": 7}).status_code == (
+        HTTPStatus.UNPROCESSABLE_ENTITY
+    )
+
+
+@pytest.mark.parametrize(
+    ("data", "expected"),
+    [
+        ([1, 2.5, 3], 6.5 / 3),
+        ([1, "2", True], 4 / 3),
+        (list(range(20_000)), 9_999.5),
+    ],
+)
+def test_mean(data: list, expected: float):
+    response = client.request("GET", "/mean", json=data)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {"result": pytest.approx(expected)}
+
+
+@pytest.mark.parametrize(
+    ("body", "status"),
+    [
+        (b"[]", HTTPStatus.BAD_REQUEST),
+        (b"[1, null]", HTTPStatus.UNPROCESSABLE_ENTITY),
+        (b'{"a": 1}', HTTPStatus.UNPROCESSABLE_ENTITY),
+        (b"[1,", HTTPStatus.UNPROCESSABLE_ENTITY),
+    ],
+)
+def test_mean_invalid(body: bytes, status: HTTPStatus):
+    response = client.request("GET", "/mean", content=body, headers={"content-type": "application/json"})
+
+    assert response.status_code == status
+    if status == HTTPStatus.UNPROCESSABLE_ENTITY:
+        assert response.json()["detail"][0]["loc"][0] == "body"
+
+
+def test_cache_stats():
+    client.get("/factorial", params={"n": 7})
+    client.get("/factorial", params={"n": 7})
+    response = client.get("/cache/stats")
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["hits"] >= 1
+    assert 0 < response.json()["hit_ratio"] <= 1
+    assert response.json()["evictions"] >= 0
+
+
+@pytest.mark.parametrize(
+    ("params", "expected"),
+    [
+        ({"from": 0, "to": 5}, [fibonacci_pair(n)[1] for n in range(6)]),
+        ({"from": 3000, "to": 3100}, [fibonacci_pair(n)[1] for n in range(3000, 3101)]),
+        ({"from": 10, "to": 10, "mod": 7}, [fibonacci_pair(10)[1] % 7]),
+    ],
+)
+def test_fibonacci_range(params: dict, expected: list[int], unlimited_int_str_digits):
+    response = client.get("/fibonacci", params=params)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == [{"n": params["from"] + i, "result": value} for i, value in enumerate(expected)]
+
+
+def test_long_fibonacci_range():
+    response = client.get("/fibonacci", params={"from": 0, "to": 9_000})
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.text.splitlines()) == 9_001
+
+
+@pytest.mark.parametrize(
+    ("params", "status"),
+    [
+        ({"from": 5}, HTTPStatus.UNPROCESSABLE_ENTITY),
+        ({"from": "x", "to": 5}, HTTPStatus.UNPROCESSABLE_ENTITY),
+        ({"from": 5, "to": 4}, HTTPStatus.BAD_REQUEST),
+        # слишком много строк
+        ({"from": 0, "to": 100_000, "mod": 7}, HTTPStatus.BAD_REQUEST),
+    ],
+)
+def test_fibonacci_range_invalid(params: dict, status: HTTPStatus):
+    response = client.get("/fibonacci", params=params)
+
+    assert response.status_code == status
@@ -0,0 +1,408 @@
+import json
+import math
+import sys
+from http import HTTPStatus
+
+import httpx
+import numpy as np
+import pytest
+import pytest_asyncio
+
+from benchmarks.asgi import lifespan
+from lecture_1.core.fibonacci import fibonacci_pair
+from lecture_1.hw import math_plain_asgi
+from lecture_1.hw.math_plain_asgi import app
+
+
+@pytest_asyncio.fixture()
+async def client():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        yield client
+
+
+@pytest.fixture()
+def unlimited_int_str_digits():
+    limit = sys.get_int_max_str_digits()
+    sys.set_int_max_str_digits(0)
+    yield
+    sys.set_int_max_str_digits(limit)
+
+
+@pytest.mark.asyncio
+async def test_factorial_streams_huge_result(client: httpx.AsyncClient, unlimited_int_str_digits):
+    response = await client.get("/factorial", params={"n": 5000})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {"result": math.factorial(5000)}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("n", [10, 5000])
+async def test_factorial_hex(client: httpx.AsyncClient, n: int):
+    response = await client.get("/factorial", params={"n": n, "base": 16})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {"result": hex(math.factorial(n))}
+
+
+@pytest.mark.asyncio
+async def test_fibonacci_hex(client: httpx.AsyncClient):
+    response = await client.get("/fibonacci/10", params={"base": 16})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {"result": hex(89)}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/factorial?n=10&base=2", "/fibonacci/10?base=x"])
+async def test_invalid_base(client: httpx.AsyncClient, path: str):
+    response = await client.get(path)
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_factorial_streams_results_too_large_for_cache(monkeypatch, unlimited_int_str_digits):
+    monkeypatch.setattr(math_plain_asgi, "MAX_CACHED_BODY_BYTES", 0)
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/factorial", "query_string": b"n=30000"}
+    await app(scope, receive, send)
+
+    bodies = [message for message in messages if message["type"] == "http.response.body"]
+    assert len(bodies) > 1
+    assert all(message["more_body"] for message in bodies[:-1])
+    assert json.loads(b"".join(message["body"] for message in bodies)) == {"result": math.factorial(30000)}
+
+
+@pytest.mark.asyncio
+async def test_factorial_is_cached_with_etag(client: httpx.AsyncClient):
+    response = await client.get("/factorial", params={"n": 8})
+    hits = math_plain_asgi.cache.hits
+    cached = await client.get("/factorial", params={"n": 8})
+
+    assert response.status_code == cached.status_code == HTTPStatus.OK
+    assert response.content == cached.content
+    assert response.headers["etag"] == cached.headers["etag"]
+    assert math_plain_asgi.cache.hits == hits + 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/factorial?n=12", "/fibonacci/12", "/factorial?n=12&base=16"])
+async def test_conditional_get(client: httpx.AsyncClient, path: str):
+    response = await client.get(path)
+    etag = response.headers["etag"]
+
+    not_modified = await client.get(path, headers={"if-none-match": etag})
+    modified = await client.get(path, headers={"if-none-match": '"other"'})
+
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    assert not_modified.headers["etag"] == etag
+    assert not_modified.content == b""
+    assert modified.status_code == HTTPStatus.OK
+
+
+@pytest.mark.asyncio
+async def test_cache_stats(client: httpx.AsyncClient):
+    response = await client.get("/cache/stats")
+
+    assert response.status_code == HTTPStatus.OK
+    assert {"hits", "misses", "evictions", "bytes"} <= response.json().keys()
+
+
+@pytest.mark.asyncio
+async def test_batch(client: httpx.AsyncClient):
+    response = await client.post(
+        "/batch",
+        json=[
+            {"op": "factorial", "n": 5},
+            {"op": "fibonacci", "n": 10},
+            {"op": "factorial", "n": 3},
+        ],
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {"results": [120, 89, 6]}
+
+
+@pytest.mark.asyncio
+async def test_batch_hex(client: httpx.AsyncClient):
+    response = await client.post("/batch", params={"base": 16}, json=[{"op": "factorial", "n": 5}])
+
+    assert response.json() == {"results": ["0x78"]}
+
+
+@pytest.mark.asyncio
+async def test_batch_streams_large_results(client: httpx.AsyncClient, unlimited_int_str_digits):
+    operations = [{"op": "factorial", "n": n} for n in range(3000, 3100)]
+
+    response = await client.post("/batch", json=operations)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {"results": [math.factorial(n) for n in range(3000, 3100)]}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("body", "status_code"),
+    [
+        (b"", HTTPStatus.UNPROCESSABLE_ENTITY),
+        (b"{}", HTTPStatus.UNPROCESSABLE_ENTITY),
+        (b'[{"op": "sqrt", "n": 4}]', HTTPStatus.UNPROCESSABLE_ENTITY),
+        (b'[{"op": "factorial", "n": -1}]', HTTPStatus.BAD_REQUEST),
+        (b"[]", HTTPStatus.OK),
+    ],
+)
+async def test_batch_validation(client: httpx.AsyncClient, body: bytes, status_code: int):
+    response = await client.post("/batch", content=body)
+
+    assert response.status_code == status_code
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("dtype", ["float64", "int64"])
+async def test_mean_packed(client: httpx.AsyncClient, dtype: str):
+    body = np.arange(1, 11, dtype="<f8" if dtype == "float64" else "<i8").tobytes()
+
+    response = await client.post(
+        "/mean",
+        params={"dtype": dtype},
+        content=body,
+        headers={"content-type": "application/octet-stream"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {"result": 5.5}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("content", "headers"),
+    [
+        (np.arange(1, 11, dtype="<f8").tobytes(), {"content-type": "application/octet-stream"}),
+        (json.dumps(list(range(1, 11))).encode(), {"content-type": "application/json"}),
+    ],
+)
+async def test_mean_stats(client: httpx.AsyncClient, content: bytes, headers: dict[str, str]):
+    response = await client.post("/mean", params={"stats": "true"}, content=content, headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert data["result"] == 5.5
+    assert data["variance"] == pytest.approx(8.25)
+    assert data["min"] == 1 and data["max"] == 10
+    assert set(data["percentiles"]) == {"25", "50", "75", "90", "99"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("params", "content", "status_code"),
+    [
+        ({}, b"", HTTPStatus.BAD_REQUEST),
+        ({}, b"\x00" * 7, HTTPStatus.UNPROCESSABLE_ENTITY),
+        ({"dtype": "float16"}, b"\x00" * 8, HTTPStatus.UNPROCESSABLE_ENTITY),
+        ({"stats": "maybe"}, b"\x00" * 8, HTTPStatus.UNPROCESSABLE_ENTITY),
+    ],
+)
+async def test_mean_packed_validation(client: httpx.AsyncClient, params, content: bytes, status_code: int):
+    response = await client.post(
+        "/mean",
+        params=params,
+        content=content,
+        headers={"content-type": "application/octet-stream"},
+    )
+
+    assert response.status_code == status_code
+
+
+async def raw_post(path: str, headers: list, chunks: list[bytes], query_string: bytes = b"") -> list[dict]:
+    messages = []
+    pending = list(chunks)
+
+    async def receive():
+        body = pending.pop(0)
+        return {"type": "http.request", "body": body, "more_body": bool(pending)}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": path, "query_string": query_string, "headers": headers}
+    await app(scope, receive, send)
+    return messages
+
+
+@pytest.mark.asyncio
+async def test_body_size_is_limited_before_allocation():
+    headers = [(b"content-type", b"application/octet-stream"), (b"content-length", b"100000000000000")]
+    messages = await raw_post("/mean", headers, [b"\x00" * 8])
+
+    assert messages[0]["status"] == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("path", "limit"), [("/batch", "MAX_BODY_BYTES"), ("/mean", "MAX_PACKED_BODY_BYTES")])
+async def test_body_size_is_limited_without_content_length(monkeypatch, path: str, limit: str):
+    monkeypatch.setattr(math_plain_asgi, limit, 16)
+    headers = [(b"content-type", b"application/octet-stream" if path == "/mean" else b"application/json")]
+    messages = await raw_post(path, headers, [b"\x00" * 8, b"\x00" * 8, b"\x00" * 8])
+
+    assert messages[0]["status"] == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+@pytest.mark.asyncio
+async def test_packed_body_has_its_own_limit(monkeypatch):
+    # упакованному /mean общий лимит тел не мешает, JSON-телу - мешает
+    monkeypatch.setattr(math_plain_asgi, "MAX_BODY_BYTES", 16)
+    body = np.arange(10, dtype="<f8").tobytes()
+    headers = [(b"content-type", b"application/octet-stream"), (b"content-length", str(len(body)).encode())]
+    packed = await raw_post("/mean", headers, [body], b"stats=true")
+    as_json = await raw_post("/mean", [(b"content-type", b"application/json")], [b"[1, 2, 3, 4, 5, 6, 7]"], b"stats=true")
+
+    assert packed[0]["status"] == HTTPStatus.OK
+    assert json.loads(packed[1]["body"])["result"] == 4.5
+    assert as_json[0]["status"] == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+@pytest.mark.asyncio
+async def test_startup_loads_checkpoints(client: httpx.AsyncClient, tmp_path, monkeypatch):
+    monkeypatch.setattr(math_plain_asgi, "CHECKPOINT_PATH", tmp_path / "table")
+    monkeypatch.setattr(math_plain_asgi, "CHECKPOINT_LIMIT", 3_000)
+
+    async with lifespan(app):
+        assert math_plain_asgi.checkpoint_path == str(tmp_path / "table")
+        factorial = await client.get("/factorial", params={"n": 2_500, "base": 16})
+        fibonacci = await client.get("/fibonacci/2500", params={"base": 16})
+
+    assert math_plain_asgi.checkpoint_path is None
+    assert (tmp_path / "table").exists()
+    assert factorial.json() == {"result": hex(math.factorial(2_500))}
+    assert fibonacci.json() == {"result": hex(fibonacci_pair(2_500)[1])}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("path", "expected"),
+    [
+        ("/factorial?n=1000&mod=1000003", math.factorial(1000) % 1_000_003),
+        ("/factorial?n=1000000000000&mod=1000000007", 0),
+        ("/fibonacci/1000?mod=97", fibonacci_pair(1000)[1] % 97),
+        ("/fibonacci/1000000000000?mod=1000000007&base=16", None),
+    ],
+)
+async def test_mod(client: httpx.AsyncClient, path: str, expected: int | None):
+    response = await client.get(path)
+
+    assert response.status_code == HTTPStatus.OK
+    if expected is not None:
+        assert response.json() == {"result": expected}
+    else:
+        assert int(response.json()["result"], 16) < 1_000_000_007
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "path", ["/factorial?n=10&mod=0", "/fibonacci/10?mod=x", f"/factorial?n=10&mod={10**25}"]
+)
+async def test_invalid_mod(client: httpx.AsyncClient, path: str):
+    response = await client.get(path)
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_mod_too_expensive(client: httpx.AsyncClient):
+    response = await client.get("/factorial", params={"n": 10**12, "mod": 10**13})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_factorial_approx(client: httpx.AsyncClient):
+    response = await client.get("/factorial", params={"n": 10**12, "approx": "true"})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["digits"] == 11_565_705_518_104
+    assert response.json()["mantissa"] == pytest.approx(1.403661160373756)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("params", "status"),
+    [
+        ({"n": 10, "approx": "maybe"}, HTTPStatus.UNPROCESSABLE_ENTITY),
+        ({"n": 10, "approx": "true", "mod": 7}, HTTPStatus.UNPROCESSABLE_ENTITY),
+        ({"n": 10**1000, "approx": "true"}, HTTPStatus.BAD_REQUEST),
+    ],
+)
+async def test_factorial_approx_invalid(client: httpx.AsyncClient, params: dict, status: HTTPStatus):
+    response = await client.get("/factorial", params=params)
+
+    assert response.status_code == status
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("params", "expected"),
+    [
+        ({"from": 0, "to": 5}, [fibonacci_pair(n)[1] for n in range(6)]),
+        ({"from": 3000, "to": 3100}, [fibonacci_pair(n)[1] for n in range(3000, 3101)]),
+        ({"from": 10, "to": 10, "mod": 7}, [fibonacci_pair(10)[1] % 7]),
+    ],
+)
+async def test_fibonacci_range(client: httpx.AsyncClient, params: dict, expected: list[int], unlimited_int_str_digits):
+    response = await client.get("/fibonacci", params=params)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == [{"n": params["from"] + i, "result": value} for i, value in enumerate(expected)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pool", [False, True])
+async def test_fibonacci_range_in_segments(client: httpx.AsyncClient, monkeypatch, pool: bool):
+    # по ~10 строк в отрезке: ответ склеивается из многих отрезков, каждый от своей пары
+    monkeypatch.setattr(math_plain_asgi, "FIBONACCI_SEGMENT_BYTES", 1_000)
+    monkeypatch.setattr(math_plain_asgi, "FIBONACCI_INLINE_LIMIT", 0 if pool else 10**9)
+    if pool:
+        math_plain_asgi.dispatcher.start()
+    try:
+        response = await client.get("/fibonacci", params={"from": 150, "to": 400, "base": 16})
+    finally:
+        math_plain_asgi.dispatcher.shutdown()
+
+    assert response.status_code == HTTPStatus.OK
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == [{"n": n, "result": hex(fibonacci_pair(n)[1])} for n in range(150, 401)]
+
+
+@pytest.mark.asyncio
+async def test_long_fibonacci_range(client: httpx.AsyncClient):
+    response = await client.get("/fibonacci", params={"from": 0, "to": 9_000})
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.text.splitlines()) == 9_001
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("params", "status"),
+    [
+        ({"from": 5}, HTTPStatus.UNPROCESSABLE_ENTITY),
+        ({"from": "x", "to": 5}, HTTPStatus.UNPROCESSABLE_ENTITY),
+        ({"from": 5, "to": 4}, HTTPStatus.BAD_REQUEST),
+        # слишком много строк
+        ({"from": 0, "to": 100_000, "mod": 7}, HTTPStatus.BAD_REQUEST),
+    ],
+)
+async def test_fibonacci_range_invalid(client: httpx.AsyncClient, params: dict, status: HTTPStatus):
+    response = await client.get("/fibonacci", params=params)
+
+    assert response.status_code == status
@@ -0,0 +1,53 @@
+import math
+from http import HTTPStatus
+
+import httpx
+import pytest
+
+from lecture_1.hw import math_plain_asgi
+from lecture_1.hw.offload import ComputeDispatcher, DispatcherOverloaded
+
+
+@pytest.fixture()
+def started_dispatcher():
+    dispatcher = ComputeDispatcher(max_workers=1, max_pending=1, timeout=10.0)
+    dispatcher.start()
+    yield dispatcher
+    dispatcher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_light_work_runs_inline_without_pool():
+    dispatcher = ComputeDispatcher()
+
+    assert not dispatcher.started
+    assert await dispatcher.run(math.factorial, 5, heavy=True) == 120
+
+
+@pytest.mark.asyncio
+async def test_heavy_work_runs_in_pool(started_dispatcher: ComputeDispatcher):
+    assert await started_dispatcher.run(math.factorial, 6000, heavy=True) == math.factorial(6000)
+    assert started_dispatcher.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_is_full(started_dispatcher: ComputeDispatcher):
+    started_dispatcher.max_pending = 0
+
+    with pytest.raises(DispatcherOverloaded):
+        await started_dispatcher.run(math.factorial, 6000, heavy=True)
+
+    assert await started_dispatcher.run(math.factorial, 3, heavy=False) == 6
+
+
+@pytest.mark.asyncio
+async def test_app_returns_503_when_overloaded(monkeypatch, started_dispatcher: ComputeDispatcher):
+    started_dispatcher.max_pending = 0
+    monkeypatch.setattr(math_plain_asgi, "dispatcher", started_dispatcher)
+
+    async with httpx.AsyncClient(app=math_plain_asgi.app, base_url="http://testserver") as client:
+        heavy = await client.get("/factorial", params={"n": 100_000})
+        light = await client.get("/factorial", params={"n": 10})
+
+    assert heavy.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert light.status_code == HTTPStatus.OK
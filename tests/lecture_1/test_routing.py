@@ -0,0 +1,85 @@
+from http import HTTPStatus
+
+import httpx
+import pytest
+
+from lecture_1 import application
+from lecture_1.routing import NOT_FOUND, Router, StaticResponse
+
+
+async def handler(scope, receive, send):
+    pass
+
+
+async def other_handler(scope, receive, send):
+    pass
+
+
+@pytest.fixture()
+def router() -> Router:
+    router = Router()
+    router.add("GET", "/factorial", handler)
+    router.add("GET", "/fibonacci/{n}", handler)
+    router.add("GET", "/items/{id}/parts/{part}", other_handler)
+    router.add("POST", "/factorial", other_handler)
+    return router
+
+
+@pytest.mark.parametrize(
+    ("method", "path", "expected"),
+    [
+        ("GET", "/factorial", (handler, {})),
+        ("POST", "/factorial", (other_handler, {})),
+        ("GET", "/fibonacci/10", (handler, {"n": "10"})),
+        ("GET", "/fibonacci/", (handler, {"n": ""})),
+        ("GET", "/items/1/parts/x", (other_handler, {"id": "1", "part": "x"})),
+        ("GET", "/fibonacci/10/extra", None),
+        ("DELETE", "/factorial", None),
+        ("GET", "/factorial/", None),
+        ("GET", "/", None),
+    ],
+)
+def test_match(router: Router, method: str, path: str, expected):
+    assert router.match(method, path) == expected
+
+
+@pytest.mark.asyncio
+async def test_static_response_is_reused():
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await NOT_FOUND({}, None, send)
+    await NOT_FOUND({}, None, send)
+
+    assert messages[0] is messages[2]
+    assert messages[1] is messages[3]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("method", "path", "status_code"),
+    [
+        ("GET", "/", HTTPStatus.OK),
+        ("GET", "/other", HTTPStatus.NOT_FOUND),
+        ("POST", "/", HTTPStatus.NOT_FOUND),
+    ],
+)
+async def test_application(method: str, path: str, status_code: int):
+    transport = httpx.ASGITransport(app=application)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.request(method, path)
+
+    assert response.status_code == status_code
+
+
+@pytest.mark.asyncio
+async def test_custom_not_found():
+    router = Router(not_found=StaticResponse(HTTPStatus.IM_A_TEAPOT, b"teapot"))
+
+    transport = httpx.ASGITransport(app=router)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.get("/")
+
+    assert response.status_code == HTTPStatus.IM_A_TEAPOT
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import math
+
+import pytest
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from lecture_1.core.fibonacci import fibonacci_pair
+from lecture_1.hw import math_plain_asgi
+from lecture_1.hw.admission import AdmissionController
+from lecture_1.hw.math_plain_asgi import app
+
+
+def test_results_are_tagged_with_ids():
+    with TestClient(app).websocket_connect("/ws") as ws:
+        ws.send_json({"id": 1, "op": "factorial", "n": 10})
+        ws.send_json({"id": "b", "op": "fibonacci", "n": 10, "base": 16})
+        ws.send_json({"id": 3, "op": "factorial", "n": 10, "mod": 7})
+        replies = [ws.receive_json() for _ in range(3)]
+
+    assert sorted(replies, key=lambda reply: str(reply["id"])) == [
+        {"id": 1, "result": math.factorial(10)},
+        {"id": 3, "result": math.factorial(10) % 7},
+        {"id": "b", "result": hex(89)},
+    ]
+
+
+@pytest.mark.parametrize(
+    ("request_", "error"),
+    [
+        ({"id": 1, "op": "power", "n": 10}, "Unprocessable Entity"),
+        ({"id": 1, "op": "factorial", "n": "10"}, "Unprocessable Entity"),
+        ({"id": 1, "op": "factorial", "n": 10, "base": 2}, "Unprocessable Entity"),
+        ({"id": 1, "op": "factorial", "n": 10, "mod": 0}, "Unprocessable Entity"),
+        ({"id": 1, "op": "factorial", "n": 10, "mod": 10**25}, "Unprocessable Entity"),
+        ({"id": 1, "op": "factorial", "n": -1}, "Неверное значение, должно быть неотрицательным"),
+    ],
+)
+def test_invalid_requests(request_: dict, error: str):
+    with TestClient(app).websocket_connect("/ws") as ws:
+        ws.send_json(request_)
+        assert ws.receive_json() == {"id": 1, "error": error}
+
+        ws.send_text("not json")
+        assert ws.receive_json() == {"id": None, "error": "Unprocessable Entity"}
+
+
+def test_unknown_path_is_rejected():
+    with pytest.raises(WebSocketDisconnect):
+        with TestClient(app).websocket_connect("/other"):
+            pass
+
+
+def test_results_arrive_out_of_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(math_plain_asgi, "CHECKPOINT_PATH", tmp_path / "table")
+    monkeypatch.setattr(math_plain_asgi, "CHECKPOINT_LIMIT", 1_000)
+
+    # с lifespan тяжёлый запрос уходит в пул и не держит event loop
+    with TestClient(app) as client, client.websocket_connect("/ws") as ws:
+        ws.send_json({"id": "slow", "op": "factorial", "n": 150_000, "base": 16})
+        ws.send_json({"id": "fast", "op": "fibonacci", "n": 10})
+
+        assert ws.receive_json() == {"id": "fast", "result": fibonacci_pair(10)[1]}
+        assert int(ws.receive_json()["result"], 16) == math.factorial(150_000)
+
+
+@pytest.mark.asyncio
+async def test_backpressure_stops_reading(monkeypatch):
+    monkeypatch.setattr(math_plain_asgi, "MAX_WEBSOCKET_IN_FLIGHT", 2)
+    received = 0
+    blocked = asyncio.Event()
+
+    async def receive():
+        nonlocal received
+        received += 1
+        if received == 1:
+            return {"type": "websocket.connect"}
+        return {"type": "websocket.receive", "text": json.dumps({"id": received, "op": "fibonacci", "n": 5})}
+
+    async def send(message):
+        if message["type"] == "websocket.send":
+            # клиент не читает ответы
+            await blocked.wait()
+
+    task = asyncio.create_task(app({"type": "websocket", "path": "/ws"}, receive, send))
+    await asyncio.sleep(0.05)
+    task.cancel()
+
+    # connect и ровно MAX_WEBSOCKET_IN_FLIGHT запросов
+    assert received == 3
+
+
+def test_request_over_budget_is_an_error(monkeypatch):
+    monkeypatch.setattr(math_plain_asgi, "admission", AdmissionController(max_slow_backlog=1.0))
+    with TestClient(app).websocket_connect("/ws") as ws:
+        ws.send_json({"id": 1, "op": "factorial", "n": 500_000})
+        reply = ws.receive_json()
+
+    assert reply == {"id": 1, "error": "Слишком большое n"}
@@ -0,0 +1,20 @@
+import pytest
+
+from lecture_2.hw.shop_api import main
+from lecture_2.hw.shop_api.indexes import RangeIndex
+from lecture_2.hw.shop_api.storage import MemoryStorage
+
+
+@pytest.fixture()
+def shop(monkeypatch):
+    """Пустой магазин: хранилища, индексы и счётчики id подменяются на время теста."""
+    monkeypatch.setattr(main, "items_db", {})
+    monkeypatch.setattr(main, "carts_db", {})
+    monkeypatch.setattr(main, "item_id_counter", 0)
+    monkeypatch.setattr(main, "cart_id_counter", 0)
+    monkeypatch.setattr(main, "prices_all", RangeIndex())
+    monkeypatch.setattr(main, "prices_active", RangeIndex())
+    monkeypatch.setattr(main, "cart_items_by_item", {})
+    monkeypatch.setattr(main, "cart_prices", RangeIndex())
+    monkeypatch.setattr(main, "cart_quantities", RangeIndex())
+    monkeypatch.setattr(main, "storage", MemoryStorage())
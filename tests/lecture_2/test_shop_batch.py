@@ -0,0 +1,89 @@
+from http import HTTPStatus
+
+import pytest
+from fastapi.testclient import TestClient
+
+from lecture_2.hw.shop_api import main
+from lecture_2.hw.shop_api.indexes import RangeIndex
+
+client = TestClient(main.app)
+
+
+def test_range_index_add_many():
+    index = RangeIndex([(2.0, 1), (4.0, 2)])
+    index.add_many([(3.0, 3)])
+    index.add_many((float(value), 10 + value) for value in range(20, 0, -1))
+    assert index.range(high=3.0) == [11, 1, 12, 3, 13]
+    assert len(index) == 23
+
+
+def test_create_items_batch(shop):
+    client.post("/item", json={"name": "first", "price": 50.0})
+    response = client.post("/item/batch", json=[{"name": f"item {i}", "price": 100.0 - i} for i in range(20)])
+
+    assert response.status_code == HTTPStatus.CREATED
+    ids = response.json()["ids"]
+    assert ids == list(range(2, 22))
+    assert client.get(f"/item/{ids[3]}").json() == {"id": ids[3], "name": "item 3", "price": 97.0, "deleted": False}
+    listed = client.get("/item", params={"min_price": 90, "limit": 100}).json()
+    assert [item["id"] for item in listed] == ids[10::-1]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        [{"name": "ok", "price": 1.0}, {"name": "no price"}],
+        [{"name": "ok", "price": 1.0}, {"name": "extra", "price": 1.0, "deleted": True}],
+        {"name": "not a list", "price": 1.0},
+    ],
+)
+def test_create_items_batch_is_atomic(shop, body):
+    assert client.post("/item/batch", json=body).status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert client.get("/item").json() == []
+    assert client.post("/item", json={"name": "next", "price": 1.0}).json()["id"] == 1
+
+
+def test_add_items_to_cart(shop):
+    ids = client.post("/item/batch", json=[{"name": "a", "price": 2.0}, {"name": "b", "price": 5.0}]).json()["ids"]
+    cart_id = client.post("/cart").json()["id"]
+    client.post(f"/cart/{cart_id}/add/{ids[1]}")
+
+    response = client.post(f"/cart/{cart_id}/items", json={str(ids[0]): 3, str(ids[1]): 2})
+    assert response.status_code == HTTPStatus.OK
+    cart = response.json()
+    assert [(item["id"], item["quantity"]) for item in cart["items"]] == [(ids[1], 3), (ids[0], 3)]
+    assert cart["price"] == pytest.approx(21.0)
+    assert cart["quantity"] == 6
+    assert client.get(f"/cart/{cart_id}").json() == cart
+    assert [c["id"] for c in client.get("/cart", params={"min_price": 20}).json()] == [cart_id]
+
+    # товар в корзине меняется как обычно
+    client.delete(f"/item/{ids[1]}")
+    assert client.get(f"/cart/{cart_id}").json()["price"] == pytest.approx(6.0)
+
+
+@pytest.mark.parametrize(
+    "path,body,status",
+    [
+        ("/cart/1/items", {"1": 1, "42": 1}, HTTPStatus.NOT_FOUND),
+        ("/cart/1/items", {"1": 1, "2": 0}, HTTPStatus.UNPROCESSABLE_ENTITY),
+        ("/cart/1/items", {"x": 1}, HTTPStatus.UNPROCESSABLE_ENTITY),
+        ("/cart/7/items", {"1": 1}, HTTPStatus.NOT_FOUND),
+    ],
+)
+def test_add_items_to_cart_is_atomic(shop, path: str, body: dict, status: int):
+    client.post("/item/batch", json=[{"name": "a", "price": 2.0}, {"name": "b", "price": 5.0}])
+    client.post("/cart")
+
+    assert client.post(path, json=body).status_code == status
+    assert client.get("/cart/1").json() == {"id": 1, "items": [], "price": 0.0, "quantity": 0}
+
+
+def test_batch_size_is_limited(shop):
+    body = [{"name": "x", "price": 1.0}] * (main.MAX_BATCH_SIZE + 1)
+    assert client.post("/item/batch", json=body).status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert client.get("/item").json() == []
+
+    client.post("/cart")
+    quantities = {str(id): 1 for id in range(main.MAX_BATCH_SIZE + 1)}
+    assert client.post("/cart/1/items", json=quantities).status_code == HTTPStatus.UNPROCESSABLE_ENTITY
@@ -0,0 +1,135 @@
+import sys
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from lecture_2.hw.shop_api import main
+
+client = TestClient(main.app)
+
+
+def new_item(name: str, price: float) -> int:
+    return client.post("/item", json={"name": name, "price": price}).json()["id"]
+
+
+def new_cart(*item_ids: int) -> int:
+    cart_id = client.post("/cart").json()["id"]
+    for item_id in item_ids:
+        client.post(f"/cart/{cart_id}/add/{item_id}")
+    return cart_id
+
+
+def totals(cart_id: int) -> tuple[float, int]:
+    cart = client.get(f"/cart/{cart_id}").json()
+    return cart["price"], cart["quantity"]
+
+
+def test_totals_follow_item_changes(shop):
+    apple, pear = new_item("apple", 2.0), new_item("pear", 3.0)
+    both = new_cart(apple, apple, pear)
+    only_pear = new_cart(pear)
+    empty = new_cart()
+    assert totals(both) == (pytest.approx(7.0), 3)
+    assert totals(only_pear) == (pytest.approx(3.0), 1)
+
+    client.patch(f"/item/{apple}", json={"price": 5.0})
+    assert totals(both) == (pytest.approx(13.0), 3)
+    assert totals(only_pear) == (pytest.approx(3.0), 1)
+
+    client.put(f"/item/{pear}", json={"name": "big pear", "price": 4.0})
+    assert totals(both) == (pytest.approx(14.0), 3)
+    assert client.get(f"/cart/{only_pear}").json()["items"][0]["name"] == "big pear"
+
+    client.delete(f"/item/{pear}")
+    assert totals(both) == (pytest.approx(10.0), 2)
+    assert totals(only_pear) == (0.0, 0)
+    assert client.get(f"/cart/{only_pear}").json()["items"][0]["available"] is False
+    assert totals(empty) == (0.0, 0)
+
+    # удалённый товар можно положить в корзину, но в итоги он не входит
+    client.post(f"/cart/{both}/add/{pear}")
+    assert totals(both) == (pytest.approx(10.0), 2)
+    assert [item["quantity"] for item in client.get(f"/cart/{both}").json()["items"]] == [2, 2]
+
+
+def test_list_carts_uses_stored_totals(shop):
+    cheap, dear = new_item("cheap", 1.0), new_item("dear", 100.0)
+    first, second = new_cart(cheap), new_cart(dear, dear)
+
+    def ids(params: dict) -> list[int]:
+        return [cart["id"] for cart in client.get("/cart", params=params).json()]
+
+    assert ids({"min_price": 50}) == [second]
+    assert ids({"max_quantity": 1}) == [first]
+
+    client.delete(f"/item/{dear}")
+    assert ids({"min_price": 50}) == []
+    # с фильтром корзины идут в порядке индекса, по которому отбирались
+    assert ids({"max_quantity": 1}) == [second, first]
+
+
+def test_filtered_listing_uses_selective_index(shop, monkeypatch):
+    items = [new_item(str(price), float(price)) for price in range(1, 6)]
+    # корзина i: одна позиция товара ценой i + 1, i + 1 штук
+    carts = [new_cart(*[item] * (i + 1)) for i, item in enumerate(items)]
+
+    scanned = []
+    scan = main.RangeIndex.scan
+
+    def spy(index, *args, **kwargs):
+        scanned.append("price" if index is main.cart_prices else "quantity")
+        return scan(index, *args, **kwargs)
+
+    monkeypatch.setattr(main.RangeIndex, "scan", spy)
+
+    def ids(params: dict) -> list[int]:
+        return [cart["id"] for cart in client.get("/cart", params=params).json()]
+
+    # по сумме (1, 4, 9, 16, 25) подходят две корзины, по количеству - четыре
+    assert ids({"min_price": 10, "min_quantity": 2}) == carts[3:]
+    assert scanned == ["price"]
+    assert ids({"max_price": 20, "max_quantity": 1}) == carts[:1]
+    assert scanned == ["price", "quantity"]
+    # условие по второму индексу проверяется на кандидатах
+    assert ids({"min_price": 4, "max_quantity": 3}) == carts[1:3]
+
+
+def test_filtered_listing_cursor_keeps_order(shop):
+    cheap, dear = new_item("cheap", 1.0), new_item("dear", 10.0)
+    carts = [new_cart(dear), new_cart(cheap, cheap), new_cart(cheap), new_cart(dear, cheap)]
+
+    response = client.get("/cart", params={"min_price": 1, "limit": 2})
+    assert [cart["id"] for cart in response.json()] == [carts[2], carts[1]]
+    cursor = response.headers[main.NEXT_CURSOR_HEADER]
+
+    # курсор хранит позицию в индексе, а не набор выданных корзин: подорожавшая
+    # корзина с первой страницы встречается снова уже на новом месте
+    client.post(f"/cart/{carts[2]}/add/{dear}")
+    response = client.get("/cart", params={"min_price": 1, "limit": 2, "cursor": cursor})
+    assert [cart["id"] for cart in response.json()] == [carts[0], carts[2]]
+
+
+def test_concurrent_updates_keep_indexes_consistent(shop):
+    apple = new_item("apple", 2.0)
+    cart = new_cart(apple, apple)
+
+    def patch(worker: int):
+        for step in range(200):
+            main.update_item(apple, main.ItemUpdate(price=float(worker * 1000 + step)))
+
+    # частое переключение потоков, чтобы шаги обновлений перемежались
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=patch, args=(worker,)) for worker in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    price = client.get(f"/item/{apple}").json()["price"]
+    assert (len(main.prices_all), len(main.prices_active), len(main.cart_prices)) == (1, 1, 1)
+    assert totals(cart) == (pytest.approx(2 * price), 2)
@@ -0,0 +1,100 @@
+import math
+
+import pytest
+from fastapi.testclient import TestClient
+
+from lecture_2.hw.shop_api import main
+from lecture_2.hw.shop_api.cursors import decode_cursor, encode_cursor
+from lecture_2.hw.shop_api.indexes import RangeIndex
+
+client = TestClient(main.app)
+
+
+def test_cursor_roundtrip():
+    cursor = encode_cursor("item", 10.5, 3)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, "item", 2) == [10.5, 3]
+
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "cart", 1)
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor!", "item", 2)
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor("item", "x", 3), "item", 2)
+
+
+@pytest.mark.parametrize(
+    "key", [(math.inf, 3), (math.nan, 3), (10.0, 3.5), (10.0, math.inf), (10.0, True), (10.0, 3.0)]
+)
+def test_cursor_rejects_non_finite_and_fractional_ids(key: tuple):
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor("item", *key), "item", 2)
+
+
+def test_range_index_after():
+    index = RangeIndex()
+    for id, value in enumerate([5.0, 1.0, 3.0, 3.0, 9.0]):
+        index.add(value, id)
+
+    assert index.range(after=(3.0, 2)) == [3, 0, 4]
+    assert index.range(after=(3.0, 2), limit=1) == [3]
+    # удалённая пара всё равно задаёт позицию
+    index.remove(5.0, 0)
+    assert index.range(after=(5.0, 0)) == [4]
+    assert index.range(low=4.0, after=(1.0, 1)) == [4]
+
+
+def pages(path: str, params: dict) -> list[list[int]]:
+    result = []
+    while True:
+        response = client.get(path, params=params)
+        assert response.status_code == 200
+        result.append([entry["id"] for entry in response.json()])
+        cursor = response.headers.get(main.NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return result
+        # курсор уже учитывает offset первой страницы
+        params = {**params, "offset": 0, "cursor": cursor}
+
+
+def test_item_cursor_pagination(shop):
+    ids = [client.post("/item", json={"name": str(i), "price": float(1 + i % 3)}).json()["id"] for i in range(7)]
+    by_price = sorted(ids, key=lambda id: ((id - 1) % 3, id))
+
+    assert pages("/item", {"limit": 3}) == [by_price[:3], by_price[3:6], by_price[6:]]
+    assert pages("/item", {"limit": 7}) == [by_price]
+    assert pages("/item", {"limit": 2, "min_price": 2}) == [by_price[3:5], by_price[5:]]
+
+    # вставка перед курсором не сдвигает следующую страницу
+    response = client.get("/item", params={"limit": 3})
+    cursor = response.headers[main.NEXT_CURSOR_HEADER]
+    client.post("/item", json={"name": "cheap", "price": 0.5})
+    next_page = client.get("/item", params={"limit": 3, "cursor": cursor}).json()
+    assert [item["id"] for item in next_page] == by_price[3:6]
+
+
+def test_cart_cursor_pagination(shop):
+    item_id = client.post("/item", json={"name": "x", "price": 10.0}).json()["id"]
+    cart_ids = [client.post("/cart").json()["id"] for _ in range(5)]
+    for cart_id in cart_ids[::2]:
+        client.post(f"/cart/{cart_id}/add/{item_id}")
+
+    assert pages("/cart", {"limit": 2}) == [cart_ids[:2], cart_ids[2:4], cart_ids[4:]]
+    assert pages("/cart", {"limit": 2, "min_quantity": 1}) == [cart_ids[0:3:2], cart_ids[4:]]
+    assert pages("/cart", {"limit": 2, "offset": 1}) == [cart_ids[1:3], cart_ids[3:]]
+
+
+@pytest.mark.parametrize(
+    "path,cursor",
+    [
+        ("/item", "garbage"),
+        ("/item", encode_cursor("cart", 1)),
+        ("/item", encode_cursor("item", math.nan, 1)),
+        ("/cart", encode_cursor("item", 1.0, 1)),
+        ("/cart", encode_cursor("cart", math.inf)),
+        ("/cart", encode_cursor("cart", math.nan)),
+        ("/cart", encode_cursor("cart", 1.5)),
+    ],
+)
+def test_invalid_cursor(shop, path: str, cursor: str):
+    assert client.get(path, params={"cursor": cursor}).status_code == 422
@@ -0,0 +1,59 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from lecture_2.hw.shop_api import main
+from lecture_2.hw.shop_api.indexes import RangeIndex
+
+client = TestClient(main.app)
+
+
+def test_range_index():
+    index = RangeIndex()
+    for id, value in enumerate([5.0, 1.0, 3.0, 3.0, 9.0]):
+        index.add(value, id)
+
+    assert index.range() == [1, 2, 3, 0, 4]
+    assert index.range(3.0, 5.0) == [2, 3, 0]
+    assert index.range(low=4.0) == [0, 4]
+    assert index.range(high=3.0, offset=1, limit=1) == [2]
+    assert index.range(10.0, 20.0) == []
+
+    assert index.count(3.0, 5.0) == 3
+    assert index.count(high=0.5) == 0
+    assert list(index.scan(3.0, after=(3.0, 2))) == [(3.0, 3), (5.0, 0), (9.0, 4)]
+
+    index.remove(3.0, 2)
+    index.remove(3.0, 42)
+    assert index.range(3.0, 3.0) == [3]
+    assert len(index) == 4
+
+
+@pytest.fixture()
+def catalog(monkeypatch) -> dict[str, int]:
+    monkeypatch.setattr(main, "items_db", {})
+    monkeypatch.setattr(main, "prices_all", RangeIndex())
+    monkeypatch.setattr(main, "prices_active", RangeIndex())
+
+    prices = {"d": 40.0, "a": 10.0, "c": 30.0, "b": 20.0}
+    return {name: client.post("/item", json={"name": name, "price": price}).json()["id"] for name, price in prices.items()}
+
+
+def names(params: dict) -> list[str]:
+    return [item["name"] for item in client.get("/item", params=params).json()]
+
+
+def test_listing_is_ordered_by_price(catalog: dict[str, int]):
+    assert names({}) == ["a", "b", "c", "d"]
+    assert names({"min_price": 15, "max_price": 30}) == ["b", "c"]
+    assert names({"offset": 1, "limit": 2}) == ["b", "c"]
+
+
+def test_index_follows_changes(catalog: dict[str, int]):
+    client.put(f"/item/{catalog['a']}", json={"name": "a", "price": 35.0})
+    client.patch(f"/item/{catalog['d']}", json={"price": 5.0})
+    client.patch(f"/item/{catalog['b']}", json={"price": None})
+    client.delete(f"/item/{catalog['c']}")
+
+    assert names({}) == ["d", "b", "a"]
+    assert names({"show_deleted": True}) == ["d", "b", "c", "a"]
+    assert names({"min_price": 30}) == ["a"]
@@ -0,0 +1,142 @@
+import os
+
+from fastapi.testclient import TestClient
+
+from lecture_2.hw.shop_api import main, oplog
+from lecture_2.hw.shop_api.oplog import LogStorage
+from lecture_2.hw.shop_api.storage import CartRecord, ItemRecord
+
+client = TestClient(main.app)
+
+
+def fill_shop() -> dict:
+    apple = client.post("/item", json={"name": "apple", "price": 2.0}).json()["id"]
+    plum = client.post("/item", json={"name": "слива", "price": 7.0}).json()["id"]
+    cart = client.post("/cart").json()["id"]
+    client.post(f"/cart/{cart}/add/{plum}")
+    client.post(f"/cart/{cart}/add/{apple}")
+    client.post(f"/cart/{cart}/add/{plum}")
+    client.put(f"/item/{apple}", json={"name": "green apple", "price": 3.0})
+    client.delete(f"/item/{plum}")
+    return current()
+
+
+def current() -> dict:
+    return {
+        "items": client.get("/item", params={"show_deleted": True}).json(),
+        "carts": client.get("/cart").json(),
+    }
+
+
+def restart(directory: str) -> dict:
+    main.storage.close()
+    main.use_storage(LogStorage(directory))
+    return current()
+
+
+def test_replay_log_without_snapshot(shop, tmp_path):
+    directory = str(tmp_path)
+    main.use_storage(LogStorage(directory))
+    state = fill_shop()
+    # без закрытия: только сброшенный журнал, как после падения процесса
+    main.storage.flush()
+    crashed = main.storage
+    main.use_storage(LogStorage(directory))
+    crashed._stop.set()
+
+    assert current() == state
+    main.storage.close()
+
+
+def test_snapshot_and_tail(shop, tmp_path):
+    directory = str(tmp_path)
+    main.use_storage(LogStorage(directory))
+    client.post("/item", json={"name": "early", "price": 1.0})
+    main.storage.snapshot()
+    state = fill_shop()
+
+    # снимок заменил первый сегмент, изменения после него - в хвосте журнала
+    assert sorted(os.listdir(directory)) == ["log.00000002", "snapshot.00000002"]
+    assert restart(directory) == state
+    # закрытие снимает снимок, и следующий старт журнал не проигрывает
+    assert sorted(os.listdir(directory)) == ["log.00000003", "snapshot.00000003"]
+    assert restart(directory) == state
+    assert sorted(os.listdir(directory)) == ["log.00000003", "snapshot.00000003"]
+    main.storage.close()
+
+
+def test_truncated_tail_is_ignored(tmp_path):
+    storage = LogStorage(str(tmp_path))
+    items, carts = storage.load()
+    for id in (1, 2):
+        items[id] = ItemRecord(id, f"item {id}", float(id))
+        storage.save_item(items[id])
+    carts[1] = CartRecord(1)
+    storage.save_cart(carts[1])
+    storage.flush()
+    storage._stop.set()
+
+    with open(tmp_path / "log.00000001", "ab") as log:
+        log.write(b"\x01\x03\x00")
+
+    recovered = LogStorage(str(tmp_path))
+    items, carts = recovered.load()
+    assert {id: item.name for id, item in items.items()} == {1: "item 1", 2: "item 2"}
+    assert list(carts) == [1]
+    recovered.close()
+
+
+def test_batches_are_replayed(shop, tmp_path):
+    directory = str(tmp_path)
+    main.use_storage(LogStorage(directory))
+    ids = client.post("/item/batch", json=[{"name": f"item {i}", "price": float(i)} for i in range(5)]).json()["ids"]
+    cart = client.post("/cart").json()["id"]
+    client.post(f"/cart/{cart}/items", json={str(ids[1]): 2, str(ids[4]): 1})
+    state = current()
+    main.storage.flush()
+    crashed = main.storage
+    main.use_storage(LogStorage(directory))
+    crashed._stop.set()
+
+    assert current() == state
+    main.storage.close()
+
+
+def test_torn_batch_is_dropped_whole(tmp_path):
+    storage = LogStorage(str(tmp_path))
+    items, carts = storage.load()
+    storage.save_item(ItemRecord(1, "single", 1.0))
+    storage.save_items([ItemRecord(id, f"item {id}", float(id)) for id in (2, 3, 4)])
+    storage.flush()
+    storage._stop.set()
+
+    # падение посреди пачки: первые записи группы дошли до диска, последняя - нет
+    path = tmp_path / "log.00000001"
+    os.truncate(path, os.path.getsize(path) - 3)
+
+    recovered = LogStorage(str(tmp_path))
+    items, carts = recovered.load()
+    assert list(items) == [1]
+    recovered.close()
+
+
+def test_snapshot_copies_records_once(tmp_path, monkeypatch):
+    storage = LogStorage(str(tmp_path))
+    items, carts = storage.load()
+    for id, name in ((1, "a"), (2, "bb"), (3, "ccc")):
+        items[id] = ItemRecord(id, name, float(id))
+        storage.save_item(items[id])
+
+    # переименование посреди записи снимка, как из параллельного PUT
+    def rename_while_writing(*args):
+        items[1].name = "renamed"
+        write_snapshot(*args)
+
+    write_snapshot = oplog._write_snapshot
+    monkeypatch.setattr(oplog, "_write_snapshot", rename_while_writing)
+    storage.snapshot()
+    storage._stop.set()
+
+    sequence = storage._sequence
+    snapshot_items, _ = oplog._read_snapshot(os.path.join(str(tmp_path), f"snapshot.{sequence:08d}"))
+    assert {id: item.name for id, item in snapshot_items.items()} == {1: "a", 2: "bb", 3: "ccc"}
@@ -0,0 +1,136 @@
+import sqlite3
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from lecture_2.hw.shop_api import main
+from lecture_2.hw.shop_api.storage import CartRecord, ItemRecord, SqliteStorage
+
+client = TestClient(main.app)
+
+
+def snapshot() -> dict:
+    return {
+        "items": client.get("/item", params={"show_deleted": True, "limit": 100}).json(),
+        "carts": client.get("/cart", params={"limit": 100}).json(),
+        "filtered": client.get("/cart", params={"min_price": 5}).json(),
+    }
+
+
+def test_sqlite_state_survives_restart(shop, tmp_path):
+    path = str(tmp_path / "shop.db")
+    main.use_storage(SqliteStorage(path))
+
+    apple = client.post("/item", json={"name": "apple", "price": 2.0}).json()["id"]
+    pear = client.post("/item", json={"name": "pear", "price": 3.0}).json()["id"]
+    plum = client.post("/item", json={"name": "plum", "price": 7.0}).json()["id"]
+    first, second = client.post("/cart").json()["id"], client.post("/cart").json()["id"]
+    for cart_id, item_id in [(first, pear), (first, apple), (first, pear), (second, plum)]:
+        client.post(f"/cart/{cart_id}/add/{item_id}")
+    client.patch(f"/item/{apple}", json={"name": "green apple"})
+    client.delete(f"/item/{plum}")
+    before = snapshot()
+    main.storage.close()
+
+    main.use_storage(SqliteStorage(path))
+    assert snapshot() == before
+    # счётчики продолжаются с сохранённых id
+    assert client.post("/item", json={"name": "fig", "price": 1.0}).json()["id"] == plum + 1
+    assert client.post("/cart").json()["id"] == second + 1
+    main.storage.close()
+
+
+def test_writes_are_batched_off_the_request_path(tmp_path):
+    path = str(tmp_path / "shop.db")
+    # интервал больше теста: пишет только явный flush
+    storage = SqliteStorage(path, flush_interval=60)
+    try:
+        item = ItemRecord(1, "apple", 2.0)
+        cart = CartRecord(1)
+        storage.save_item(item)
+        storage.save_cart(cart)
+        for quantity in (1, 2, 3):
+            cart.lines[item.id] = quantity
+            storage.save_line(cart, item.id)
+        item.price = 5.0
+        storage.save_item(item)
+
+        with sqlite3.connect(path) as reader:
+            assert reader.execute("SELECT count(*) FROM items").fetchone() == (0,)
+            storage.flush()
+            # повторные изменения строки сливаются в одну запись с последним состоянием
+            assert reader.execute("SELECT name, price, deleted FROM items").fetchall() == [("apple", 5.0, 0)]
+            assert reader.execute("SELECT cart_id, item_id, quantity FROM cart_lines").fetchall() == [(1, 1, 3)]
+            assert reader.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    finally:
+        storage.close()
+
+
+def wait_for_rows(path: str, query: str, expected: list):
+    deadline = time.monotonic() + 5
+    with sqlite3.connect(path) as reader:
+        while reader.execute(query).fetchall() != expected:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+
+def test_background_flush(tmp_path):
+    path = str(tmp_path / "shop.db")
+    storage = SqliteStorage(path, flush_interval=0.001)
+    try:
+        storage.save_cart(CartRecord(7))
+        wait_for_rows(path, "SELECT id FROM carts", [(7,)])
+    finally:
+        storage.close()
+
+
+def test_full_batch_wakes_writer(tmp_path):
+    path = str(tmp_path / "shop.db")
+    storage = SqliteStorage(path, flush_interval=60, max_batch=3)
+    try:
+        for id in range(1, 4):
+            storage.save_item(ItemRecord(id, str(id), float(id)))
+        wait_for_rows(path, "SELECT id FROM items ORDER BY id", [(1,), (2,), (3,)])
+    finally:
+        storage.close()
+
+
+def test_batch_is_enqueued_whole(tmp_path):
+    path = str(tmp_path / "shop.db")
+    storage = SqliteStorage(path, flush_interval=60)
+    try:
+        items = [ItemRecord(id, str(id), float(id)) for id in range(1, 4)]
+        cart = CartRecord(1)
+        cart.lines.update({1: 2, 3: 1})
+        storage.save_items(items)
+        storage.save_cart(cart)
+        storage.save_lines(cart, [1, 3])
+        assert (len(storage._items), len(storage._lines)) == (3, 2)
+
+        storage.flush()
+        with sqlite3.connect(path) as reader:
+            assert reader.execute("SELECT id FROM items ORDER BY id").fetchall() == [(1,), (2,), (3,)]
+            assert reader.execute("SELECT item_id, quantity FROM cart_lines").fetchall() == [(1, 2), (3, 1)]
+    finally:
+        storage.close()
+
+
+def test_concurrent_saves_are_not_lost(tmp_path):
+    path = str(tmp_path / "shop.db")
+    storage = SqliteStorage(path, flush_interval=0.0001, max_batch=50)
+
+    def save(start: int):
+        for id in range(start, start + 5_000):
+            storage.save_item(ItemRecord(id, str(id), float(id)))
+
+    threads = [threading.Thread(target=save, args=(start,)) for start in range(0, 20_000, 5_000)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert storage._writer.is_alive()
+    storage.close()
+
+    with sqlite3.connect(path) as reader:
+        assert reader.execute("SELECT count(*) FROM items").fetchone() == (20_000,)
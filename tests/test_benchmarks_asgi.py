@@ -0,0 +1,42 @@
+import pytest
+
+from benchmarks.asgi import Request, call, lifespan, measure
+from lecture_1 import application
+from lecture_1.hw import math_plain_asgi
+
+
+@pytest.mark.asyncio
+async def test_call_collects_status_and_body():
+    response = await call(application, Request("GET", "/"))
+
+    assert response.status == 200
+    assert response.body_size == len(b"Hello, world!")
+
+
+@pytest.mark.asyncio
+async def test_measure_counts_statuses():
+    requests = [Request("GET", "/"), Request("GET", "/missing")]
+
+    result = await measure(application, requests, count=10, warmup=2, alloc_samples=4)
+
+    assert result.requests == 10
+    assert result.statuses == {200: 5, 404: 5}
+    assert result.rps > 0
+    assert result.p50_ms <= result.p99_ms
+
+
+@pytest.mark.asyncio
+async def test_lifespan_starts_and_stops_app(tmp_path, monkeypatch):
+    monkeypatch.setattr(math_plain_asgi, "CHECKPOINT_PATH", tmp_path / "table")
+    monkeypatch.setattr(math_plain_asgi, "CHECKPOINT_LIMIT", 1_000)
+
+    async with lifespan(math_plain_asgi.app):
+        assert math_plain_asgi.dispatcher.started
+
+    assert not math_plain_asgi.dispatcher.started
+
+
+@pytest.mark.asyncio
+async def test_lifespan_tolerates_apps_without_it():
+    async with lifespan(application):
+        pass